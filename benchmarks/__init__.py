@@ -0,0 +1,3 @@
+"""
+benchmarks: Performance benchmarks for pystructtype, run as modules from the repository root.
+"""
@@ -0,0 +1,61 @@
+"""
+Run the benchmark suite, and compare the results with a stored baseline.
+
+    python -m benchmarks                                    # run every case
+    python -m benchmarks smx_config bits                    # run the cases whose name contains a filter
+    python -m benchmarks --output results.json              # write the results to a JSON file
+    python -m benchmarks --save-baseline                    # store the results as the new baseline
+    python -m benchmarks --baseline benchmarks/baseline.json --threshold 0.15
+
+The exit code is 1 if a case is slower, or allocates more, than the baseline by more than the threshold.
+Baselines are only comparable when measured on the same machine and interpreter.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks import runner
+from benchmarks.cases import CASES
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("filters", nargs="*", help="only run the cases whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case, the fastest is reported")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing run")
+    parser.add_argument("--output", type=Path, help="JSON file to write the results to")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="JSON file of the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative regression (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CASES if not args.filters or any(f in case.name for f in args.filters)]
+    if not cases:
+        parser.error(f"no cases match {args.filters}")
+    results = runner.run(cases, args.repeat, args.min_time)
+
+    if args.output:
+        runner.save(args.output, results)
+    if args.save_baseline:
+        runner.save(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, create one with --save-baseline")
+        return 0
+
+    regressions = runner.compare(runner.load(args.baseline), results, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions compared to {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+cases: The benchmark cases of the suite.
+
+Every case is a function returning the operation to measure, so setting up the data is not part of the
+measurement. Cases measuring retained memory instead return the number of instances their operation keeps alive.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Annotated, Any, ClassVar
+
+from pystructtype import BitsType, StructDataclass, TypeMeta, bool_t, double_t, int16_t, uint8_t, uint16_t, uint32_t
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+INSTANCES = 1000
+"""Number of instances created by the memory cases"""
+
+
+@dataclass(frozen=True)
+class Case:
+    """
+    A single benchmark case.
+    """
+
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    """Function returning the operation to measure"""
+    instances: int = 0
+    """Number of instances kept alive by the operation, to report the retained memory per instance, or 0"""
+
+
+class Flat(StructDataclass):
+    id: uint32_t
+    kind: uint8_t
+    enabled: bool_t
+    temperature: int16_t
+    reading: double_t
+
+
+class Samples(StructDataclass):
+    samples: Annotated[list[uint16_t], TypeMeta(size=4096)]
+
+
+class ArraySamples(StructDataclass):
+    samples: Annotated[list[uint16_t], TypeMeta(size=4096, array=True)]
+
+
+class Point(StructDataclass):
+    x: int16_t
+    y: int16_t
+    flags: uint8_t
+
+
+class Path(StructDataclass):
+    count: uint16_t
+    points: Annotated[list[Point], TypeMeta(size=64)]
+
+
+class LED(StructDataclass, track_changes=True):
+    r: uint8_t
+    g: uint8_t
+    b: uint8_t
+
+
+class Telemetry(StructDataclass):
+    seq: uint32_t
+    leds: Annotated[list[LED], TypeMeta(size=256)]
+    samples: Annotated[list[uint32_t], TypeMeta(size=256, array=True)]
+
+
+class TrackedTelemetry(Telemetry, track_changes=True):
+    pass
+
+
+class Flags(BitsType):
+    __bits_type__: ClassVar = uint32_t
+    __bits_definition__: ClassVar = {"ready": 0, "error": 1, "busy": 5, "channels": list(range(8, 24))}
+    ready: bool
+    error: bool
+    busy: bool
+    channels: list[bool]
+
+
+class DescriptorFlags(BitsType, descriptors=True):
+    __bits_type__: ClassVar = uint32_t
+    __bits_definition__: ClassVar = {"ready": 0, "error": 1, "busy": 5, "channels": list(range(8, 24))}
+    ready: bool
+    error: bool
+    busy: bool
+    channels: list[bool]
+
+
+def _decode(cls: type[StructDataclass], data: bytes) -> Callable[[], Callable[[], Any]]:
+    """
+    :return: Setup of a case decoding data into an instance of cls
+    """
+
+    def setup() -> Callable[[], Any]:
+        instance = cls()
+        return lambda: instance.decode(data)
+
+    return setup
+
+
+def _encode(cls: type[StructDataclass], data: bytes) -> Callable[[], Callable[[], Any]]:
+    """
+    :return: Setup of a case encoding an instance of cls decoded from data
+    """
+
+    def setup() -> Callable[[], Any]:
+        instance = cls()
+        instance.decode(data)
+        return instance.encode
+
+    return setup
+
+
+def _encode_change(cls: type[Telemetry]) -> Callable[[], Callable[[], Any]]:
+    """
+    :return: Setup of a case changing two attributes of an encoded instance of cls, and encoding it again
+    """
+
+    def setup() -> Callable[[], Any]:
+        instance = cls()
+        instance.encode()
+
+        def encode_change() -> bytes:
+            instance.seq += 1
+            instance.leds[3].g = instance.seq & 0xFF
+            return instance.encode()
+
+        return encode_change
+
+    return setup
+
+
+def _define_class() -> Callable[[], Any]:
+    def define() -> type[StructDataclass]:
+        class Defined(StructDataclass):
+            a: uint8_t
+            b: Annotated[list[uint16_t], TypeMeta(size=8)]
+            point: Point
+            points: Annotated[list[Point], TypeMeta(size=4)]
+
+        return Defined
+
+    return define
+
+
+def _instances(factory: Callable[[], Any]) -> Callable[[], Callable[[], Any]]:
+    """
+    :return: Setup of a case creating INSTANCES instances with the factory, and keeping them alive
+    """
+    return lambda: lambda: [factory() for _ in range(INSTANCES)]
+
+
+FLAT_DATA = Flat(id=1, kind=2, enabled=True, temperature=-40, reading=1.5).encode()
+SMX_DATA = bytes(TEST_CONFIG_DATA)
+SAMPLES_DATA = bytes(range(256)) * 32
+PATH_DATA = bytes(Path().byte_size())
+FLAGS_DATA = (0x00F0_F023).to_bytes(4, "big")
+FLAT_BATCH = FLAT_DATA * 10_000
+
+CASES: tuple[Case, ...] = (
+    Case("flat.decode", _decode(Flat, FLAT_DATA)),
+    Case("flat.encode", _encode(Flat, FLAT_DATA)),
+    Case("flat.decode_many_10k", lambda: lambda: Flat.decode_many(FLAT_BATCH)),
+    Case("flat.iter_records_10k", lambda: lambda: list(Flat.iter_records(FLAT_BATCH))),
+    Case("smx_config.decode", _decode(SMXConfigType, SMX_DATA)),
+    Case("smx_config.encode", _encode(SMXConfigType, SMX_DATA)),
+    Case("smx_config.decode_record", lambda: lambda: SMXConfigType.decode_record(SMX_DATA)),
+    Case("samples_4096.decode", _decode(Samples, SAMPLES_DATA)),
+    Case("samples_4096.encode", _encode(Samples, SAMPLES_DATA)),
+    Case("array_samples_4096.decode", _decode(ArraySamples, SAMPLES_DATA)),
+    Case("array_samples_4096.encode", _encode(ArraySamples, SAMPLES_DATA)),
+    Case("nested_points_64.decode", _decode(Path, PATH_DATA)),
+    Case("nested_points_64.encode", _encode(Path, PATH_DATA)),
+    Case("telemetry.encode_change", _encode_change(Telemetry)),
+    Case("telemetry_tracked.encode_change", _encode_change(TrackedTelemetry)),
+    Case("bits.decode", _decode(Flags, FLAGS_DATA)),
+    Case("bits.encode", _encode(Flags, FLAGS_DATA)),
+    Case("bits_descriptors.decode", _decode(DescriptorFlags, FLAGS_DATA)),
+    Case("bits_descriptors.encode", _encode(DescriptorFlags, FLAGS_DATA)),
+    Case("class_definition", _define_class),
+    Case("memory.flat", _instances(Flat), INSTANCES),
+    Case("memory.smx_config", _instances(SMXConfigType), INSTANCES),
+    Case("memory.smx_config_record", _instances(lambda: SMXConfigType.decode_record(SMX_DATA)), INSTANCES),
+)
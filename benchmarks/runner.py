@@ -0,0 +1,174 @@
+"""
+runner: Measuring benchmark cases, and comparing the results with a baseline.
+"""
+
+import gc
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from benchmarks.cases import Case
+
+
+@dataclass(frozen=True)
+class Result:
+    """
+    Measurements of a single benchmark case.
+    """
+
+    name: str
+    ns_per_op: float
+    """Nanoseconds per operation, of the fastest repeat"""
+    ops_per_sec: float
+    """Operations per second, of the fastest repeat"""
+    alloc_bytes: int
+    """Peak bytes allocated by a single operation"""
+    bytes_per_instance: float | None = None
+    """Bytes kept alive per instance, for cases creating instances"""
+
+
+@dataclass(frozen=True)
+class Regression:
+    """
+    A measurement that got worse than the baseline by more than the threshold.
+    """
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return f"{self.name} {self.metric}: {self.baseline:,.1f} -> {self.current:,.1f} ({self.ratio - 1:+.1%})"
+
+
+def _allocations(case: Case) -> tuple[int, float | None]:
+    """
+    Measure the memory of a single operation with tracemalloc
+
+    :param case: Benchmark case
+    :return: Tuple of (peak bytes allocated by the operation, bytes kept alive per instance or None)
+    """
+    operation = case.setup()
+    operation()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        kept = operation()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    per_instance = (after - before) / case.instances if case.instances else None
+    del kept
+    return peak - before, per_instance
+
+
+def measure(case: Case, repeat: int = 5, min_time: float = 0.2) -> Result:
+    """
+    Measure a benchmark case
+
+    :param case: Benchmark case
+    :param repeat: Number of timing runs, the fastest is reported
+    :param min_time: Minimum duration of a single timing run in seconds
+    :return: Result of the case
+    """
+    timer = timeit.Timer(case.setup())
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat, number)) / number
+    alloc_bytes, per_instance = _allocations(case)
+    return Result(case.name, best * 1e9, 1 / best if best else float("inf"), alloc_bytes, per_instance)
+
+
+def run(cases: Iterable[Case], repeat: int = 5, min_time: float = 0.2, verbose: bool = True) -> list[Result]:
+    """
+    Measure benchmark cases one after another
+
+    :param cases: Benchmark cases
+    :param repeat: Number of timing runs per case
+    :param min_time: Minimum duration of a single timing run in seconds
+    :param verbose: True to print every result as it is measured
+    :return: Results in the order of the cases
+    """
+    results = []
+    if verbose:
+        print(f"{'case':<32} {'ns/op':>14} {'ops/s':>14} {'alloc B':>10} {'B/instance':>11}")
+    for case in cases:
+        result = measure(case, repeat, min_time)
+        results.append(result)
+        if verbose:
+            per_instance = f"{result.bytes_per_instance:,.0f}" if result.bytes_per_instance is not None else "-"
+            print(
+                f"{result.name:<32} {result.ns_per_op:>14,.0f} {result.ops_per_sec:>14,.0f}"
+                f" {result.alloc_bytes:>10,} {per_instance:>11}"
+            )
+    return results
+
+
+def environment() -> dict[str, Any]:
+    """
+    :return: Description of the interpreter and machine the results were measured on
+    """
+    return {
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "gil_enabled": getattr(sys, "_is_gil_enabled", lambda: True)(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def save(path: Path, results: list[Result]) -> None:
+    """
+    Write results to a JSON file
+
+    :param path: Path of the file
+    :param results: Results to write
+    """
+    data = {"environment": environment(), "results": [asdict(result) for result in results]}
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def load(path: Path) -> list[Result]:
+    """
+    Read results from a JSON file written by `save`
+
+    :param path: Path of the file
+    :return: Results in the file
+    """
+    return [Result(**result) for result in json.loads(path.read_text())["results"]]
+
+
+def compare(baseline: list[Result], results: list[Result], threshold: float) -> list[Regression]:
+    """
+    Find the measurements that regressed compared to a baseline
+
+    Cases missing from either side are ignored.
+
+    :param baseline: Results of the baseline
+    :param results: Current results
+    :param threshold: Allowed relative increase, for example 0.1 for 10%
+    :return: Regressions of the time per operation, allocated bytes or bytes per instance
+    """
+    previous = {result.name: result for result in baseline}
+    regressions = []
+    for result in results:
+        if (base := previous.get(result.name)) is None:
+            continue
+        for metric in ("ns_per_op", "alloc_bytes", "bytes_per_instance"):
+            before, after = getattr(base, metric), getattr(result, metric)
+            if before is not None and after is not None and after > before * (1 + threshold):
+                regressions.append(Regression(result.name, metric, before, after))
+    return regressions
@@ -0,0 +1,68 @@
+"""
+thread_scaling: Scaling of decode_threaded and encode_threaded over 1, 2, 4 and 8 threads.
+
+Threads only decode on multiple cores at the same time on a free-threaded build of Python (3.14t), on a regular
+build the GIL keeps the speedup close to 1.
+
+Run with `python -m benchmarks.thread_scaling`.
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Annotated, Any
+
+from pystructtype import StructDataclass, TypeMeta, uint8_t, uint16_t, uint32_t
+
+
+class Sample(StructDataclass):
+    seq: uint32_t
+    channel: uint8_t
+    values: Annotated[list[uint16_t], TypeMeta(size=4)]
+
+
+def _best(func: Callable[[], Any], repeat: int) -> float:
+    """
+    :param func: Function to time
+    :param repeat: Number of runs
+    :return: Fastest run time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200_000, help="number of records per run")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="thread counts to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the fastest is reported")
+    args = parser.parse_args(argv)
+
+    items = [Sample(seq=i, channel=i % 8, values=[i % 65536] * 4) for i in range(args.records)]
+    buffer = Sample.encode_threaded(items, workers=1)
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {args.records} records")
+    print(f"{'threads':>7} {'decode rec/s':>14} {'speedup':>8} {'encode rec/s':>14} {'speedup':>8}")
+
+    base_decode = base_encode = 0.0
+    for threads in args.threads:
+        with ThreadPoolExecutor(threads) as executor:
+            decode = _best(partial(Sample.decode_threaded, buffer, workers=threads, executor=executor), args.repeat)
+            encode = _best(partial(Sample.encode_threaded, items, workers=threads, executor=executor), args.repeat)
+        base_decode = base_decode or decode
+        base_encode = base_encode or encode
+        print(
+            f"{threads:>7} {args.records / decode:>14,.0f} {base_decode / decode:>8.2f}"
+            f" {args.records / encode:>14,.0f} {base_encode / encode:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
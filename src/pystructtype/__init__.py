@@ -3,6 +3,20 @@ pystructtype: Public API for pystructtype package.
 """
 
 from pystructtype.bitstype import BitsType
+from pystructtype.cache import DecodeCacheInfo
+from pystructtype.instrumentation import (
+    OperationStats,
+    StructStats,
+    collect_stats,
+    disable_stats,
+    enable_stats,
+    reset_stats,
+    stats,
+    stats_enabled,
+)
+from pystructtype.lazy import LazyStruct
+from pystructtype.reader import ReadableStream, StructReader
+from pystructtype.records import StructRecord
 from pystructtype.structdataclass import StructDataclass
 from pystructtype.structtypes import (
     TypeInfo,
@@ -24,17 +38,30 @@ from pystructtype.structtypes import (
 
 __all__ = [
     "BitsType",
+    "DecodeCacheInfo",
+    "LazyStruct",
+    "OperationStats",
+    "ReadableStream",
     "StructDataclass",
+    "StructReader",
+    "StructRecord",
+    "StructStats",
     "TypeInfo",
     "TypeMeta",
     "bool_t",
     "char_t",
+    "collect_stats",
+    "disable_stats",
     "double_t",
+    "enable_stats",
     "float_t",
     "int8_t",
     "int16_t",
     "int32_t",
     "int64_t",
+    "reset_stats",
+    "stats",
+    "stats_enabled",
     "string_t",
     "uint8_t",
     "uint16_t",
@@ -2,15 +2,128 @@
 BitsType: Base class for bitfield structs.
 """
 
-import itertools
-from collections.abc import Mapping
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import field
 from types import MappingProxyType
-from typing import Annotated, ClassVar
+from typing import Annotated, Any, ClassVar, overload
 
 from pystructtype.structdataclass import StructDataclass
 from pystructtype.structtypes import TypeMeta
-from pystructtype.utils import int_to_bool_list
+
+
+class BitsView:
+    """
+    Lightweight list-like view over a set of bits in the `_raw` integer of a BitsType instance.
+
+    Supports indexing, slicing, iteration, assignment and comparison with lists of bools.
+    """
+
+    __slots__ = ("_masks", "_owner")
+
+    def __init__(self, owner: BitsType, masks: tuple[int, ...]) -> None:
+        """
+        :param owner: BitsType instance holding the `_raw` integer
+        :param masks: Bit masks of the items of the view, in order
+        """
+        self._owner = owner
+        self._masks = masks
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    @overload
+    def __getitem__(self, index: int) -> bool: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[bool]: ...
+
+    def __getitem__(self, index: int | slice) -> bool | list[bool]:
+        raw = self._owner._raw
+        if isinstance(index, slice):
+            return [raw & mask != 0 for mask in self._masks[index]]
+        return raw & self._masks[index] != 0
+
+    def __setitem__(self, index: int | slice, value: bool | Iterable[bool]) -> None:
+        if isinstance(index, slice):
+            masks = self._masks[index]
+            values = list(value)  # type: ignore[arg-type]
+            if len(values) != len(masks):
+                raise ValueError(f"Can not assign {len(values)} values to {len(masks)} bits")
+        else:
+            masks = (self._masks[index],)
+            values = [bool(value)]
+        raw = self._owner._raw
+        for mask, v in zip(masks, values, strict=True):
+            raw = raw | mask if v else raw & ~mask
+        self._owner._raw = raw  # type: ignore[misc]
+
+    def __iter__(self) -> Iterator[bool]:
+        raw = self._owner._raw
+        return (raw & mask != 0 for mask in self._masks)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BitsView | list | tuple):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BitsView({list(self)})"
+
+
+class BitFlag:
+    """
+    Descriptor reading and writing a single bit of the `_raw` integer of a BitsType instance.
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int) -> None:
+        """
+        :param mask: Bit mask of the flag
+        """
+        self.mask = mask
+
+    @overload
+    def __get__(self, instance: None, owner: type | None = None) -> BitFlag: ...
+
+    @overload
+    def __get__(self, instance: BitsType, owner: type | None = None) -> bool: ...
+
+    def __get__(self, instance: BitsType | None, owner: type | None = None) -> BitFlag | bool:
+        if instance is None:
+            return self
+        return instance._raw & self.mask != 0
+
+    def __set__(self, instance: BitsType, value: bool) -> None:
+        instance._raw = instance._raw | self.mask if value else instance._raw & ~self.mask  # type: ignore[misc]
+
+
+class BitList:
+    """
+    Descriptor exposing a list of bits of the `_raw` integer of a BitsType instance as a BitsView.
+    """
+
+    __slots__ = ("masks",)
+
+    def __init__(self, masks: tuple[int, ...]) -> None:
+        """
+        :param masks: Bit masks of the items of the list, in order
+        """
+        self.masks = masks
+
+    @overload
+    def __get__(self, instance: None, owner: type | None = None) -> BitList: ...
+
+    @overload
+    def __get__(self, instance: BitsType, owner: type | None = None) -> BitsView: ...
+
+    def __get__(self, instance: BitsType | None, owner: type | None = None) -> BitList | BitsView:
+        if instance is None:
+            return self
+        return BitsView(instance, self.masks)
+
+    def __set__(self, instance: BitsType, value: Iterable[bool]) -> None:
+        BitsView(instance, self.masks)[:] = value
 
 
 class BitsType(StructDataclass):
@@ -18,19 +131,38 @@ class BitsType(StructDataclass):
     Base class for bitfield structs. Subclasses must define __bits_type__ and __bits_definition__.
     """
 
+    # Subclasses hold _raw and _meta in the slots or the __dict__ of their dataclass, which type
+    # checkers can't see, hence the ignored "misc" errors where they are assigned
+    __slots__ = ()
+
     __bits_type__: ClassVar[type]
     __bits_definition__: ClassVar[dict[str, int | list[int]] | Mapping[str, int | list[int]]]
+    __bits_flag_masks__: ClassVar[tuple[tuple[str, int], ...]]
+    """Precomputed (attribute name, bit mask) pairs of single bit attributes"""
+    __bits_list_masks__: ClassVar[tuple[tuple[str, tuple[int, ...]], ...]]
+    """Precomputed (attribute name, bit masks) pairs of list attributes"""
+    __bits_descriptors__: ClassVar[bool] = False
+    """If True, the attributes are descriptors reading and writing the bits of _raw directly"""
 
     _raw: int  # Holds the raw integer value for the bitfield.
     _meta: dict[str, int | list[int]]  # Metadata mapping attribute names to bit positions.
 
-    def __init_subclass__(cls: type[BitsType], **kwargs: object) -> None:
+    def __init_subclass__(cls: type[BitsType], descriptors: bool | None = None, **kwargs: Any) -> None:
         """
         Initialize subclass by setting up bitfield attributes and type annotations.
         Ensures __bits_type__ and __bits_definition__ are present, wraps definition in MappingProxyType,
         and sets up class-level fields and annotations for each bitfield.
+
+        :param descriptors: True to define the attributes as descriptors over the bits of _raw, so that
+            decoding only stores _raw and list attributes are BitsView objects. Inherited if not given.
         """
         super().__init_subclass__(**kwargs)
+        slots = cls.__dict__.get("__struct_slots__", False)
+        if slots and "__slots__" in cls.__dict__:
+            # Slotted copy of a class that was already set up below, created by StructDataclassMeta
+            return
+        if descriptors is not None:
+            cls.__bits_descriptors__ = descriptors
         # Check for required attributes
         if not hasattr(cls, "__bits_type__") or not hasattr(cls, "__bits_definition__"):
             raise TypeError(
@@ -45,58 +177,103 @@ class BitsType(StructDataclass):
             cls.__bits_definition__ = definition
 
         # Set the correct type for the raw data
-        cls._raw = 0
         cls.__annotations__["_raw"] = bits_type
+        if slots:
+            # Instance attributes of a slotted class must be dataclass fields to get a slot. In descriptors
+            # mode _raw holds the only state, so it is compared and shown instead of the attributes.
+            cls._raw = field(default=0, init=False, repr=cls.__bits_descriptors__, compare=cls.__bits_descriptors__)
+            cls._meta = field(default_factory=dict, init=False, repr=False, compare=False)
+            cls.__annotations__["_meta"] = dict[str, int | list[int]]
+        else:
+            cls._raw = 0
+            cls._meta = field(default_factory=dict)
 
-        cls._meta = field(default_factory=dict)
+        if cls.__bits_descriptors__:
+            # Decoding and encoding is only a matter of storing/reading _raw, which lets
+            # parent StructDataclasses handle this class like any other nested struct
+            if "_decode" not in cls.__dict__:
+                cls._decode = StructDataclass._decode  # type: ignore[method-assign]
+            if "_encode" not in cls.__dict__:
+                cls._encode = StructDataclass._encode  # type: ignore[method-assign]
+        else:
+            # Restore the bit handling in case a parent class used descriptors
+            if cls._decode is StructDataclass._decode:
+                cls._decode = BitsType._decode  # type: ignore[method-assign]
+            if cls._encode is StructDataclass._encode:
+                cls._encode = BitsType._encode  # type: ignore[method-assign]
 
-        # Create the defined attributes, defaults, and annotations in the class
+        # The layout has to be compiled again now that the _raw annotation is in place
+        cls._compile_layout()
+
+        # Precompute the bit masks used to decode and encode the attributes
+        bit_count = cls._byte_length * 8
         for key, value in definition.items():
-            if isinstance(value, list):
+            for bit in value if isinstance(value, list) else [value]:
+                if not 0 <= bit < bit_count:
+                    raise ValueError(
+                        f"Bit {bit} of attribute {key} is out of range for a {bit_count} bit __bits_type__"
+                    )
+        cls.__bits_flag_masks__ = tuple((k, 1 << v) for k, v in definition.items() if not isinstance(v, list))
+        cls.__bits_list_masks__ = tuple(
+            (k, tuple(1 << bit for bit in v)) for k, v in definition.items() if isinstance(v, list)
+        )
+
+        # Create the defined attributes, defaults, and annotations in the class
+        for key, mask in cls.__bits_flag_masks__:
+            setattr(cls, key, BitFlag(mask) if cls.__bits_descriptors__ else False)
+            cls.__annotations__[key] = bool
+        for key, masks in cls.__bits_list_masks__:
+            if cls.__bits_descriptors__:
+                setattr(cls, key, BitList(masks))
+            else:
                 setattr(
                     cls,
                     key,
-                    field(default_factory=lambda v=len(value): [False for _ in range(v)]),  # type: ignore
+                    field(default_factory=lambda v=len(masks): [False for _ in range(v)]),  # type: ignore
                 )
-                cls.__annotations__[key] = Annotated[list[bool], TypeMeta(size=len(value))]
-            else:
-                setattr(cls, key, False)
-                cls.__annotations__[key] = bool
+            cls.__annotations__[key] = Annotated[list[bool], TypeMeta(size=len(masks))]
+        if slots and cls.__bits_descriptors__:
+            # A field would replace the descriptor with a slot, so the attributes are not __init__ arguments
+            for key in definition:
+                del cls.__annotations__[key]
 
     def __post_init__(self) -> None:
         """
         Post-initialization to set up the _meta attribute from the class definition.
         """
         super().__post_init__()
-        self._meta = dict(self.__bits_definition__)
+        if self.__bits_descriptors__:
+            # Nothing in descriptors mode uses _meta, so share the immutable class definition
+            self._meta = self.__bits_definition__  # type: ignore[assignment, misc]
+        else:
+            self._meta = dict(self.__bits_definition__)  # type: ignore[misc]
 
     def _decode(self, data: list[int]) -> None:
         """
         Decode the bitfield from a list of integers, updating the boolean attributes
-        according to the bit positions defined in _meta.
+        according to the bit positions defined in __bits_definition__.
         """
         super()._decode(data)
-        bin_data = int_to_bool_list(self._raw, self._byte_length)
-        for k, v in self._meta.items():
-            if isinstance(v, list):
-                steps = [bin_data[idx] for idx in v]
-                setattr(self, k, steps)
-            else:
-                setattr(self, k, bin_data[v])
+        raw = self._raw
+        for k, mask in self.__bits_flag_masks__:
+            setattr(self, k, raw & mask != 0)
+        for k, masks in self.__bits_list_masks__:
+            setattr(self, k, [raw & mask != 0 for mask in masks])
 
     def _encode(self) -> list[int]:
         """
         Encode the boolean attributes into a list of integers representing the bitfield.
         Updates _raw and returns the encoded list for further processing.
         """
-        bin_data = list(itertools.repeat(False, self._byte_length * 8))
-        for k, v in self._meta.items():
-            if isinstance(v, list):
-                steps = getattr(self, k)
-                for idx, bit_idx in enumerate(v):
-                    bin_data[bit_idx] = steps[idx]
-            else:
-                bin_data[v] = getattr(self, k)
-        self._raw = sum(int(v) << i for i, v in enumerate(bin_data))
+        raw = 0
+        for k, mask in self.__bits_flag_masks__:
+            if getattr(self, k):
+                raw |= mask
+        for k, masks in self.__bits_list_masks__:
+            steps = getattr(self, k)
+            for idx, mask in enumerate(masks):
+                if steps[idx]:
+                    raw |= mask
+        self._raw = raw  # type: ignore[misc]
         # Return _raw as a list of bytes (little-endian)
         return super()._encode()
@@ -0,0 +1,110 @@
+"""
+cache: Bounded LRU cache of decoded records, keyed by the payload bytes.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from pystructtype import structdataclass
+from pystructtype.records import StructRecord
+from pystructtype.utils import class_cached
+
+
+@dataclass(frozen=True)
+class DecodeCacheInfo:
+    """
+    Statistics of the decode cache of a StructDataclass subclass.
+    """
+
+    hits: int
+    """Number of decodes answered from the cache"""
+    misses: int
+    """Number of decodes of payloads that were not in the cache"""
+    evictions: int
+    """Number of records dropped because the cache was full"""
+    maxsize: int
+    """Maximum number of cached records"""
+    currsize: int
+    """Current number of cached records"""
+
+
+class DecodeCache:
+    """
+    Thread safe LRU cache mapping (little_endian, payload bytes) to the decoded, read-only record.
+
+    The full payload is part of the key, so two different payloads can never share a record even if their
+    hashes collide. Records are immutable, so every hit returns the same shared record.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        :param maxsize: Maximum number of cached records
+        """
+        self.maxsize = maxsize
+        self._records: OrderedDict[tuple[bool, bytes], StructRecord] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, payload: bytes, little_endian: bool, decode: Callable[[], StructRecord]) -> StructRecord:
+        """
+        Return the cached record of a payload, decoding and caching it if it is not in the cache yet
+
+        :param payload: Bytes of a single struct
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :param decode: Function decoding the payload into a record, called without holding the lock
+        :return: Decoded record
+        """
+        key = (little_endian, payload)
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+                self._hits += 1
+                return record
+            self._misses += 1
+
+        # Decode outside of the lock, concurrent misses of the same payload decode it more than once.
+        # Only the first one is cached, the others return that record and count as hits instead.
+        record = decode()
+        with self._lock:
+            if (cached := self._records.get(key)) is not None:
+                self._records.move_to_end(key)
+                self._misses -= 1
+                self._hits += 1
+                return cached
+            self._records[key] = record
+            while len(self._records) > self.maxsize:
+                self._records.popitem(last=False)
+                self._evictions += 1
+        return record
+
+    def info(self) -> DecodeCacheInfo:
+        """
+        :return: Snapshot of the cache statistics
+        """
+        with self._lock:
+            return DecodeCacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._records))
+
+    def clear(self) -> None:
+        """
+        Drop every cached record and reset the statistics
+        """
+        with self._lock:
+            self._records.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+def class_decode_cache(cls: type[structdataclass.StructDataclass]) -> DecodeCache | None:
+    """
+    Get the decode cache of a StructDataclass subclass, creating it on first use
+
+    :param cls: StructDataclass subclass
+    :return: DecodeCache of the class, or None if the class was not created with a decode_cache size
+    """
+    if not cls.__struct_decode_cache_size__:
+        return None
+    return class_cached(cls, "__struct_decode_cache__", lambda: DecodeCache(cls.__struct_decode_cache_size__))
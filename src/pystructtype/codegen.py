@@ -0,0 +1,449 @@
+"""
+codegen: Generate specialized decode/encode functions for StructDataclass layouts.
+
+Similar to how `dataclasses` generates `__init__`, the functions built here are straight-line
+Python source specialized for a single class. Nested StructDataclasses and list fields are
+flattened into fixed indices of the unpacked values, so no per-call type checks are needed. Lists
+of nested StructDataclasses are unrolled up to `UNROLL_LIMIT` items, and looped over above that,
+so the size of the generated source doesn't grow with the length of the list.
+"""
+
+from array import array
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import fields
+from itertools import count
+from typing import Any
+
+from pystructtype import records, structdataclass
+
+UNROLL_LIMIT = 16
+"""Maximum number of items of a list of nested StructDataclasses that is unrolled into straight-line code"""
+
+
+def _create_fn(
+    name: str, args: str, body: list[str], qualname: str, fn_globals: dict[str, Any] | None = None
+) -> Callable[..., Any]:
+    """
+    Compile a function from its source lines
+
+    :param name: Name of the function
+    :param args: Argument list of the function
+    :param body: Lines of the function body, without indentation
+    :param qualname: Qualified name to assign to the compiled function
+    :param fn_globals: Names made available to the function body
+    :return: The compiled function
+    """
+    body_src = "\n".join(f"    {line}" for line in body)
+    src = f"def {name}({args}):\n{body_src}\n"
+    namespace: dict[str, Any] = {}
+    exec(src, dict(fn_globals or {}), namespace)
+    fn: Callable[..., Any] = namespace[name]
+    fn.__qualname__ = qualname
+    return fn
+
+
+def _value(prefix: str | None, idx: int) -> str:
+    """
+    :param prefix: Prefix of the local variables holding the values, or None to index into `data`
+    :param idx: Index of the value
+    :return: Expression of a single unpacked value
+    """
+    return f"data[{idx}]" if prefix is None else f"{prefix}{idx}"
+
+
+def _values(prefix: str | None, start: int, end: int) -> str:
+    """
+    :param prefix: Prefix of the local variables holding the values, or None to index into `data`
+    :param start: Index of the first value
+    :param end: Index after the last value
+    :return: Expression of a list of unpacked values
+    """
+    if prefix is None:
+        return f"data[{start}:{end}]"
+    return f"[{', '.join(f'{prefix}{idx}' for idx in range(start, end))}]"
+
+
+def _decode_lines(
+    layout: structdataclass.StructLayout, target: str, start: int, names: count[int], prefix: str | None = None
+) -> list[str]:
+    """
+    Generate the assignment lines that decode a layout into the object named `target`
+
+    :param layout: The compiled layout to decode
+    :param target: Name of the local variable holding the object to decode into
+    :param start: Index of the first value of this layout
+    :param names: Counter used to create unique local variable names
+    :param prefix: Prefix of the local variables holding the values inside of a loop, or None to index into `data`
+    :return: Lines of source code
+    """
+    lines: list[str] = []
+    idx = start
+    for state in layout.states:
+        if state.struct_class is not None:
+            # Nested StructDataclasses are inlined, unless they define their own _decode
+            inline = state.struct_class._decode is structdataclass.StructDataclass._decode
+            if state.size > UNROLL_LIMIT and state.value_count:
+                # Loop over the items, zip hands out the values of one item per iteration from a shared iterator
+                obj, values, item_prefix = f"_o{next(names)}", f"_i{next(names)}", f"_v{next(names)}_"
+                end = idx + state.value_count * state.size
+                item_values = ", ".join(f"{item_prefix}{value_idx}" for value_idx in range(state.value_count))
+                lines.append(f"{values} = iter({_values(prefix, idx, end)})")
+                iterators = ", ".join([values] * state.value_count)
+                lines.append(f"for {obj}, {item_values} in zip({target}.{state.name}, {iterators}):")
+                lines.extend(f"    {line}" for line in _item_decode_lines(state, obj, 0, names, item_prefix, inline))
+                idx = end
+                continue
+            for list_idx in range(state.size):
+                obj = f"_o{next(names)}"
+                attr = f"{target}.{state.name}" + (f"[{list_idx}]" if state.size > 1 else "")
+                lines.append(f"{obj} = {attr}")
+                lines.extend(_item_decode_lines(state, obj, idx, names, prefix, inline))
+                idx += state.value_count
+        elif state.size == 1 or state.array_typecode is not None:
+            lines.append(f"{target}.{state.name} = {_value(prefix, idx)}")
+            idx += 1
+        else:
+            lines.append(f"{target}.{state.name}[:] = {_values(prefix, idx, idx + state.size)}")
+            idx += state.size
+    return lines
+
+
+def _item_decode_lines(
+    state: structdataclass.StructState, obj: str, idx: int, names: count[int], prefix: str | None, inline: bool
+) -> list[str]:
+    """
+    Generate the lines that decode a single nested StructDataclass named `obj`
+
+    :param state: State of the nested StructDataclass attribute
+    :param obj: Name of the local variable holding the nested StructDataclass
+    :param idx: Index of its first value
+    :param names: Counter used to create unique local variable names
+    :param prefix: Prefix of the local variables holding the values, or None to index into `data`
+    :param inline: True to inline the decoding of the nested class, False to call its `_decode`
+    :return: Lines of source code
+    """
+    assert state.struct_class is not None
+    if inline:
+        return _decode_lines(state.struct_class.__struct_layout__, obj, idx, names, prefix)
+    return [f"{obj}._decode({_values(prefix, idx, idx + state.value_count)})"]
+
+
+def _encode_lines(
+    states: Iterable[structdataclass.StructState], target: str, names: count[int]
+) -> tuple[list[str], list[str]]:
+    """
+    Generate the setup lines and list display items that encode the attributes of the object named `target`
+
+    :param states: StructStates of the attributes to encode
+    :param target: Name of the local variable holding the object to encode
+    :param names: Counter used to create unique local variable names
+    :return: Tuple of (setup lines, list display items)
+    """
+    lines: list[str] = []
+    items: list[str] = []
+    for state in states:
+        if state.struct_class is not None:
+            # Nested StructDataclasses are inlined, unless they define their own _encode
+            inline = state.struct_class._encode is structdataclass.StructDataclass._encode
+            if state.size > UNROLL_LIMIT and state.value_count:
+                # Loop over the items, collecting their values in a list
+                obj, values = f"_o{next(names)}", f"_l{next(names)}"
+                lines.append(f"{values} = []")
+                lines.append(f"for {obj} in {target}.{state.name}:")
+                if inline:
+                    sub_lines, sub_items = _encode_lines(state.struct_class.__struct_layout__.states, obj, names)
+                    lines.extend(f"    {line}" for line in sub_lines)
+                    lines.append(f"    {values} += ({', '.join(sub_items)},)")
+                else:
+                    lines.append(f"    {values} += {obj}._encode()")
+                items.append(f"*{values}")
+                continue
+            for list_idx in range(state.size):
+                obj = f"_o{next(names)}"
+                attr = f"{target}.{state.name}" + (f"[{list_idx}]" if state.size > 1 else "")
+                lines.append(f"{obj} = {attr}")
+                if inline:
+                    sub_lines, sub_items = _encode_lines(state.struct_class.__struct_layout__.states, obj, names)
+                    lines.extend(sub_lines)
+                    items.extend(sub_items)
+                else:
+                    items.append(f"*{obj}._encode()")
+        elif state.size == 1 or state.array_typecode is not None:
+            items.append(f"{target}.{state.name}")
+        else:
+            items.append(f"*{target}.{state.name}")
+    return lines, items
+
+
+def build_decoder(cls: type[structdataclass.StructDataclass]) -> Callable[[Any, list[Any]], None]:
+    """
+    Build a decode function specialized for the layout of the given class
+
+    :param cls: StructDataclass subclass with a compiled layout
+    :return: Function taking (instance, list of unpacked values) that assigns every field
+    """
+    layout = cls.__struct_layout__
+    body = [
+        f"if len(data) < {layout.value_count}:",
+        f"    raise IndexError('expected {layout.value_count} values to decode, got ' + str(len(data)))",
+        *_decode_lines(layout, "self", 0, count()),
+    ]
+    return _create_fn("__struct_decoder__", "self, data", body, f"{cls.__qualname__}.__struct_decoder__")
+
+
+def build_encoder(cls: type[structdataclass.StructDataclass]) -> Callable[[Any], list[Any]]:
+    """
+    Build an encode function specialized for the layout of the given class
+
+    :param cls: StructDataclass subclass with a compiled layout
+    :return: Function taking an instance and returning the list of values to pack
+    """
+    lines, items = _encode_lines(cls.__struct_layout__.states, "self", count())
+    body = [*lines, f"return [{', '.join(items)}]"]
+    return _create_fn("__struct_encoder__", "self", body, f"{cls.__qualname__}.__struct_encoder__")
+
+
+def build_states_encoder(
+    cls: type[structdataclass.StructDataclass], states: Sequence[structdataclass.StructState]
+) -> Callable[[Any], list[Any]]:
+    """
+    Build an encode function for some of the attributes of the given class
+
+    :param cls: StructDataclass subclass with a compiled layout
+    :param states: StructStates of the attributes to encode
+    :return: Function taking an instance and returning the list of values of the attributes, in the given order
+    """
+    lines, items = _encode_lines(states, "self", count())
+    body = [*lines, f"return [{', '.join(items)}]"]
+    return _create_fn("_encode_states", "self", body, f"{cls.__qualname__}._encode_states")
+
+
+def decode_new[S: structdataclass.StructDataclass](cls: type[S], data: Sequence[Any]) -> S:
+    """
+    Create a new instance of the given class and decode the unpacked values into it
+
+    :param cls: StructDataclass subclass to create
+    :param data: Unpacked values to decode
+    :return: The decoded instance
+    """
+    instance = cls()
+    instance._decode(list(data))
+    return instance
+
+
+def _can_construct(cls: type[structdataclass.StructDataclass]) -> bool:
+    """
+    Check if instances of the given class can be built directly from the unpacked values
+
+    This is only the case if the class does not define its own _decode, and every attribute
+    of its layout is an `__init__` argument of the dataclass.
+
+    :param cls: StructDataclass subclass to check
+    :return: True if a constructor call can be generated for the class
+    """
+    if not cls.__struct_codegen__ or cls._decode is not structdataclass.StructDataclass._decode:
+        return False
+    init_fields = {f.name for f in fields(cls) if f.init}
+    return all(state.name in init_fields for state in cls.__struct_layout__.states)
+
+
+def _construct_positionally(cls: type[structdataclass.StructDataclass]) -> bool:
+    """
+    Check if the `__init__` arguments of the given class are exactly the attributes of its layout, in order
+
+    Positional arguments are cheaper to pass than keyword arguments.
+
+    :param cls: StructDataclass subclass to check
+    :return: True if the constructor call can pass the attributes positionally
+    """
+    init_fields = [f.name for f in fields(cls) if f.init and not f.kw_only]
+    return init_fields == [state.name for state in cls.__struct_layout__.states]
+
+
+def constructs_from_values(cls: type[structdataclass.StructDataclass]) -> bool:
+    """
+    Check if instances of the given class are created by calling the class with the unpacked values
+
+    This is the case for classes without nested StructDataclasses or lists of scalars, whose attributes
+    are all passed positionally. Batch decoding can then skip the factory and call the class directly.
+
+    :param cls: StructDataclass subclass with a compiled layout
+    :return: True if `cls(*values)` creates the decoded instance
+    """
+    return (
+        _can_construct(cls)
+        and _construct_positionally(cls)
+        and all(
+            state.struct_class is None and (state.size == 1 or state.array_typecode is not None)
+            for state in cls.__struct_layout__.states
+        )
+    )
+
+
+def _construct_expr(
+    cls: type[structdataclass.StructDataclass], start: int, fn_globals: dict[str, Any], base: str = ""
+) -> str:
+    """
+    Generate an expression that creates a decoded instance of the given class
+
+    :param cls: StructDataclass subclass to create
+    :param start: Index of the first value of the class within `data`, relative to `base`
+    :param fn_globals: Names made available to the function body, class references are added to it
+    :param base: Prefix of every index into `data`, like `_b1 + ` inside of a comprehension
+    :return: Source code of the expression
+    """
+    cls_name = f"_c{len(fn_globals)}"
+    fn_globals[cls_name] = cls
+    layout = cls.__struct_layout__
+    if not _can_construct(cls):
+        return f"decode_new({cls_name}, data[{base}{start}:{base}{start + layout.value_count}])"
+
+    keyword = "" if _construct_positionally(cls) else "{}="
+    args: list[str] = []
+    idx = start
+    for state in layout.states:
+        arg = keyword.format(state.name)
+        if state.struct_class is not None:
+            if state.size > UNROLL_LIMIT:
+                loop_base = f"_b{len(fn_globals)}"
+                item = _construct_expr(state.struct_class, 0, fn_globals, f"{loop_base} + ")
+                args.append(f"{arg}[{item} for {loop_base} in {_range_expr(state, base, idx)}]")
+                idx += state.value_count * state.size
+                continue
+            items = []
+            for _ in range(state.size):
+                items.append(_construct_expr(state.struct_class, idx, fn_globals, base))
+                idx += state.value_count
+            args.append(arg + (f"[{', '.join(items)}]" if state.size > 1 else items[0]))
+        elif state.size == 1 or state.array_typecode is not None:
+            args.append(f"{arg}data[{base}{idx}]")
+            idx += 1
+        else:
+            args.append(f"{arg}list(data[{base}{idx}:{base}{idx + state.size}])")
+            idx += state.size
+    return f"{cls_name}({', '.join(args)})"
+
+
+def _range_expr(state: structdataclass.StructState, base: str, idx: int) -> str:
+    """
+    Generate a range expression of the index of the first value of every item of a list of nested StructDataclasses
+
+    :param state: State of the list attribute
+    :param base: Prefix of every index into `data`
+    :param idx: Index of the first value of the list within `data`, relative to `base`
+    :return: Source code of the expression
+    """
+    return f"range({base}{idx}, {base}{idx + state.value_count * state.size}, {state.value_count})"
+
+
+def build_factory[S: structdataclass.StructDataclass](cls: type[S]) -> Callable[[Sequence[Any]], S]:
+    """
+    Build a function that creates decoded instances of the given class from unpacked values
+
+    Where possible, the instance (and any nested StructDataclass) is built with a single constructor
+    call, which skips creating default values that would be overwritten right away.
+
+    :param cls: StructDataclass subclass with a compiled layout
+    :return: Function taking a sequence of unpacked values and returning a decoded instance
+    """
+    fn_globals: dict[str, Any] = {"decode_new": decode_new}
+    body = [f"return {_construct_expr(cls, 0, fn_globals)}"]
+    return _create_fn(
+        "__struct_factory__", "data", body, f"{cls.__qualname__}.__struct_factory__", fn_globals=fn_globals
+    )
+
+
+def _record_expr(record: type[records.StructRecord], start: int, fn_globals: dict[str, Any], base: str = "") -> str:
+    """
+    Generate an expression that creates a record of the given record type from the unpacked values
+
+    :param record: Record type to create
+    :param start: Index of the first value of the record within `data`, relative to `base`
+    :param fn_globals: Names made available to the function body, record types are added to it
+    :param base: Prefix of every index into `data`, like `_b1 + ` inside of a comprehension
+    :return: Source code of the expression
+    """
+    record_name = f"_r{len(fn_globals)}"
+    fn_globals[record_name] = record
+    items: list[str] = []
+    idx = start
+    for state in record.__struct_class__.__struct_layout__.states:
+        if state.struct_class is not None:
+            if state.size > UNROLL_LIMIT:
+                loop_base = f"_b{len(fn_globals)}"
+                item = _record_expr(state.struct_class.record_type(), 0, fn_globals, f"{loop_base} + ")
+                items.append(f"tuple([{item} for {loop_base} in {_range_expr(state, base, idx)}])")
+                idx += state.value_count * state.size
+                continue
+            sub_items = []
+            for _ in range(state.size):
+                sub_items.append(_record_expr(state.struct_class.record_type(), idx, fn_globals, base))
+                idx += state.value_count
+            items.append(f"({', '.join(sub_items)},)" if state.size > 1 else sub_items[0])
+        elif state.size == 1:
+            items.append(f"data[{base}{idx}]")
+            idx += 1
+        elif state.array_typecode is not None:
+            items.append(f"tuple(data[{base}{idx}])")
+            idx += 1
+        else:
+            items.append(f"tuple(data[{base}{idx}:{base}{idx + state.size}])")
+            idx += state.size
+    return f"_new({record_name}, ({', '.join(items)},))"
+
+
+def build_record_factory(record: type[records.StructRecord]) -> Callable[[Sequence[Any]], Any]:
+    """
+    Build a function that creates records of the given record type from unpacked values
+
+    Records are tuples, so every record (and nested record) is created with a single `tuple.__new__` call.
+
+    :param record: Record type generated for a StructDataclass subclass
+    :return: Function taking a sequence of unpacked values and returning a record
+    """
+    fn_globals: dict[str, Any] = {"_new": tuple.__new__}
+    body = [f"return {_record_expr(record, 0, fn_globals)}"]
+    return _create_fn("_from_values", "data", body, f"{record.__qualname__}._from_values", fn_globals)
+
+
+def _record_items(layout: structdataclass.StructLayout, expr: str, names: count[int]) -> list[str]:
+    """
+    Generate the list display items that flatten the record named by `expr` back into values
+
+    :param layout: The compiled layout of the record
+    :param expr: Expression of the record to flatten
+    :param names: Counter used to create unique local variable names
+    :return: List display items
+    """
+    items: list[str] = []
+    for idx, state in enumerate(layout.states):
+        if state.struct_class is not None:
+            sub_layout = state.struct_class.__struct_layout__
+            if state.size == 1:
+                items.extend(_record_items(sub_layout, f"{expr}[{idx}]", names))
+            elif state.size > UNROLL_LIMIT:
+                item, value = f"_i{next(names)}", f"_v{next(names)}"
+                sub_items = ", ".join(_record_items(sub_layout, item, names))
+                items.append(f"*[{value} for {item} in {expr}[{idx}] for {value} in ({sub_items},)]")
+            else:
+                for list_idx in range(state.size):
+                    items.extend(_record_items(sub_layout, f"{expr}[{idx}][{list_idx}]", names))
+        elif state.size == 1:
+            items.append(f"{expr}[{idx}]")
+        elif state.array_typecode is not None:
+            items.append(f"_array({state.array_typecode!r}, {expr}[{idx}])")
+        else:
+            items.append(f"*{expr}[{idx}]")
+    return items
+
+
+def build_record_values(record: type[records.StructRecord]) -> Callable[[Any], list[Any]]:
+    """
+    Build a function that flattens a record of the given record type back into the values to pack
+
+    :param record: Record type generated for a StructDataclass subclass
+    :return: Function taking a record and returning the list of values to pack
+    """
+    items = _record_items(record.__struct_class__.__struct_layout__, "self", count())
+    body = [f"return [{', '.join(items)}]"]
+    return _create_fn("_values", "self", body, f"{record.__qualname__}._values", {"_array": array})
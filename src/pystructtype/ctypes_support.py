@@ -0,0 +1,150 @@
+"""
+ctypes_support: Generate ctypes.Structure classes matching StructDataclass layouts.
+
+A ctypes.Structure can be created directly on top of a writable buffer with `from_buffer` (mmap, shared memory,
+bytearray, ...), which gives in-place access to a record without decoding or encoding it.
+"""
+
+import ctypes
+from typing import Any
+
+from pystructtype import bitstype, structdataclass
+from pystructtype.utils import CLASS_CACHE_LOCK, class_cached
+
+_CTYPES = {
+    "b": ctypes.c_int8,
+    "B": ctypes.c_uint8,
+    "h": ctypes.c_int16,
+    "H": ctypes.c_uint16,
+    "i": ctypes.c_int32,
+    "I": ctypes.c_uint32,
+    "q": ctypes.c_int64,
+    "Q": ctypes.c_uint64,
+    # c_bool can't be byte swapped, so structures of the other byte order than the host would reject it
+    "?": ctypes.c_uint8,
+    "f": ctypes.c_float,
+    "d": ctypes.c_double,
+    "c": ctypes.c_char,
+}
+"""Mapping of struct format characters to ctypes types"""
+
+_BASES: dict[bool, type[ctypes.Structure]] = {
+    False: ctypes.BigEndianStructure,  # type: ignore[dict-item]
+    True: ctypes.LittleEndianStructure,  # type: ignore[dict-item]
+}
+"""ctypes.Structure base classes for each byte order"""
+
+
+def _bit_fields(cls: type[bitstype.BitsType], little_endian: bool) -> list[tuple[str, Any, int]] | None:
+    """
+    Build the ctypes bitfields of a BitsType
+
+    Every attribute bit becomes a 1 bit field, list attributes are named `<attribute>_<index>`, and unused
+    bits are grouped into `_unused<bit>` fields.
+
+    :param cls: BitsType subclass
+    :param little_endian: True for a little endian structure, else big endian
+    :return: List of ctypes bitfields, or None if several attributes share the same bit
+    """
+    state = cls.__struct_layout__.states_by_name["_raw"]
+    c_type = _CTYPES[state.struct_fmt]
+    bit_count = state.byte_size * 8
+    names: dict[int, str] = {}
+    for key, value in cls.__bits_definition__.items():
+        bits = {key: value} if not isinstance(value, list) else {f"{key}_{idx}": bit for idx, bit in enumerate(value)}
+        for name, bit in bits.items():
+            if bit in names:
+                return None
+            names[bit] = name
+
+    # Little endian structures allocate bitfields from the least significant bit, big endian ones from the most
+    fields: list[tuple[str, Any, int]] = []
+    unused = 0
+    for bit in range(bit_count) if little_endian else reversed(range(bit_count)):
+        if bit not in names:
+            unused += 1
+            continue
+        if unused:
+            fields.append((f"_unused{bit - unused if little_endian else bit + 1}", c_type, unused))
+            unused = 0
+        fields.append((names[bit], c_type, 1))
+    if unused:
+        fields.append((f"_unused{bit_count - unused if little_endian else 0}", c_type, unused))
+    return fields
+
+
+def _state_ctype(state: structdataclass.StructState, little_endian: bool) -> Any:
+    """
+    Build the ctypes type of a single item of a StructState
+
+    :param state: StructState to build the type for
+    :param little_endian: True for a little endian structure, else big endian
+    :return: ctypes type of a single item
+    """
+    if state.struct_class is not None:
+        return ctypes_type(state.struct_class, little_endian)
+    if state.struct_fmt == "s":
+        return ctypes.c_char * state.chunk_size
+    return _CTYPES[state.struct_fmt]
+
+
+def ctypes_type(cls: type[structdataclass.StructDataclass], little_endian: bool = False) -> type[ctypes.Structure]:
+    """
+    Return a ctypes.Structure class with the same memory layout as the given StructDataclass class.
+
+    List attributes become ctypes arrays, nested StructDataclasses become nested structures, and the
+    attributes of BitsType classes become bitfields. The structure is created once per class and byte order.
+
+    :param cls: StructDataclass subclass
+    :param little_endian: True for a LittleEndianStructure, else a BigEndianStructure
+    :return: ctypes.Structure subclass named `<class name>_ctypes`
+    :raises TypeError: If ctypes can't reproduce the layout of the class
+    """
+    cache: dict[bool, type[ctypes.Structure]] = class_cached(cls, "__struct_ctypes__", dict)
+    if (structure := cache.get(little_endian)) is None:
+        # Build under the lock, so concurrent first uses all get the same structure class
+        with CLASS_CACHE_LOCK:
+            if (structure := cache.get(little_endian)) is None:
+                structure = _build_structure(cls, little_endian)
+                cache[little_endian] = structure
+    return structure
+
+
+def _build_structure(cls: type[structdataclass.StructDataclass], little_endian: bool) -> type[ctypes.Structure]:
+    """
+    Create the ctypes.Structure class of a StructDataclass class, see `ctypes_type`
+
+    :param cls: StructDataclass subclass
+    :param little_endian: True for a LittleEndianStructure, else a BigEndianStructure
+    :return: ctypes.Structure subclass named `<class name>_ctypes`
+    :raises TypeError: If ctypes can't reproduce the layout of the class
+    """
+    layout = cls.__struct_layout__
+    fields: list[tuple[Any, ...]] | None = None
+    if issubclass(cls, bitstype.BitsType):
+        fields = _bit_fields(cls, little_endian)  # type: ignore[assignment]
+    if fields is None:
+        fields = []
+        for state in layout.states:
+            c_type = _state_ctype(state, little_endian)
+            fields.append((state.name, c_type * state.size if state.size > 1 else c_type))
+
+    namespace: dict[str, Any] = {
+        "__module__": cls.__module__,
+        "__qualname__": f"{cls.__qualname__}_ctypes",
+        "__struct_class__": cls,
+        "__struct_little_endian__": little_endian,
+    }
+    if cls.__struct_align__ != structdataclass.NATURAL_ALIGNMENT:
+        namespace["_pack_"] = cls.__struct_align__
+        namespace["_layout_"] = "ms"
+    namespace["_fields_"] = fields
+    structure = type(f"{cls.__name__}_ctypes", (_BASES[little_endian],), namespace)
+
+    if ctypes.sizeof(structure) != layout.byte_length or any(
+        getattr(structure, state.name).offset != state.offset
+        for state in layout.states
+        if state.name in structure.__dict__
+    ):
+        raise TypeError(f"ctypes can not reproduce the layout of {cls.__name__} on this platform")
+    return structure
@@ -0,0 +1,353 @@
+"""
+fieldpath: Offsets of single fields of StructDataclass layouts, and reading them straight from buffers.
+
+Fields are addressed with paths like `seq`, `header.msg_type`, `samples[3]` or `step_color[2].r`. The attributes
+of BitsType classes can be addressed as well, for example `flags.autolights` or `panel_mask.steps[4]`.
+"""
+
+import re
+import struct
+from collections.abc import Buffer, Iterable
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from pystructtype import structdataclass
+from pystructtype.utils import class_cached
+
+_PATH_ITEM = re.compile(r"(\w+)(?:\[(\d+)\])?")
+
+
+@dataclass(frozen=True)
+class FieldInfo:
+    """
+    Location and format of a single field of a StructDataclass, relative to the start of the struct.
+    """
+
+    path: str
+    offset: int
+    """Byte offset of the field from the start of the struct"""
+    byte_size: int
+    """Byte size of the field"""
+    struct_fmt: str
+    """Struct format of the field, without a byte order"""
+    count: int
+    """Number of items of the field, 1 unless the path names a whole list"""
+    state: structdataclass.StructState
+    """StructState of the attribute the path ends in"""
+    is_list: bool = False
+    """True if the path names a whole list attribute"""
+    struct_class: type[structdataclass.StructDataclass] | None = None
+    """The nested StructDataclass class, if the field is one (or a list of them)"""
+    masks: tuple[int, ...] | None = None
+    """Bit masks of the field in the integer, if the field is an attribute of a BitsType"""
+    big_endian_struct: struct.Struct | None = None
+    little_endian_struct: struct.Struct | None = None
+
+    def get_struct(self, little_endian: bool) -> struct.Struct:
+        """
+        Return the precompiled struct.Struct of the field for the requested endianness
+
+        :param little_endian: True for the little endian struct, else the big endian struct
+        :return: precompiled struct.Struct object
+        """
+        _struct = self.little_endian_struct if little_endian else self.big_endian_struct
+        assert _struct is not None
+        return _struct
+
+    @property
+    def is_primitive(self) -> bool:
+        """
+        :return: True if the field is unpacked directly into its value(s), without any conversion
+        """
+        return self.struct_class is None and (self.state.array_typecode is None or not self.is_list)
+
+    def convert(self, values: tuple[Any, ...]) -> Any:
+        """
+        Convert the values unpacked with the struct of a primitive field into the value of the field
+
+        :param values: Unpacked values of the field
+        :return: Value of the field
+        """
+        if self.masks is not None:
+            bits = [values[0] & mask != 0 for mask in self.masks]
+            return bits if self.is_list else bits[0]
+        if self.is_list:
+            return list(values)
+        return values[0]
+
+    def read(self, buffer: Buffer, offset: int = 0, little_endian: bool = False) -> Any:
+        """
+        Read the value of the field from a buffer holding a struct
+
+        :param buffer: Buffer holding the struct
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if the data is little endian, else False
+        :return: Value of the field. Nested StructDataclasses are returned as new decoded instances.
+        :raises ValueError: If the buffer does not hold the field
+        """
+        position = offset + self.offset
+        try:
+            if self.struct_class is not None:
+                layout = self.struct_class.__struct_layout__
+                factory = self.struct_class.__struct_factory__
+                if not self.is_list:
+                    return factory(layout.unpack_from(buffer, position, little_endian))
+                return [
+                    factory(layout.unpack_from(buffer, position + idx * layout.byte_length, little_endian))
+                    for idx in range(self.count)
+                ]
+            if not self.is_primitive:
+                end = position + self.byte_size
+                if position < 0 or end > memoryview(buffer).nbytes:
+                    raise struct.error(f"unpack requires a buffer of at least {end} bytes")
+                return self.state.load_array(memoryview(buffer).cast("B")[position:end], little_endian)
+            return self.convert(self.get_struct(little_endian).unpack_from(buffer, position))
+        except struct.error as e:
+            raise ValueError(f"Unable to read field {self.path} at offset {position}: {e}") from e
+
+    def write(self, buffer: Buffer, value: Any, offset: int = 0, little_endian: bool = False) -> None:
+        """
+        Write the value of the field in place into a writable buffer holding a struct
+
+        Only the bytes of the field are written. BitsType attributes read the containing integer, update
+        the bits of the attribute and write the integer back.
+
+        :param buffer: Writable buffer holding the struct
+        :param value: New value of the field. Nested StructDataclasses are given as instances of their class.
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if the data is little endian, else False
+        :raises ValueError: If the buffer does not hold the field, or the value does not fit the field
+        """
+        position = offset + self.offset
+        try:
+            if self.struct_class is not None:
+                layout = self.struct_class.__struct_layout__
+                items = value if self.is_list else [value]
+                if len(items) != self.count:
+                    raise ValueError(f"Field {self.path} expects {self.count} items, got {len(items)}")
+                for idx, item in enumerate(items):
+                    layout.pack_into(buffer, position + idx * layout.byte_length, item._encode(), little_endian)
+            elif not self.is_primitive:
+                data = self.state.dump_array(value, little_endian)
+                with memoryview(buffer) as view, view.cast("B") as raw:
+                    if position < 0 or position + len(data) > raw.nbytes:
+                        raise struct.error(f"pack_into requires a buffer of at least {position + len(data)} bytes")
+                    raw[position : position + len(data)] = data
+            elif self.masks is not None:
+                _struct = self.get_struct(little_endian)
+                bits = list(value) if self.is_list else [value]
+                if len(bits) != len(self.masks):
+                    raise ValueError(f"Field {self.path} expects {len(self.masks)} bits, got {len(bits)}")
+                raw = _struct.unpack_from(buffer, position)[0]
+                for mask, bit in zip(self.masks, bits, strict=True):
+                    raw = raw | mask if bit else raw & ~mask
+                _struct.pack_into(buffer, position, raw)
+            elif self.is_list:
+                self.get_struct(little_endian).pack_into(buffer, position, *value)
+            else:
+                self.get_struct(little_endian).pack_into(buffer, position, value)
+        except struct.error as e:
+            raise ValueError(f"Unable to write field {self.path} at offset {position}: {e}") from e
+
+
+def _primitive_info(
+    path: str,
+    state: structdataclass.StructState,
+    offset: int,
+    count: int,
+    is_list: bool,
+    masks: tuple[int, ...] | None = None,
+) -> FieldInfo:
+    """
+    Create the FieldInfo of a primitive attribute, a single item of it, or bits of it
+
+    :param path: Path of the field
+    :param state: StructState of the attribute
+    :param offset: Byte offset of the attribute (or item) from the start of the struct
+    :param count: Number of items to read
+    :param is_list: True if the value of the field is a list
+    :param masks: Bit masks if the field is an attribute of a BitsType
+    :return: FieldInfo of the field
+    """
+    item_fmt = f"{state.chunk_size if state.chunk_size > 1 else ''}{state.struct_fmt}"
+    fmt = structdataclass.simplify_format(item_fmt * count)
+    return FieldInfo(
+        path,
+        offset,
+        state.byte_size * count,
+        fmt,
+        count,
+        state,
+        is_list=is_list,
+        masks=masks,
+        big_endian_struct=struct.Struct(">" + fmt),
+        little_endian_struct=struct.Struct("<" + fmt),
+    )
+
+
+def resolve_field(cls: type[structdataclass.StructDataclass], path: str) -> FieldInfo:
+    """
+    Find the location and format of a field of a StructDataclass class.
+
+    Resolved fields are cached on the class.
+
+    :param cls: StructDataclass subclass
+    :param path: Path of the field, like `seq`, `header.msg_type`, `samples[3]` or `flags.autolights`
+    :return: FieldInfo of the field
+    :raises KeyError: If the path does not name a field of the class
+    """
+    cache: dict[str, FieldInfo] = class_cached(cls, "__struct_fields__", dict)
+    if (cached := cache.get(path)) is not None:
+        return cached
+
+    current: type[structdataclass.StructDataclass] = cls
+    offset = 0
+    parts = path.split(".")
+    for part_idx, part in enumerate(parts):
+        last = part_idx == len(parts) - 1
+        if (match := _PATH_ITEM.fullmatch(part)) is None:
+            raise KeyError(f"Invalid field path {path}")
+        name, index_str = match.groups()
+        index = int(index_str) if index_str is not None else None
+
+        bits = getattr(current, "__bits_definition__", None)
+        if bits is not None and name in bits and last:
+            # Attributes of a BitsType are bits of its _raw integer
+            raw_state = current.__struct_layout__.states_by_name["_raw"]
+            bit = bits[name]
+            if index is not None:
+                if not isinstance(bit, list) or index >= len(bit):
+                    raise KeyError(f"Invalid index in field path {path}")
+                bit = bit[index]
+            masks = tuple(1 << b for b in bit) if isinstance(bit, list) else (1 << bit,)
+            info = _primitive_info(path, raw_state, offset + raw_state.offset, 1, isinstance(bit, list), masks)
+            break
+
+        state = current.__struct_layout__.states_by_name.get(name)
+        if state is None:
+            raise KeyError(f"{current.__name__} has no field {name} in field path {path}")
+        item_offset = offset + state.offset
+        if index is not None:
+            if state.size == 1 or index >= state.size:
+                raise KeyError(f"Invalid index in field path {path}")
+            item_offset += index * state.byte_size
+
+        if state.struct_class is not None and (index is not None or state.size == 1):
+            if not last:
+                current = state.struct_class
+                offset = item_offset
+                continue
+            layout = state.struct_class.__struct_layout__
+            info = FieldInfo(
+                path, item_offset, layout.byte_length, layout.struct_fmt, 1, state, struct_class=state.struct_class
+            )
+        elif not last:
+            raise KeyError(f"{name} is not a nested StructDataclass in field path {path}")
+        elif state.struct_class is not None:
+            info = FieldInfo(
+                path,
+                item_offset,
+                state.byte_size * state.size,
+                structdataclass.simplify_format(state.struct_fmt * state.size),
+                state.size,
+                state,
+                is_list=True,
+                struct_class=state.struct_class,
+            )
+        elif index is not None:
+            info = _primitive_info(path, state, item_offset, 1, False)
+        else:
+            info = _primitive_info(path, state, item_offset, state.size, state.size > 1)
+        break
+
+    cache[path] = info
+    return info
+
+
+def field_table(cls: type[structdataclass.StructDataclass]) -> MappingProxyType[str, FieldInfo]:
+    """
+    Build the offset table of a StructDataclass class.
+
+    The table holds every attribute, every item of lists of nested StructDataclasses, and every field inside
+    nested StructDataclasses (including BitsType attributes) by path. Items of primitive lists are not listed,
+    but can still be resolved with paths like `samples[3]`.
+
+    :param cls: StructDataclass subclass
+    :return: Read-only mapping of path to FieldInfo, in layout order
+    """
+    table: dict[str, FieldInfo] = {}
+
+    def add(current: type[structdataclass.StructDataclass], prefix: str) -> None:
+        for key in getattr(current, "__bits_definition__", {}):
+            table[prefix + key] = resolve_field(cls, prefix + key)
+        for state in current.__struct_layout__.states:
+            path = prefix + state.name
+            table[path] = resolve_field(cls, path)
+            if state.struct_class is None:
+                continue
+            if state.size == 1:
+                add(state.struct_class, path + ".")
+                continue
+            for idx in range(state.size):
+                table[f"{path}[{idx}]"] = resolve_field(cls, f"{path}[{idx}]")
+                add(state.struct_class, f"{path}[{idx}].")
+
+    add(cls, "")
+    return MappingProxyType(table)
+
+
+class FieldReader:
+    """
+    Reads a fixed set of fields of a StructDataclass from buffers, without decoding the rest of the struct.
+
+    If the fields don't overlap and don't need any conversion (nested StructDataclasses or array backed lists),
+    they are all read with a single precompiled struct.Struct that skips the bytes in between them.
+    """
+
+    def __init__(self, cls: type[structdataclass.StructDataclass], paths: Iterable[str], little_endian: bool = False):
+        """
+        :param cls: StructDataclass subclass
+        :param paths: Paths of the fields to read
+        :param little_endian: True if the data is little endian, else False
+        :raises KeyError: If a path does not name a field of the class
+        """
+        self.fields = tuple(resolve_field(cls, path) for path in paths)
+        self.little_endian = little_endian
+        self._struct: struct.Struct | None = None
+        self._slices: tuple[tuple[FieldInfo, int, int], ...] = ()
+
+        ordered = sorted(range(len(self.fields)), key=lambda idx: self.fields[idx].offset)
+        fmt = ""
+        position = 0
+        value_idx = 0
+        slices: list[tuple[FieldInfo, int, int] | None] = [None] * len(self.fields)
+        for idx in ordered:
+            info = self.fields[idx]
+            if not info.is_primitive or info.offset < position:
+                return
+            if padding := info.offset - position:
+                fmt += f"{padding}x"
+            fmt += info.struct_fmt
+            slices[idx] = (info, value_idx, value_idx + info.count)
+            value_idx += info.count
+            position = info.offset + info.byte_size
+        self._struct = struct.Struct(("<" if little_endian else ">") + fmt)
+        self._slices = tuple(s for s in slices if s is not None)
+
+    def __call__(self, buffer: Buffer, offset: int = 0) -> tuple[Any, ...]:
+        """
+        Read the fields from a buffer holding a struct
+
+        :param buffer: Buffer holding the struct
+        :param offset: Byte offset in the buffer where the struct starts
+        :return: Tuple of the values of the fields, in the order of the paths
+        :raises ValueError: If the buffer does not hold the fields
+        """
+        if self._struct is None:
+            return tuple(info.read(buffer, offset, self.little_endian) for info in self.fields)
+        try:
+            values = self._struct.unpack_from(buffer, offset)
+        except struct.error as e:
+            raise ValueError(f"Unable to read fields at offset {offset}: {e}") from e
+        return tuple(info.convert(values[start:end]) for info, start, end in self._slices)
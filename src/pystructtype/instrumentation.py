@@ -0,0 +1,535 @@
+"""
+instrumentation: Opt-in per-class counters of decode and encode calls.
+
+Counting is off by default and then costs nothing, as the decode and encode functions are left untouched.
+Enabling it replaces them with wrappers that count the calls, records, bytes, time and errors per class,
+and disabling it puts the original functions back. Counting is enabled for the whole process by setting the
+`PYSTRUCTTYPE_STATS` environment variable, or for a block of code with `collect_stats()`.
+
+Only the outermost call is counted: a batch decode counts its records once, and not the single record
+decodes it is made of. Nested StructDataclasses and BitsTypes are counted as part of their parent.
+"""
+
+import inspect
+import os
+import threading
+import weakref
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter_ns
+from typing import Any
+
+from pystructtype import structdataclass
+
+ENVIRONMENT_VARIABLE = "PYSTRUCTTYPE_STATS"
+"""Environment variable enabling the counters on import, when set to anything but an empty string or 0"""
+
+_DECODE = 0
+_ENCODE = 1
+"""Indexes of the decode and encode counters in the counters of a class"""
+
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+"""
+Per-thread state: the `active` flag, set while an instrumented call runs so nested calls are not counted again,
+and the `counters` of the thread
+"""
+
+type _StructClass = type[structdataclass.StructDataclass]
+type _Arguments = dict[str, Any]
+"""Arguments of a call by parameter name, including the defaults of the parameters that were left out"""
+type _ClassCounters = dict[_StructClass, tuple[_Counters, _Counters]]
+"""Counters by class, the decode and then the encode counters"""
+
+_THREAD_COUNTERS: list[_ClassCounters] = []
+"""
+Counters of every thread. Every thread only updates its own counters, so counting doesn't need a lock,
+and the counters of all threads are added up by `stats`.
+"""
+
+_RETIRED: _ClassCounters = {}
+"""Counters of threads that are gone"""
+
+_ORIGINALS: list[tuple[Any, str, Any]] = []
+"""List of (owner, attribute name, original value) of every function replaced while counting is enabled"""
+
+_ENABLED = 0
+"""Number of `enable_stats` calls without a matching `disable_stats`"""
+
+
+@dataclass(frozen=True)
+class OperationStats:
+    """
+    Counters of the decode or encode calls of a class.
+    """
+
+    calls: int = 0
+    records: int = 0
+    """Number of records decoded or encoded, a batch call counts all of its records"""
+    bytes: int = 0
+    errors: int = 0
+    """Number of calls that raised an exception"""
+    total_time: float = 0.0
+    """Seconds spent in all calls, summed over all threads"""
+    max_time: float = 0.0
+    """Seconds spent in the slowest call"""
+
+
+@dataclass(frozen=True)
+class StructStats:
+    """
+    Counters of a StructDataclass class.
+    """
+
+    decode: OperationStats
+    encode: OperationStats
+
+
+class _Counters:
+    """
+    Counters of the decode or encode calls of a class in one thread.
+    """
+
+    __slots__ = ("calls", "errors", "max_ns", "records", "total_ns")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.records = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, records: int, elapsed: int, failed: bool) -> None:
+        """
+        Add a call
+
+        :param records: Number of records decoded or encoded by the call
+        :param elapsed: Nanoseconds spent in the call
+        :param failed: True if the call raised an exception
+        """
+        self.calls += 1
+        self.records += records
+        self.errors += failed
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+
+    def merge(self, other: _Counters) -> None:
+        """
+        Add the counters of another thread, the max times are combined with max
+
+        :param other: Counters to add
+        """
+        self.calls += other.calls
+        self.records += other.records
+        self.errors += other.errors
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def copy(self) -> _Counters:
+        """
+        :return: Copy of the counters
+        """
+        counters = _Counters()
+        counters.merge(self)
+        return counters
+
+    def to_stats(self, byte_length: int) -> OperationStats:
+        """
+        :param byte_length: Size of a record of the class in bytes
+        :return: OperationStats of the counters
+        """
+        return OperationStats(
+            self.calls,
+            self.records,
+            self.records * byte_length,
+            self.errors,
+            self.total_ns / 1e9,
+            self.max_ns / 1e9,
+        )
+
+
+def _merge(total: tuple[_Counters, _Counters], counters: tuple[_Counters, _Counters]) -> None:
+    """
+    Add the decode and encode counters of a class to other counters of the class
+
+    :param total: Counters to add to
+    :param counters: Counters to add
+    """
+    total[_DECODE].merge(counters[_DECODE])
+    total[_ENCODE].merge(counters[_ENCODE])
+
+
+def _retire(counters: _ClassCounters) -> None:
+    """
+    Move the counters of a thread that is gone into the retired counters
+
+    :param counters: Counters of the thread
+    """
+    with _LOCK:
+        for idx, thread_counters in enumerate(_THREAD_COUNTERS):
+            if thread_counters is counters:
+                del _THREAD_COUNTERS[idx]
+                break
+        for cls, values in counters.items():
+            if (total := _RETIRED.get(cls)) is None:
+                _RETIRED[cls] = values
+            else:
+                _merge(total, values)
+
+
+def _thread_counters() -> _ClassCounters:
+    """
+    :return: Counters of the current thread, created on first use
+    """
+    try:
+        counters: _ClassCounters = _LOCAL.counters
+    except AttributeError:
+        counters = _LOCAL.counters = {}
+        with _LOCK:
+            _THREAD_COUNTERS.append(counters)
+        # Threads of short-lived pools would add up, so their counters are kept together once they are gone
+        weakref.finalize(threading.current_thread(), _retire, counters)
+    return counters
+
+
+def _count(cls: _StructClass, kind: int, records: int, elapsed: int, failed: bool) -> None:
+    """
+    Add a call to the counters of a class
+
+    :param cls: StructDataclass class
+    :param kind: _DECODE or _ENCODE
+    :param records: Number of records decoded or encoded by the call
+    :param elapsed: Nanoseconds spent in the call
+    :param failed: True if the call raised an exception
+    """
+    thread_counters = _thread_counters()
+    if (counters := thread_counters.get(cls)) is None:
+        counters = thread_counters[cls] = (_Counters(), _Counters())
+    counters[kind].add(records, elapsed, failed)
+
+
+def _binder(func: Callable[..., Any]) -> Callable[[tuple[Any, ...], dict[str, Any]], _Arguments | None]:
+    """
+    Create a function binding the arguments of calls of a function to its parameter names
+
+    :param func: Function whose calls are bound
+    :return: Function taking the positional and keyword arguments of a call, and returning the arguments by name,
+        or None if they don't match the signature of the function
+    """
+    signature = inspect.signature(func)
+    parameters = signature.parameters
+    names = tuple(parameters)
+    defaults = {name: value.default for name, value in parameters.items() if value.default is not value.empty}
+    # Plain positional calls can be bound by zipping the parameter names, without the full binding
+    simple = all(value.kind is value.POSITIONAL_OR_KEYWORD for value in parameters.values())
+    required = len(names) - len(defaults)
+
+    def bind(args: tuple[Any, ...], kwargs: dict[str, Any]) -> _Arguments | None:
+        if simple and not kwargs and required <= len(args) <= len(names):
+            return defaults | dict(zip(names, args, strict=False))
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError:
+            return None
+        bound.apply_defaults()
+        return bound.arguments
+
+    return bind
+
+
+def _counted_call(
+    func: Callable[..., Any],
+    kind: int,
+    struct_class: Callable[[_Arguments], _StructClass],
+    records: Callable[[_Arguments, Any], int],
+) -> Callable[..., Any]:
+    """
+    Wrap a function to count its calls
+
+    :param func: Function to wrap
+    :param kind: _DECODE or _ENCODE
+    :param struct_class: Function returning the StructDataclass class from the arguments of a call
+    :param records: Function returning the number of records from the arguments and result of a call
+    :return: Wrapped function
+    """
+    bind = _binder(func)
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if getattr(_LOCAL, "active", False):
+            return func(*args, **kwargs)
+        _LOCAL.active = True
+        start = perf_counter_ns()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            # Calls that don't match the signature have no class to count them for
+            if (arguments := bind(args, kwargs)) is not None:
+                _count(struct_class(arguments), kind, 0, perf_counter_ns() - start, True)
+            raise
+        finally:
+            _LOCAL.active = False
+        elapsed = perf_counter_ns() - start
+        if (arguments := bind(args, kwargs)) is not None:
+            _count(struct_class(arguments), kind, records(arguments, result), elapsed, False)
+        return result
+
+    return wrapper
+
+
+def _counted_records(cls: _StructClass, iterator: Iterator[Any]) -> Generator[Any]:
+    """
+    Count the records decoded by an iterator as a single decode call, once the iterator is done
+
+    :param cls: StructDataclass class of the records
+    :param iterator: Iterator decoding the records
+    :return: Generator yielding the records of the iterator
+    """
+    records = elapsed = 0
+    failed = False
+    try:
+        while True:
+            start = perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed += perf_counter_ns() - start
+            records += 1
+            yield item
+    finally:
+        _count(cls, _DECODE, records, elapsed, failed)
+
+
+def _counted_iterator(func: Callable[..., Iterator[Any]], struct_class: Callable[[_Arguments], _StructClass]) -> Any:
+    """
+    Wrap a function returning an iterator of decoded records to count them
+
+    :param func: Function to wrap
+    :param struct_class: Function returning the StructDataclass class from the arguments of a call
+    :return: Wrapped function
+    """
+    bind = _binder(func)
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        if getattr(_LOCAL, "active", False):
+            return func(*args, **kwargs)
+        start = perf_counter_ns()
+        try:
+            iterator = func(*args, **kwargs)
+        except Exception:
+            if (arguments := bind(args, kwargs)) is not None:
+                _count(struct_class(arguments), _DECODE, 0, perf_counter_ns() - start, True)
+            raise
+        if (arguments := bind(args, kwargs)) is None:
+            return iterator
+        return _counted_records(struct_class(arguments), iterator)
+
+    return wrapper
+
+
+def _uncounted(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a function so the instrumented calls it makes are not counted, as its caller counts them
+
+    :param func: Function to wrap
+    :return: Wrapped function
+    """
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        active = getattr(_LOCAL, "active", False)
+        _LOCAL.active = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _LOCAL.active = active
+
+    return wrapper
+
+
+def _self_type(arguments: _Arguments) -> _StructClass:
+    return type(arguments["self"])
+
+
+def _cls(arguments: _Arguments) -> _StructClass:
+    return arguments["cls"]  # type: ignore[no-any-return]
+
+
+def _one(_arguments: _Arguments, _result: Any) -> int:
+    return 1
+
+
+def _length(_arguments: _Arguments, result: Any) -> int:
+    return len(result)
+
+
+def _instrumented() -> list[tuple[Any, str, Any]]:
+    """
+    :return: List of (owner, attribute name, instrumented value) of every function to replace
+    """
+    from pystructtype import parallel, reader, records
+
+    struct_dataclass = structdataclass.StructDataclass
+    methods = vars(struct_dataclass)
+
+    def classmethod_call(name: str, kind: int, count: Callable[[_Arguments, Any], int]) -> classmethod[Any, ..., Any]:
+        return classmethod(_counted_call(methods[name].__func__, kind, _cls, count))
+
+    def classmethod_iterator(name: str) -> classmethod[Any, ..., Any]:
+        return classmethod(_counted_iterator(methods[name].__func__, _cls))
+
+    def decode_parallel_records(arguments: _Arguments, _result: Any) -> int:
+        return parallel.source_records(arguments["cls"], arguments["source"], arguments["offset"], arguments["count"])
+
+    return [
+        (struct_dataclass, "decode", _counted_call(methods["decode"], _DECODE, _self_type, _one)),
+        (struct_dataclass, "decode_from", _counted_call(methods["decode_from"], _DECODE, _self_type, _one)),
+        (struct_dataclass, "decode_record", classmethod_call("decode_record", _DECODE, _one)),
+        (struct_dataclass, "decode_many", classmethod_call("decode_many", _DECODE, _length)),
+        (struct_dataclass, "iter_decode", classmethod_iterator("iter_decode")),
+        (struct_dataclass, "iter_records", classmethod_iterator("iter_records")),
+        (struct_dataclass, "encode", _counted_call(methods["encode"], _ENCODE, _self_type, _one)),
+        (struct_dataclass, "encode_into", _counted_call(methods["encode_into"], _ENCODE, _self_type, _one)),
+        (
+            records.StructRecord,
+            "encode",
+            _counted_call(
+                records.StructRecord.encode, _ENCODE, lambda arguments: arguments["self"].__struct_class__, _one
+            ),
+        ),
+        (
+            reader.StructReader,
+            "__iter__",
+            _counted_iterator(reader.StructReader.__iter__, lambda arguments: arguments["self"].cls),
+        ),
+        (reader, "_decode_pending", _counted_call(reader._decode_pending, _DECODE, _cls, _length)),
+        # The chunks of the thread pools are counted in the threads decoding and encoding them
+        (
+            parallel,
+            "_decode_chunk",
+            _counted_call(parallel._decode_chunk, _DECODE, _cls, lambda arguments, _result: arguments["count"]),
+        ),
+        (
+            parallel,
+            "_encode_chunk",
+            _counted_call(
+                parallel._encode_chunk,
+                _ENCODE,
+                lambda arguments: type(arguments["items"][0]),
+                lambda arguments, _result: len(arguments["items"]),
+            ),
+        ),
+        # Worker processes don't share the counters, so decode_parallel is counted by the calling process
+        (
+            parallel,
+            "decode_parallel",
+            _counted_call(parallel.decode_parallel, _DECODE, _cls, decode_parallel_records),
+        ),
+        (parallel, "_decode_shared", _uncounted(parallel._decode_shared)),
+        (parallel, "_decode_file", _uncounted(parallel._decode_file)),
+    ]
+
+
+def enable_stats() -> None:
+    """
+    Start counting decode and encode calls in every thread.
+
+    Calls can be nested, counting stops once `disable_stats` was called as many times as `enable_stats`.
+    """
+    global _ENABLED
+    with _LOCK:
+        _ENABLED += 1
+        if _ENABLED > 1:
+            return
+        for owner, name, value in _instrumented():
+            _ORIGINALS.append((owner, name, vars(owner)[name]))
+            setattr(owner, name, value)
+
+
+def disable_stats() -> None:
+    """
+    Stop counting decode and encode calls, undoing a call to `enable_stats`. The counters are kept.
+    """
+    global _ENABLED
+    with _LOCK:
+        if not _ENABLED:
+            return
+        _ENABLED -= 1
+        if _ENABLED:
+            return
+        while _ORIGINALS:
+            owner, name, value = _ORIGINALS.pop()
+            setattr(owner, name, value)
+
+
+def stats_enabled() -> bool:
+    """
+    :return: True if decode and encode calls are being counted
+    """
+    return _ENABLED > 0
+
+
+@contextmanager
+def collect_stats() -> Generator[None]:
+    """
+    Count decode and encode calls while the context is active.
+
+        with collect_stats():
+            ...
+        print(stats())
+    """
+    enable_stats()
+    try:
+        yield
+    finally:
+        disable_stats()
+
+
+def stats() -> dict[str, StructStats]:
+    """
+    Snapshot of the counters of every class that was decoded or encoded while counting was enabled.
+
+    Classes are named `<module>.<qualified name>`, the counters of classes with the same name are combined.
+
+    :return: dict of class names and their counters
+    """
+    with _LOCK:
+        snapshot = [dict(counters) for counters in (_RETIRED, *_THREAD_COUNTERS)]
+    combined: dict[str, tuple[_StructClass, tuple[_Counters, _Counters]]] = {}
+    for counters in snapshot:
+        for cls, values in counters.items():
+            if (total := combined.get(name := f"{cls.__module__}.{cls.__qualname__}")) is None:
+                # Copied, as the thread may still be counting
+                combined[name] = (cls, (values[_DECODE].copy(), values[_ENCODE].copy()))
+            else:
+                _merge(total[1], values)
+
+    return {
+        name: StructStats(
+            values[_DECODE].to_stats(cls.__struct_layout__.byte_length),
+            values[_ENCODE].to_stats(cls.__struct_layout__.byte_length),
+        )
+        for name, (cls, values) in sorted(combined.items())
+    }
+
+
+def reset_stats() -> None:
+    """
+    Reset the counters of every class.
+    """
+    with _LOCK:
+        for counters in (_RETIRED, *_THREAD_COUNTERS):
+            counters.clear()
+
+
+if os.environ.get(ENVIRONMENT_VARIABLE, "") not in ("", "0"):
+    enable_stats()
@@ -0,0 +1,164 @@
+"""
+lazy: Lazily decoded views of StructDataclass data.
+"""
+
+from collections.abc import Buffer
+from typing import Any
+
+from pystructtype import structdataclass
+
+
+class LazyStruct:
+    """
+    Lazily decoded view of a StructDataclass inside a buffer.
+
+    Only the buffer, the offset and the byte order are kept when the view is created. Each attribute
+    is unpacked on first access using the per attribute offsets of the compiled layout, and cached.
+    Nested StructDataclasses are returned as LazyStruct views themselves, unless their class defines
+    a custom `_decode`, in which case they are decoded fully so that `_decode` runs.
+
+    Attributes can be assigned, and `encode` will include the assigned values. Since the view reads
+    from the buffer, modifying the buffer also changes any attribute that has not been accessed yet.
+    """
+
+    __slots__ = ("_buffer", "_cache", "_cls", "_instance", "_little_endian", "_offset")
+
+    def __init__(
+        self,
+        cls: type[structdataclass.StructDataclass],
+        buffer: Buffer,
+        offset: int = 0,
+        little_endian: bool = False,
+    ) -> None:
+        """
+        :param cls: StructDataclass subclass of the data in the buffer
+        :param buffer: Buffer holding the data
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if the data is little endian, else False
+        :raises ValueError: If the buffer does not hold enough data after the offset
+        """
+        with memoryview(buffer) as view:
+            if view.nbytes - offset < cls.__struct_layout__.byte_length or offset < 0:
+                raise ValueError(
+                    f"Unable to decode {cls.__struct_layout__.byte_length} bytes at offset {offset} "
+                    f"from a buffer of {view.nbytes} bytes"
+                )
+        object.__setattr__(self, "_cls", cls)
+        object.__setattr__(self, "_buffer", buffer)
+        object.__setattr__(self, "_offset", offset)
+        object.__setattr__(self, "_little_endian", little_endian)
+        object.__setattr__(self, "_cache", {})
+        object.__setattr__(self, "_instance", None)
+
+    def _decode_item(self, state: structdataclass.StructState, offset: int) -> Any:
+        """
+        Decode a single item of a nested StructDataclass attribute
+
+        :param state: StructState of the attribute
+        :param offset: Byte offset of the item in the buffer
+        :return: LazyStruct view of the item, or a fully decoded instance if it has a custom _decode
+        """
+        sub_cls = state.struct_class
+        assert sub_cls is not None
+        if sub_cls._decode is not structdataclass.StructDataclass._decode:
+            instance = sub_cls()
+            instance.decode_from(self._buffer, offset, self._little_endian)
+            return instance
+        return LazyStruct(sub_cls, self._buffer, offset, self._little_endian)
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Decode and cache the requested attribute on first access.
+
+        Attributes that are not part of the struct layout are read from a fully decoded instance.
+
+        :param name: Name of the attribute
+        :return: Value of the attribute
+        :raises AttributeError: If the attribute does not exist
+        """
+        if name.startswith("__") or name in LazyStruct.__slots__:
+            # Don't try to resolve special or uninitialized internal attributes through the struct
+            raise AttributeError(name)
+        if name in (cache := self._cache):
+            return cache[name]
+        state = self._cls.__struct_layout__.states_by_name.get(name)
+        if state is None:
+            return getattr(self.to_struct(), name)
+
+        offset = self._offset + state.offset
+        value: Any
+        if state.struct_class is not None:
+            if state.size == 1:
+                value = self._decode_item(state, offset)
+            else:
+                value = [self._decode_item(state, offset + idx * state.byte_size) for idx in range(state.size)]
+        elif state.array_typecode is not None:
+            end = offset + state.byte_size * state.size
+            value = state.load_array(memoryview(self._buffer).cast("B")[offset:end], self._little_endian)
+        elif state.size == 1:
+            value = state.get_struct(self._little_endian).unpack_from(self._buffer, offset)[0]
+        else:
+            value = list(state.get_struct(self._little_endian).unpack_from(self._buffer, offset))
+        cache[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Assign a struct attribute. The value is used by `encode` and `to_struct`.
+
+        :param name: Name of the attribute
+        :param value: New value of the attribute
+        :raises AttributeError: If the attribute is not part of the struct layout
+        """
+        if name not in self._cls.__struct_layout__.states_by_name:
+            raise AttributeError(f"{self._cls.__name__} has no struct attribute {name}")
+        self._cache[name] = value
+
+    def __repr__(self) -> str:
+        return f"LazyStruct({self._cls.__name__}, offset={self._offset}, little_endian={self._little_endian})"
+
+    @staticmethod
+    def _materialize(value: Any) -> Any:
+        """
+        Convert a cached value into a value that can be assigned to a StructDataclass instance
+
+        :param value: Cached attribute value
+        :return: The value with any LazyStruct views converted to StructDataclass instances
+        """
+        if isinstance(value, LazyStruct):
+            return value.to_struct()
+        if isinstance(value, list):
+            return [LazyStruct._materialize(v) for v in value]
+        return value
+
+    def to_struct(self) -> structdataclass.StructDataclass:
+        """
+        Fully decode the data into a StructDataclass instance, including any assigned attributes.
+
+        :return: Decoded StructDataclass instance
+        """
+        instance = self._instance
+        if instance is None:
+            instance = self._cls()
+            instance.decode_from(self._buffer, self._offset, self._little_endian)
+            object.__setattr__(self, "_instance", instance)
+        for name, value in self._cache.items():
+            setattr(instance, name, self._materialize(value))
+        return instance
+
+    def encode(self, little_endian: bool | None = None) -> bytes:
+        """
+        Encode the data of this view into bytes.
+
+        If no attribute has been accessed or assigned, the raw bytes are returned without decoding.
+
+        :param little_endian: True if encoding little_endian formatted data, else False.
+            Defaults to the byte order of the view.
+        :return: encoded bytes
+        """
+        if little_endian is None:
+            little_endian = self._little_endian
+        if not self._cache and little_endian == self._little_endian:
+            end = self._offset + self._cls.__struct_layout__.byte_length
+            return memoryview(self._buffer).cast("B")[self._offset : end].tobytes()
+        return self.to_struct().encode(little_endian)
@@ -0,0 +1,109 @@
+"""
+numpy_support: Optional NumPy integration for columnar access to StructDataclass records.
+
+NumPy is not a dependency of pystructtype, this module can only be imported if it is installed.
+"""
+
+from collections.abc import Buffer
+from typing import Any
+
+from pystructtype import structdataclass
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError("NumPy support requires the numpy package to be installed (pip install numpy)") from e
+
+
+_NUMPY_FORMATS = {
+    "b": "i1",
+    "B": "u1",
+    "h": "i2",
+    "H": "u2",
+    "i": "i4",
+    "I": "u4",
+    "q": "i8",
+    "Q": "u8",
+    "?": "?",
+    "f": "f4",
+    "d": "f8",
+    "c": "S1",
+}
+"""Mapping of struct format characters to NumPy dtype strings, without a byte order"""
+
+
+def _state_dtype(state: structdataclass.StructState, byte_order: str) -> np.dtype[Any]:
+    """
+    Build the dtype of a single item of a StructState
+
+    :param state: StructState to build the dtype for
+    :param byte_order: "<" or ">"
+    :return: NumPy dtype of a single item
+    """
+    if state.layout is not None:
+        return layout_dtype(state.layout, byte_order == "<")
+    if state.struct_fmt == "s":
+        return np.dtype(f"S{state.chunk_size}")
+    return np.dtype(byte_order + _NUMPY_FORMATS[state.struct_fmt])
+
+
+def layout_dtype(layout: structdataclass.StructLayout, little_endian: bool = False) -> np.dtype[Any]:
+    """
+    Build a NumPy structured dtype matching a compiled StructDataclass layout.
+
+    List attributes become subarray fields, and nested StructDataclasses become nested structured dtypes.
+
+    :param layout: Compiled StructDataclass layout
+    :param little_endian: True for a little endian dtype, else big endian
+    :return: NumPy structured dtype
+    """
+    byte_order = "<" if little_endian else ">"
+    formats: list[Any] = []
+    for state in layout.states:
+        dt = _state_dtype(state, byte_order)
+        formats.append((dt, (state.size,)) if state.size > 1 else dt)
+    return np.dtype(
+        {
+            "names": [state.name for state in layout.states],
+            "formats": formats,
+            "offsets": [state.offset for state in layout.states],
+            "itemsize": layout.byte_length,
+        }
+    )
+
+
+def to_dtype(cls: type[structdataclass.StructDataclass], little_endian: bool = False) -> np.dtype[Any]:
+    """
+    Build a NumPy structured dtype for the given StructDataclass class.
+
+    :param cls: StructDataclass subclass
+    :param little_endian: True for a little endian dtype, else big endian
+    :return: NumPy structured dtype
+    """
+    return layout_dtype(cls.__struct_layout__, little_endian)
+
+
+def to_numpy(
+    cls: type[structdataclass.StructDataclass],
+    buffer: Buffer,
+    little_endian: bool = False,
+    offset: int = 0,
+    count: int | None = None,
+) -> np.ndarray[Any, np.dtype[Any]]:
+    """
+    View back-to-back records of the given class in a buffer as a NumPy structured array.
+
+    The array is created with `np.frombuffer`, so no data is copied and the array shares memory with the buffer.
+    Any trailing bytes that don't form a complete record are ignored.
+
+    :param cls: StructDataclass subclass of the records
+    :param buffer: Buffer holding the records
+    :param little_endian: True if the records are little endian, else False
+    :param offset: Byte offset in the buffer where the first record starts
+    :param count: Maximum number of records to view, or None for all complete records
+    :return: NumPy structured array of the records
+    """
+    records, _ = cls.record_count(buffer, offset)
+    if count is not None:
+        records = min(records, count)
+    return np.frombuffer(buffer, dtype=to_dtype(cls, little_endian), count=records, offset=offset)
@@ -0,0 +1,267 @@
+"""
+parallel: Decoding and encoding large batches of back-to-back records with pools of worker processes or threads.
+
+Worker processes get the records through `multiprocessing.shared_memory`, or by the path of a file every
+worker maps into memory, so only the results are pickled between the processes. Worker threads read the
+buffer in place, which scales across cores on free-threaded builds of Python.
+"""
+
+import mmap
+import os
+from collections.abc import Buffer, Callable, Iterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+from pystructtype import structdataclass
+
+
+def _decode_chunk(
+    cls: type[structdataclass.StructDataclass],
+    buffer: Buffer,
+    offset: int,
+    count: int,
+    little_endian: bool,
+    reducer: Callable[[Iterator[Any]], Any] | None,
+) -> Any:
+    """
+    Decode a range of records in a worker
+
+    :return: List of decoded instances, or the result of the reducer
+    """
+    items = cls.iter_decode(buffer, little_endian, offset, count)
+    return list(items) if reducer is None else reducer(items)
+
+
+def _decode_shared(
+    cls: type[structdataclass.StructDataclass],
+    name: str,
+    offset: int,
+    count: int,
+    little_endian: bool,
+    reducer: Callable[[Iterator[Any]], Any] | None,
+) -> Any:
+    """
+    Worker function decoding a range of records from shared memory
+
+    :param name: Name of the shared memory block
+    """
+    # The parent process owns the block, so don't register it with the resource tracker of the worker
+    shm = SharedMemory(name, track=False)
+    try:
+        # The buffer is only None once the block is closed
+        assert shm.buf is not None
+        return _decode_chunk(cls, shm.buf, offset, count, little_endian, reducer)
+    finally:
+        shm.close()
+
+
+def _decode_file(
+    cls: type[structdataclass.StructDataclass],
+    path: str,
+    offset: int,
+    count: int,
+    little_endian: bool,
+    reducer: Callable[[Iterator[Any]], Any] | None,
+) -> Any:
+    """
+    Worker function decoding a range of records from a memory mapped file
+
+    :param path: Path of the file
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return _decode_chunk(cls, mapped, offset, count, little_endian, reducer)
+
+
+def _split(count: int, chunks: int) -> list[tuple[int, int]]:
+    """
+    Split a number of records into contiguous, nearly equal ranges
+
+    :param count: Number of records
+    :param chunks: Maximum number of ranges
+    :return: List of (first record, number of records) per range
+    """
+    chunks = max(1, min(chunks, count))
+    size, extra = divmod(count, chunks)
+    ranges = []
+    start = 0
+    for idx in range(chunks):
+        length = size + (idx < extra)
+        ranges.append((start, length))
+        start += length
+    return ranges
+
+
+def _workers(workers: int | None) -> int:
+    """
+    :param workers: Requested number of workers, or None for the number of usable CPUs
+    :return: Number of workers
+    :raises ValueError: If workers is less than 1
+    """
+    if workers is None:
+        return os.process_cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    return workers
+
+
+def _gather(executor: Executor | None, pool: Executor, calls: list[tuple[Any, ...]]) -> list[Any]:
+    """
+    Run a function call per chunk in a pool and collect the results in order
+
+    :param executor: Executor given by the caller, which is left running
+    :param pool: Executor to submit the calls to, shut down afterwards if it is not the caller's executor
+    :param calls: List of (function, *args) per chunk
+    :return: List of the results per chunk
+    """
+    try:
+        futures = [pool.submit(*call) for call in calls]
+        return [future.result() for future in futures]
+    finally:
+        if executor is None:
+            pool.shutdown(cancel_futures=True)
+
+
+def source_records(
+    cls: type[structdataclass.StructDataclass],
+    source: Buffer | str | os.PathLike[str],
+    offset: int,
+    count: int | None,
+) -> int:
+    """
+    Count the complete records to decode from a buffer or file
+
+    :param source: Buffer holding the records, or the path of a file holding the records
+    :param offset: Byte offset in the buffer or file where the first record starts
+    :param count: Maximum number of records, or None for all complete records
+    :return: Number of records
+    """
+    if isinstance(source, (str, os.PathLike)):
+        byte_length = cls.__struct_layout__.byte_length
+        records = max(os.path.getsize(source) - offset, 0) // byte_length if byte_length else 0
+    else:
+        records, _ = cls.record_count(source, offset)
+    return records if count is None else min(records, count)
+
+
+def decode_parallel(
+    cls: type[structdataclass.StructDataclass],
+    source: Buffer | str | os.PathLike[str],
+    little_endian: bool,
+    offset: int,
+    count: int | None,
+    workers: int | None,
+    reducer: Callable[[Iterator[Any]], Any] | None,
+    executor: Executor | None,
+) -> list[Any]:
+    """
+    Decode back-to-back records split over a pool of worker processes. See `StructDataclass.decode_parallel`.
+    """
+    workers = _workers(workers)
+    byte_length = cls.__struct_layout__.byte_length
+    path = os.fspath(source) if isinstance(source, (str, os.PathLike)) else None
+    if not (records := source_records(cls, source, offset, count)):
+        return []
+
+    ranges = _split(records, workers)
+    shm: SharedMemory | None = None
+    try:
+        if path is not None:
+            worker: Callable[..., Any] = _decode_file
+            target = path
+        else:
+            # Copy the records into shared memory once, every worker attaches to it by name
+            shm = SharedMemory(create=True, size=records * byte_length)
+            assert shm.buf is not None
+            with memoryview(source) as view, view.cast("B") as data:  # type: ignore[arg-type]
+                shm.buf[: records * byte_length] = data[offset : offset + records * byte_length]
+            worker = _decode_shared
+            target = shm.name
+            offset = 0
+        calls = [
+            (worker, cls, target, offset + start * byte_length, length, little_endian, reducer)
+            for start, length in ranges
+        ]
+        results = _gather(executor, executor or ProcessPoolExecutor(len(ranges)), calls)
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    if reducer is not None:
+        return results
+    return [item for result in results for item in result]
+
+
+def decode_threaded(
+    cls: type[structdataclass.StructDataclass],
+    buffer: Buffer,
+    little_endian: bool,
+    offset: int,
+    count: int | None,
+    workers: int | None,
+    reducer: Callable[[Iterator[Any]], Any] | None,
+    executor: Executor | None,
+) -> list[Any]:
+    """
+    Decode back-to-back records split over a pool of threads. See `StructDataclass.decode_threaded`.
+    """
+    workers = _workers(workers)
+    byte_length = cls.__struct_layout__.byte_length
+    records, _ = cls.record_count(buffer, offset)
+    if count is not None:
+        records = min(records, count)
+    if not records:
+        return []
+
+    ranges = _split(records, workers)
+    calls = [
+        (_decode_chunk, cls, buffer, offset + start * byte_length, length, little_endian, reducer)
+        for start, length in ranges
+    ]
+    results = _gather(executor, executor or ThreadPoolExecutor(len(ranges)), calls)
+    if reducer is not None:
+        return results
+    return [item for result in results for item in result]
+
+
+def _encode_chunk(items: Sequence[structdataclass.StructDataclass], byte_length: int, little_endian: bool) -> bytes:
+    """
+    Encode a chunk of instances back-to-back in a worker thread
+
+    :param items: Instances to encode
+    :param byte_length: Byte length of a single encoded instance
+    :param little_endian: True if encoding little_endian formatted data, else False
+    :return: Encoded bytes of all instances
+    """
+    buffer = bytearray(len(items) * byte_length)
+    offset = 0
+    for item in items:
+        offset = item.encode_into(buffer, offset, little_endian)
+    return bytes(buffer)
+
+
+def encode_threaded(
+    cls: type[structdataclass.StructDataclass],
+    items: Sequence[structdataclass.StructDataclass],
+    little_endian: bool,
+    workers: int | None,
+    executor: Executor | None,
+) -> bytes:
+    """
+    Encode instances back-to-back split over a pool of threads. See `StructDataclass.encode_threaded`.
+    """
+    workers = _workers(workers)
+    # Subclasses can add attributes, which wouldn't fit the records of the buffer
+    if (wrong := next((item for item in items if type(item) is not cls), None)) is not None:
+        raise TypeError(f"Can not encode {type(wrong).__name__} as {cls.__name__}")
+    if not items:
+        return b""
+
+    byte_length = cls.__struct_layout__.byte_length
+    # Every thread encodes into its own buffer, the chunks are joined afterwards
+    calls = [
+        (_encode_chunk, items[start : start + length], byte_length, little_endian)
+        for start, length in _split(len(items), workers)
+    ]
+    return b"".join(_gather(executor, executor or ThreadPoolExecutor(len(calls)), calls))
@@ -0,0 +1,165 @@
+"""
+reader: Streaming decoding of StructDataclass records from file-like objects.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from typing import Protocol
+
+from pystructtype import structdataclass
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+"""Default number of bytes to read from the stream at once"""
+
+
+class ReadableStream(Protocol):
+    """
+    Binary stream that StructReader can read from.
+
+    Only `read` is required. Streams that also have a `readinto(buffer) -> int | None` method,
+    like regular files, are read with it instead to avoid copying every chunk.
+    """
+
+    def read(self, size: int, /) -> bytes:
+        """
+        :param size: Maximum number of bytes to read
+        :return: Bytes read, empty at the end of the stream
+        """
+        ...
+
+
+class StructReader[S: structdataclass.StructDataclass]:
+    """
+    Iterate over back-to-back records of a StructDataclass in a binary stream.
+
+    The stream is read in large chunks into a single reusable buffer with `readinto` (or `read` if the
+    stream has no `readinto`), and all complete records in the buffer are decoded before reading again.
+    Records split across two reads are handled, so any binary stream works: regular files, pipes,
+    `socket.makefile("rb")`, `gzip.open`, `lzma.open`, ...
+
+    Memory use is bounded by the buffer size, regardless of the size of the stream.
+    """
+
+    def __init__(
+        self,
+        fileobj: ReadableStream,
+        cls: type[S],
+        little_endian: bool = False,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        strict: bool = False,
+    ) -> None:
+        """
+        :param fileobj: Binary stream to read from
+        :param cls: StructDataclass subclass of the records
+        :param little_endian: True if the records are little endian, else False
+        :param buffer_size: Number of bytes to read at once. Rounded up to a whole number of records.
+        :param strict: If True, raise if the stream ends with a partial record instead of ignoring it
+        :raises ValueError: If the StructDataclass has a size of 0
+        """
+        record_size = cls.__struct_layout__.byte_length
+        if not record_size:
+            raise ValueError(f"Can not read records of {cls.__name__} as it has a size of 0")
+        self.fileobj = fileobj
+        self.cls = cls
+        self.little_endian = little_endian
+        self.strict = strict
+        self.buffer_size = -(-max(buffer_size, record_size) // record_size) * record_size
+        self.records_read = 0
+        """Number of records decoded so far"""
+        self.trailing = b""
+        """Bytes of an incomplete record left at the end of the stream"""
+
+    def _read_into(self, view: memoryview) -> int:
+        """
+        Read from the stream into the given memoryview
+
+        :param view: memoryview to fill
+        :return: Number of bytes read, 0 at the end of the stream
+        """
+        if (readinto := getattr(self.fileobj, "readinto", None)) is not None:
+            return readinto(view) or 0
+        data = self.fileobj.read(len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    def __iter__(self) -> Iterator[S]:
+        """
+        Read the stream and yield decoded records until the end of the stream is reached.
+
+        :return: Iterator of decoded instances
+        :raises ValueError: If strict is True and the stream ends with a partial record
+        """
+        layout = self.cls.__struct_layout__
+        factory = self.cls.__struct_factory__
+        record_size = layout.byte_length
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        filled = 0
+        while read := self._read_into(view[filled:]):
+            filled += read
+            complete = filled - filled % record_size
+            for values in layout.iter_unpack(view[:complete], self.little_endian):
+                self.records_read += 1
+                yield factory(values)
+            # Move the start of any partial record to the front of the buffer
+            view[: filled - complete] = view[complete:filled]
+            filled -= complete
+
+        self.trailing = bytes(view[:filled])
+        if self.strict and filled:
+            raise ValueError(f"Stream ended with {filled} bytes of an incomplete {self.cls.__name__} record")
+
+
+def _decode_pending[S: structdataclass.StructDataclass](
+    pending: bytearray, cls: type[S], little_endian: bool
+) -> list[S]:
+    """
+    Decode all complete records at the start of the pending buffer, and remove them from it
+
+    :param pending: Buffer of received bytes, any partial record is left in it
+    :param cls: StructDataclass subclass of the records
+    :param little_endian: True if the records are little endian, else False
+    :return: List of decoded records
+    """
+    layout = cls.__struct_layout__
+    complete = len(pending) - len(pending) % layout.byte_length
+    if not complete:
+        return []
+    factory = cls.__struct_factory__
+    with memoryview(pending) as view, view[:complete] as records:
+        batch = [factory(values) for values in layout.iter_unpack(records, little_endian)]
+    del pending[:complete]
+    return batch
+
+
+async def aiter_records[S: structdataclass.StructDataclass](
+    stream: asyncio.StreamReader,
+    cls: type[S],
+    little_endian: bool = False,
+    chunk_size: int = DEFAULT_BUFFER_SIZE,
+    strict: bool = False,
+) -> AsyncIterator[list[S]]:
+    """
+    Read an asyncio stream in large chunks and yield batches of decoded records.
+
+    Every record that is complete after a read is decoded before awaiting the stream again, so the event
+    loop is only entered once per chunk instead of once per record.
+
+    :param stream: asyncio StreamReader to read from
+    :param cls: StructDataclass subclass of the records
+    :param little_endian: True if the records are little endian, else False
+    :param chunk_size: Maximum number of bytes to read at once
+    :param strict: If True, raise if the stream ends with a partial record instead of ignoring it
+    :return: Async iterator of non-empty lists of decoded records
+    :raises ValueError: If the StructDataclass has a size of 0, or if strict is True and the stream
+        ends with a partial record
+    """
+    if not cls.__struct_layout__.byte_length:
+        raise ValueError(f"Can not read records of {cls.__name__} as it has a size of 0")
+    pending = bytearray()
+    while data := await stream.read(chunk_size):
+        pending += data
+        if batch := _decode_pending(pending, cls, little_endian):
+            yield batch
+    if strict and pending:
+        raise ValueError(f"Stream ended with {len(pending)} bytes of an incomplete {cls.__name__} record")
@@ -0,0 +1,106 @@
+"""
+records: Immutable, tuple-backed records of StructDataclass data.
+"""
+
+from collections.abc import Callable, Sequence
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from pystructtype import codegen, structdataclass
+
+
+class StructRecord(tuple[Any, ...]):
+    """
+    Base class of the read-only record types generated for StructDataclass subclasses.
+
+    A record is a tuple holding one item per attribute of the struct layout, in order, and every
+    attribute can also be read by name like a named tuple. List attributes are tuples, and nested
+    StructDataclasses are records themselves.
+
+    Records hold the values as they are unpacked from the data. If a nested StructDataclass defines
+    a custom `_decode` (like BitsType), its record holds the raw values of its layout, and the custom
+    processing runs when the record is converted back with `to_struct`.
+    """
+
+    __slots__ = ()
+
+    _fields: ClassVar[tuple[str, ...]] = ()
+    __struct_class__: ClassVar[type[structdataclass.StructDataclass]]
+    _from_values: ClassVar[Callable[[Sequence[Any]], Any]]
+    _values: Callable[[], list[Any]]
+
+    if TYPE_CHECKING:
+        # The attributes of the struct layout are properties of the generated record types
+        def __getattr__(self, name: str) -> Any: ...
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self, strict=True))
+        return f"{type(self).__name__}({items})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Record types are created at runtime, so pickle them through the StructDataclass class
+        return _rebuild_record, (self.__struct_class__, tuple(self))
+
+    def _asdict(self) -> dict[str, Any]:
+        """
+        :return: dict of attribute names and values, nested records are not converted
+        """
+        return dict(zip(self._fields, self, strict=True))
+
+    def to_struct(self) -> Any:
+        """
+        Convert the record into a new mutable instance of its StructDataclass class
+
+        :return: New StructDataclass instance holding the values of the record
+        """
+        return self.__struct_class__.__struct_factory__(self._values())
+
+    def encode(self, little_endian: bool = False) -> bytes:
+        """
+        Encode the record into bytes, without creating a StructDataclass instance
+
+        :param little_endian: True if encoding little_endian formatted data, else False
+        :return: encoded bytes
+        """
+        return self.__struct_class__.__struct_layout__.pack(self._values(), little_endian)
+
+
+def _rebuild_record(cls: type[structdataclass.StructDataclass], values: tuple[Any, ...]) -> StructRecord:
+    """
+    Recreate a pickled record
+
+    :param cls: StructDataclass class of the record
+    :param values: Items of the record
+    :return: The record
+    """
+    return tuple.__new__(cls.record_type(), values)
+
+
+def build_record_type(cls: type[structdataclass.StructDataclass]) -> type[StructRecord]:
+    """
+    Create the record type of a StructDataclass subclass
+
+    :param cls: StructDataclass subclass with a compiled layout
+    :return: New StructRecord subclass named `<class name>Record`
+    :raises ValueError: If attribute names of the class clash with methods or attributes of StructRecord
+    """
+    names = tuple(state.name for state in cls.__struct_layout__.states)
+    # The properties of the attributes would hide tuple methods like count and index, and the record API
+    if reserved := sorted(set(names).intersection(dir(StructRecord))):
+        raise ValueError(
+            f"{cls.__name__} has no record type, its attributes {', '.join(reserved)} clash with StructRecord"
+        )
+    namespace: dict[str, Any] = {
+        "__slots__": (),
+        "__module__": cls.__module__,
+        "__qualname__": f"{cls.__qualname__}Record",
+        "__doc__": f"Read-only record of {cls.__name__}",
+        "_fields": names,
+        "__struct_class__": cls,
+    }
+    for idx, name in enumerate(names):
+        namespace[name] = property(itemgetter(idx), doc=f"Alias for item {idx}")
+    record: type[StructRecord] = type(f"{cls.__name__}Record", (StructRecord,), namespace)
+    record._from_values = staticmethod(codegen.build_record_factory(record))  # type: ignore[assignment]
+    record._values = codegen.build_record_values(record)  # type: ignore[assignment]
+    return record
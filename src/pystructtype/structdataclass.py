@@ -2,16 +2,49 @@
 StructDataclass: Base class for auto-decoding/encoding struct-like dataclasses.
 """
 
+import asyncio
 import inspect
+import os
 import re
 import struct
+import sys
+from array import array
+from collections.abc import AsyncIterator, Awaitable, Buffer, Callable, Iterator, Sequence
+from concurrent.futures import Executor
 from copy import deepcopy
-from dataclasses import dataclass, field, is_dataclass
+from dataclasses import Field, dataclass, field, is_dataclass, replace
+from itertools import starmap
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar, Self
 
+from pystructtype.cache import DecodeCache, DecodeCacheInfo, class_decode_cache
+from pystructtype.codegen import build_decoder, build_encoder, build_factory, constructs_from_values
+from pystructtype.fieldpath import FieldInfo, FieldReader, field_table, resolve_field
+from pystructtype.lazy import LazyStruct
+from pystructtype.reader import DEFAULT_BUFFER_SIZE, aiter_records
+from pystructtype.records import StructRecord, build_record_type
 from pystructtype.structtypes import iterate_types
+from pystructtype.tracking import ChangeTracker, TrackedStates, encode_changes, find_changes, tracked_setattr
+from pystructtype.utils import class_cached
 
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+"""True if the native byte order, used by `array.array`, is little endian"""
 
-@dataclass
+NATURAL_ALIGNMENT = 16
+"""Maximum attribute alignment of StructDataclasses created with `align=True`, larger than any primitive type"""
+
+
+def native_alignment(struct_fmt: str) -> int:
+    """
+    Return the alignment a C compiler uses for the given struct format character on this platform
+
+    :param struct_fmt: Single struct format character
+    :return: Alignment in bytes
+    """
+    return struct.calcsize("@c" + struct_fmt) - struct.calcsize("@" + struct_fmt)
+
+
+@dataclass(frozen=True)
 class StructState:
     """
     Contains necessary struct information to correctly
@@ -22,22 +55,356 @@ class StructState:
     struct_fmt: str
     size: int
     chunk_size: int
+    offset: int = 0
+    """Byte offset of the attribute from the start of the struct"""
+    byte_size: int = 0
+    """Byte size of a single item of the attribute"""
+    value_count: int = 1
+    """Number of unpacked values a single item of the attribute consumes"""
+    layout: StructLayout | None = None
+    """Compiled layout of the nested StructDataclass, if the attribute is one"""
+    struct_class: type[StructDataclass] | None = None
+    """The nested StructDataclass class, if the attribute is one"""
+    big_endian_struct: struct.Struct | None = None
+    """Precompiled big endian struct.Struct covering all items of the attribute"""
+    little_endian_struct: struct.Struct | None = None
+    """Precompiled little endian struct.Struct covering all items of the attribute"""
+    array_typecode: str | None = None
+    """The `array.array` typecode, if the attribute is stored in an array"""
 
+    def get_struct(self, little_endian: bool) -> struct.Struct:
+        """
+        Return the precompiled struct.Struct of the attribute for the requested endianness
+
+        :param little_endian: True for the little endian struct, else the big endian struct
+        :return: precompiled struct.Struct object
+        """
+        _struct = self.little_endian_struct if little_endian else self.big_endian_struct
+        if _struct is None:
+            raise ValueError(f"Attribute {self.name} has no compiled struct")
+        return _struct
+
+    def load_array(self, data: Buffer, little_endian: bool) -> array[Any]:
+        """
+        Create the array of an array attribute from its raw bytes, with a single bulk copy
+
+        :param data: Raw bytes of all items of the attribute
+        :param little_endian: True if the data is little endian, else False
+        :return: array holding the items of the attribute
+        """
+        assert self.array_typecode is not None
+        items = array(self.array_typecode)
+        items.frombytes(data)
+        if little_endian != _NATIVE_LITTLE_ENDIAN:
+            items.byteswap()
+        return items
+
+    def dump_array(self, items: Any, little_endian: bool) -> bytes:
+        """
+        Convert the value of an array attribute into its raw bytes
+
+        Arrays with the right typecode are copied in bulk, any other sequence of numbers is converted first.
+
+        :param items: array, or sequence of numbers, holding the items of the attribute
+        :param little_endian: True to create little endian data, else False
+        :return: Raw bytes of all items of the attribute
+        :raises ValueError: If the number of items does not match the size of the attribute
+        """
+        assert self.array_typecode is not None
+        if not isinstance(items, array) or items.typecode != self.array_typecode:
+            items = array(self.array_typecode, items)
+        if len(items) != self.size:
+            raise ValueError(f"Attribute {self.name} expects {self.size} items, got {len(items)}")
+        if little_endian != _NATIVE_LITTLE_ENDIAN:
+            items = items[:]
+            items.byteswap()
+        return items.tobytes()
 
-class StructDataclass:
+
+@dataclass(frozen=True)
+class StructLayout:
+    """
+    Immutable, per-class compiled layout of a StructDataclass.
+
+    This is computed once when the subclass is created and shared by every instance.
+    """
+
+    states: tuple[StructState, ...]
+    struct_fmt: str
+    byte_length: int
+    value_count: int
+    offsets: MappingProxyType[str, int]
+    states_by_name: MappingProxyType[str, StructState]
+    big_endian_struct: struct.Struct
+    little_endian_struct: struct.Struct
+    native_struct: struct.Struct
+    array_fields: tuple[tuple[int, StructState], ...] = ()
+    """Index within the unpacked values, and StructState, of every array attribute including nested ones"""
+    alignment: int = 1
+    """Alignment of the struct when it is nested in an aligned StructDataclass, 1 if the struct is packed"""
+
+    def get_struct(self, little_endian: bool) -> struct.Struct:
+        """
+        Return the precompiled struct.Struct for the requested endianness
+
+        :param little_endian: True for the little endian struct, else the big endian struct
+        :return: precompiled struct.Struct object
+        """
+        return self.little_endian_struct if little_endian else self.big_endian_struct
+
+    def load_arrays(self, values: Sequence[Any], little_endian: bool) -> list[Any]:
+        """
+        Replace the raw bytes of every array attribute in the unpacked values with its array
+
+        :param values: Values unpacked with the struct of this layout
+        :param little_endian: True if the values were unpacked from little endian data, else False
+        :return: New list of values ready to decode
+        """
+        values = list(values)
+        for idx, state in self.array_fields:
+            values[idx] = state.load_array(values[idx], little_endian)
+        return values
+
+    def dump_arrays(self, values: Sequence[Any], little_endian: bool) -> list[Any]:
+        """
+        Replace every array attribute in the encoded values with its raw bytes
+
+        :param values: Encoded values of a StructDataclass of this layout
+        :param little_endian: True to create little endian data, else False
+        :return: New list of values ready to pack with the struct of this layout
+        """
+        values = list(values)
+        for idx, state in self.array_fields:
+            values[idx] = state.dump_array(values[idx], little_endian)
+        return values
+
+    def unpack_from(self, buffer: Buffer, offset: int, little_endian: bool) -> list[Any]:
+        """
+        Unpack the values of a struct of this layout from a buffer
+
+        :param buffer: Buffer to unpack from
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if the data is little endian, else False
+        :return: List of values ready to decode
+        :raises struct.error: If the buffer does not hold enough data after the offset
+        """
+        values = self.get_struct(little_endian).unpack_from(buffer, offset)
+        if self.array_fields:
+            return self.load_arrays(values, little_endian)
+        return list(values)
+
+    def iter_unpack(self, buffer: Buffer, little_endian: bool) -> Iterator[Sequence[Any]]:
+        """
+        Unpack the values of back-to-back structs of this layout from a buffer
+
+        :param buffer: Buffer holding a whole number of structs
+        :param little_endian: True if the data is little endian, else False
+        :return: Iterator of the values of each struct, ready to decode
+        """
+        values = self.get_struct(little_endian).iter_unpack(buffer)
+        if self.array_fields:
+            return (self.load_arrays(v, little_endian) for v in values)
+        return values
+
+    def pack(self, values: Sequence[Any], little_endian: bool) -> bytes:
+        """
+        Pack encoded values into bytes
+
+        :param values: Encoded values of a StructDataclass of this layout
+        :param little_endian: True to create little endian data, else False
+        :return: packed bytes
+        """
+        if self.array_fields:
+            values = self.dump_arrays(values, little_endian)
+        return self.get_struct(little_endian).pack(*values)
+
+    def pack_into(self, buffer: Buffer, offset: int, values: Sequence[Any], little_endian: bool) -> None:
+        """
+        Pack encoded values directly into a writable buffer
+
+        :param buffer: Writable buffer to pack into
+        :param offset: Byte offset in the buffer where the struct should be written
+        :param values: Encoded values of a StructDataclass of this layout
+        :param little_endian: True to create little endian data, else False
+        :raises struct.error: If the buffer does not have enough room after the offset
+        """
+        if self.array_fields:
+            values = self.dump_arrays(values, little_endian)
+        self.get_struct(little_endian).pack_into(buffer, offset, *values)
+
+
+_FORMAT_ITEMS = re.compile(r"([a-zA-Z?]|\d+)")
+"""Single format characters and repeat counts of a struct format"""
+_FORMAT_GROUPS = re.compile(r"(\d*([a-zA-Z?])\2*)")
+"""Runs of the same format character, or a format character with a repeat count"""
+
+
+def simplify_format(struct_fmt: str) -> str:
+    """
+    Simplify the given struct format.
+
+    Essentially we turn things like `ccbbbbh` into `2c4bh`
+
+    :param struct_fmt: struct format string without a byte order prefix
+    :return: simplified struct format string
+    """
+    # Expand any already condensed sections
+    # This can happen if we have nested StructDataclasses
+    expanded: list[str] = []
+    items = _FORMAT_ITEMS.findall(struct_fmt)
+    items_len = len(items)
+    idx = 0
+    while idx < items_len:
+        if "0" <= (item := items[idx]) <= "9":
+            idx += 1
+
+            if items[idx] == "s":
+                # Shouldn't expand actual char[]/string types as they need to be grouped
+                # so we know how big the strings should be
+                expanded.append(item + items[idx])
+            else:
+                expanded.append(items[idx] * int(item))
+        else:
+            expanded.append(item)
+        idx += 1
+
+    # Simplify the format by turning multiple consecutive letters into a number + letter combo
+    simplified: list[str] = []
+    for group, _ in _FORMAT_GROUPS.findall("".join(expanded)):
+        if "0" <= group[0] <= "9":
+            # Just pass through any format that we've explicitly kept
+            # a number in front of
+            simplified.append(group)
+            continue
+
+        simplified.append(f"{group_len if (group_len := len(group)) > 1 else ''}{group[0]}")
+
+    return "".join(simplified)
+
+
+def check_offset(offset: int) -> None:
+    """
+    Reject negative buffer offsets, which struct would count from the end of the buffer
+
+    :param offset: Byte offset in a buffer
+    :raises ValueError: If the offset is negative
+    """
+    if offset < 0:
+        raise ValueError(f"Offset {offset} must not be negative")
+
+
+class StructDataclassMeta(type):
+    """
+    Metaclass of StructDataclass.
+
+    This only exists to support the `slots` class keyword, as creating a dataclass with `__slots__`
+    means replacing the class with a new one, which can't be done from `__init_subclass__`.
+    """
+
+    def __new__(
+        mcs, name: str, bases: tuple[type, ...], namespace: dict[str, Any], slots: bool = False, **kwargs: Any
+    ) -> StructDataclassMeta:
+        """
+        :param slots: True to create the StructDataclass with `__slots__` instead of a per-instance `__dict__`
+        :raises TypeError: If slots is True and a parent class does not use `__slots__`
+        """
+        if slots:
+            namespace["__struct_slots__"] = True
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        if not slots:
+            return cls
+        if missing := [base.__name__ for base in cls.__mro__[1:-1] if "__slots__" not in base.__dict__]:
+            raise TypeError(f"{name} can not use slots as parent classes {missing} do not use slots")
+        # dataclass creates a new class with __slots__ for every field, and runs __init_subclass__ for it
+        return dataclass(cls, slots=True)  # type: ignore[arg-type, return-value]
+
+
+class StructDataclass(metaclass=StructDataclassMeta):
     """
     Class that will auto-magically decode and encode data for the defined
     subclass.
     """
 
-    def __init_subclass__(cls: type[StructDataclass], **kwargs: object) -> None:
+    __slots__ = ()
+
+    # Every subclass is made a dataclass in __init_subclass__
+    __dataclass_fields__: ClassVar[dict[str, Field[Any]]]
+    __struct_layout__: ClassVar[StructLayout]
+    _state: ClassVar[tuple[StructState, ...]]
+    struct_fmt: ClassVar[str]
+    _byte_length: ClassVar[int]
+    __struct_codegen__: ClassVar[bool] = True
+    __struct_align__: ClassVar[int] = 1
+    __struct_track_changes__: ClassVar[bool] = False
+    __struct_decode_cache_size__: ClassVar[int] = 0
+    __struct_decode_cache__: ClassVar[DecodeCache | None] = None
+    __struct_decoder__: ClassVar[Any]
+    __struct_encoder__: ClassVar[Any]
+    __struct_factory__: ClassVar[Any]
+    __struct_from_values__: ClassVar[bool] = False
+    __struct_record__: ClassVar[type[StructRecord] | None] = None
+    __struct_ctypes__: ClassVar[dict[bool, Any] | None] = None
+    __struct_fields__: ClassVar[dict[str, FieldInfo] | None] = None
+    __struct_field_readers__: ClassVar[dict[tuple[tuple[str, ...], bool], FieldReader] | None] = None
+    __struct_tracked_states__: ClassVar[TrackedStates | None] = None
+
+    if TYPE_CHECKING:
+        # Subclasses get the __init__ of their dataclass, taking any of their attributes, which all have defaults
+        def __init__(self, *args: Any, **kwargs: Any) -> None: ...
+
+    def __init_subclass__(
+        cls: type[StructDataclass],
+        codegen: bool | None = None,
+        align: bool | None = None,
+        pack: int | None = None,
+        track_changes: bool | None = None,
+        decode_cache: int | None = None,
+        **kwargs: object,
+    ) -> None:
         """
         Automatically configure the subclass as a dataclass and set up default values for fields.
         Handles special logic for list and non-list fields, default factories, and class variables.
+
+        :param codegen: True to decode/encode with functions generated for this class, False to use
+            the generic implementation. Inherited from the parent class if not given.
+        :param align: True to lay out attributes with the padding a C compiler adds for natural alignment,
+            False for a packed struct without padding. Inherited from the parent class if not given.
+        :param pack: Maximum alignment of attributes, like `#pragma pack(n)` in C. Implies `align=True`.
+        :param track_changes: True to track the attributes changed since the last encode, and only pack those
+            into the bytes of the last encode. Inherited from the parent class if not given.
+        :param decode_cache: Maximum number of records cached by `decode_record`, 0 to disable the cache.
+            Inherited from the parent class if not given, every class has its own cache.
+        :raises ValueError: If pack is not a power of 2, or decode_cache is negative
         """
         super().__init_subclass__(**kwargs)
+        if codegen is not None:
+            cls.__struct_codegen__ = codegen
+        if pack is not None:
+            if pack < 1 or pack & (pack - 1):
+                raise ValueError(f"pack must be a power of 2, got {pack}")
+            cls.__struct_align__ = pack
+        elif align is not None:
+            cls.__struct_align__ = NATURAL_ALIGNMENT if align else 1
+        if decode_cache is not None:
+            if decode_cache < 0:
+                raise ValueError(f"decode_cache must be at least 0, got {decode_cache}")
+            cls.__struct_decode_cache_size__ = decode_cache
+        if track_changes is not None:
+            cls.__struct_track_changes__ = track_changes
+            cls.__setattr__ = tracked_setattr if track_changes else object.__setattr__  # type: ignore[assignment]
+        add_tracker = cls.__struct_track_changes__ and "_struct_tracker" not in getattr(cls, "__dataclass_fields__", {})
+        if add_tracker:
+            # Per-instance tracking state, kept out of the struct layout, __init__, repr and comparisons
+            cls.__annotations__["_struct_tracker"] = ChangeTracker
+            cls._struct_tracker = field(  # type: ignore[attr-defined]
+                default_factory=ChangeTracker, init=False, repr=False, compare=False
+            )
         # If the class is already a dataclass, skip
         if is_dataclass(cls):
+            if add_tracker and not cls.__dict__.get("__struct_slots__"):
+                # Subclass of a dataclass that starts tracking changes, add the tracker field to its dataclass
+                dataclass(cls)
+            cls._compile_layout()
             return
         # Make sure any fields without a default have one
         for type_iterator in iterate_types(cls):
@@ -65,7 +432,11 @@ class StructDataclass:
             else:
                 if not type_iterator.is_list:
                     raise ValueError(f"Attribute {type_iterator.key} is not a list type but has a size > 1")
-                if type_iterator.type_meta and type_iterator.type_meta.default:
+                if (typecode := type_iterator.array_typecode) is not None:
+                    default = type_iterator.type_meta.default or type_iterator.base_type()
+                    items = tuple(default) if isinstance(default, list) else (default,) * type_iterator.type_meta.size
+                    default_list = field(default_factory=lambda t=typecode, i=items: array(t, i))  # type: ignore
+                elif type_iterator.type_meta and type_iterator.type_meta.default:
                     default = type_iterator.type_meta.default
                     if isinstance(default, list):
                         default_tuple = tuple(deepcopy(default))
@@ -91,83 +462,131 @@ class StructDataclass:
                     )
 
                 setattr(cls, type_iterator.key, default_list)
+        if cls.__dict__.get("__struct_slots__"):
+            # StructDataclassMeta creates the slotted dataclass, which compiles its own layout
+            return
         dataclass(cls)
+        cls._compile_layout()
 
     def __post_init__(self) -> None:
         """
-        Initialize instance state and struct format after dataclass construction.
-        Computes struct format string and byte length for encoding/decoding.
+        Hook run after dataclass construction.
+
+        The struct layout is compiled once per class in `_compile_layout`, so there is no per-instance
+        work to do here. Subclasses may extend this to set up their own instance state.
+        """
+
+    @classmethod
+    def _compile_layout(cls) -> None:
         """
-        self._state: list[StructState] = []
+        Compute the struct layout for this class and store it on the class.
 
-        # Grab Struct Format
-        self.struct_fmt = ""
-        for type_iterator in iterate_types(self.__class__):
+        Nested StructDataclass attributes reuse the already compiled layout of their own class.
+        """
+        states: list[StructState] = []
+        struct_fmt = ""
+        offset = 0
+        value_count = 0
+        array_fields: list[tuple[int, StructState]] = []
+        alignment = 1
+        for type_iterator in iterate_types(cls):
+            struct_class: type[StructDataclass] | None = None
             if type_iterator.type_info:
-                self._state.append(
-                    StructState(
-                        type_iterator.key,
-                        type_iterator.type_info.format,
-                        type_iterator.size,
-                        type_iterator.chunk_size,
-                    )
-                )
-                _fmt_prefix = type_iterator.chunk_size if type_iterator.chunk_size > 1 else ""
-                self.struct_fmt += f"{_fmt_prefix}{type_iterator.type_info.format}" * type_iterator.size
+                item_alignment = native_alignment(type_iterator.type_info.format)
             elif inspect.isclass(type_iterator.base_type) and issubclass(type_iterator.base_type, StructDataclass):
-                attr = getattr(self, type_iterator.key)
-                if type_iterator.is_list:
-                    fmt = attr[0].struct_fmt
-                else:
-                    fmt = attr.struct_fmt
-                self._state.append(StructState(type_iterator.key, fmt, type_iterator.size, type_iterator.chunk_size))
-                self.struct_fmt += fmt * type_iterator.size
+                struct_class = type_iterator.base_type
+                item_alignment = struct_class.__struct_layout__.alignment
             else:
                 # We have no TypeInfo object, and we're not a StructDataclass
                 # This means we're a regularly defined class variable, and we
                 # Don't have to do anything about this.
-                pass
-        self._simplify_format()
-        self._byte_length = struct.calcsize("=" + self.struct_fmt)
-
-    def _simplify_format(self) -> None:
-        """
-        Simplify the struct format that has been defined for this class.
+                continue
 
-        Essentially we turn things like `ccbbbbh` into `2c4bh`
-        """
-        # Expand any already condensed sections
-        # This can happen if we have nested StructDataclasses
-        expanded_format = ""
-        items = re.findall(r"([a-zA-Z?]|\d+)", self.struct_fmt)
-        items_len = len(items)
-        idx = 0
-        while idx < items_len:
-            if "0" <= (item := items[idx]) <= "9":
-                idx += 1
+            # Add padding before the attribute to align it, this is a no-op for packed structs
+            item_alignment = min(item_alignment, cls.__struct_align__)
+            alignment = max(alignment, item_alignment)
+            if padding := -offset % item_alignment:
+                struct_fmt += f"{padding}x"
+                offset += padding
 
-                if items[idx] == "s":
-                    # Shouldn't expand actual char[]/string types as they need to be grouped
-                    # so we know how big the strings should be
-                    expanded_format += item + items[idx]
-                else:
-                    expanded_format += items[idx] * int(item)
+            if struct_class is None:
+                assert type_iterator.type_info is not None
+                _fmt_prefix = type_iterator.chunk_size if type_iterator.chunk_size > 1 else ""
+                fmt = f"{_fmt_prefix}{type_iterator.type_info.format}"
+                state = StructState(
+                    type_iterator.key,
+                    type_iterator.type_info.format,
+                    type_iterator.size,
+                    type_iterator.chunk_size,
+                    offset=offset,
+                    byte_size=struct.calcsize("=" + fmt),
+                    array_typecode=type_iterator.array_typecode,
+                )
             else:
-                expanded_format += item
-            idx += 1
-
-        # Simplify the format by turning multiple consecutive letters into a number + letter combo
-        simplified_format = ""
-        for group in (x[0] for x in re.findall(r"(\d*([a-zA-Z?])\2*)", expanded_format)):
-            if re.match(r"\d+", group[0]):
-                # Just pass through any format that we've explicitly kept
-                # a number in front of
-                simplified_format += group
-                continue
+                layout = struct_class.__struct_layout__
+                fmt = layout.struct_fmt
+                state = StructState(
+                    type_iterator.key,
+                    fmt,
+                    type_iterator.size,
+                    type_iterator.chunk_size,
+                    offset=offset,
+                    byte_size=layout.byte_length,
+                    value_count=layout.value_count,
+                    layout=layout,
+                    struct_class=struct_class,
+                )
+            field_fmt = simplify_format(fmt * state.size)
+            state = replace(
+                state,
+                big_endian_struct=struct.Struct(">" + field_fmt),
+                little_endian_struct=struct.Struct("<" + field_fmt),
+            )
+            states.append(state)
+            if state.array_typecode is not None:
+                # Arrays are unpacked as a single bytes value, which is converted to the array in bulk
+                array_fields.append((value_count, state))
+                struct_fmt += f"{state.byte_size * state.size}s"
+                value_count += 1
+            else:
+                if state.layout is not None:
+                    for item in range(state.size):
+                        start = value_count + item * state.value_count
+                        array_fields.extend((start + idx, sub_state) for idx, sub_state in state.layout.array_fields)
+                struct_fmt += fmt * state.size
+                value_count += state.value_count * state.size
+            offset += state.byte_size * state.size
 
-            simplified_format += f"{group_len if (group_len := len(group)) > 1 else ''}{group[0]}"
+        # Add tail padding so that arrays of this struct keep every item aligned
+        if padding := -offset % alignment:
+            struct_fmt += f"{padding}x"
+        struct_fmt = simplify_format(struct_fmt)
+        cls.__struct_layout__ = StructLayout(
+            states=tuple(states),
+            struct_fmt=struct_fmt,
+            byte_length=struct.calcsize("=" + struct_fmt),
+            value_count=value_count,
+            offsets=MappingProxyType({state.name: state.offset for state in states}),
+            states_by_name=MappingProxyType({state.name: state for state in states}),
+            big_endian_struct=struct.Struct(">" + struct_fmt),
+            little_endian_struct=struct.Struct("<" + struct_fmt),
+            native_struct=struct.Struct("=" + struct_fmt),
+            array_fields=tuple(array_fields),
+            alignment=alignment,
+        )
+        # Expose the commonly used parts of the layout directly on the class
+        cls._state = cls.__struct_layout__.states
+        cls.struct_fmt = cls.__struct_layout__.struct_fmt
+        cls._byte_length = cls.__struct_layout__.byte_length
 
-        self.struct_fmt = simplified_format
+        if cls.__struct_codegen__:
+            cls.__struct_decoder__ = build_decoder(cls)
+            cls.__struct_encoder__ = build_encoder(cls)
+        else:
+            cls.__struct_decoder__ = StructDataclass._generic_decode
+            cls.__struct_encoder__ = StructDataclass._generic_encode
+        cls.__struct_factory__ = build_factory(cls)
+        cls.__struct_from_values__ = constructs_from_values(cls)
 
     def size(self) -> int:
         """
@@ -175,7 +594,15 @@ class StructDataclass:
 
         :return: Combined size of the struct
         """
-        return sum(state.size for state in self._state)
+        return sum(state.size for state in self.__struct_layout__.states)
+
+    def byte_size(self) -> int:
+        """
+        The number of bytes of this struct once encoded, including any alignment padding
+
+        :return: Size of the encoded struct in bytes
+        """
+        return self.__struct_layout__.byte_length
 
     @staticmethod
     def _endian(little_endian: bool) -> str:
@@ -217,6 +644,16 @@ class StructDataclass:
 
         Extend this function if you wish to add extra processing to your StructDataclass decoding processing
 
+        :param data: A list of ints to decode into the StructDataclass
+        """
+        self.__struct_decoder__(data)
+
+    def _generic_decode(self, data: list[int]) -> None:
+        """
+        Generic decoding implementation that walks the compiled layout of the class.
+
+        This is used when code generation is disabled for the class.
+
         :param data: A list of ints to decode into the StructDataclass
         """
         idx = 0
@@ -225,22 +662,20 @@ class StructDataclass:
 
             if isinstance(attr, list) and isinstance(attr[0], StructDataclass):
                 # If the current attribute is a list, and contains subclasses of StructDataclass
-                # Call _decode on the required subset of bytes for each list item
+                # Call _decode on the required subset of values for each list item
                 list_idx = 0
-                sub_struct_byte_length = attr[0].size()
                 while list_idx < state.size:
                     instance: StructDataclass = attr[list_idx]
-                    instance._decode(data[idx : idx + sub_struct_byte_length])
+                    instance._decode(data[idx : idx + state.value_count])
                     list_idx += 1
-                    idx += sub_struct_byte_length
+                    idx += state.value_count
             elif isinstance(attr, StructDataclass):
                 # If the current attribute is not a list, and is a subclass of StructDataclass
-                # Call _decode on the required subset of bytes for the item
-                sub_struct_byte_length = attr.size()
-                attr._decode(data[idx : idx + sub_struct_byte_length])
-                idx += sub_struct_byte_length
-            elif state.size == 1:
-                # The current attribute is a base type of size 1
+                # Call _decode on the required subset of values for the item
+                attr._decode(data[idx : idx + state.value_count])
+                idx += state.value_count
+            elif state.size == 1 or state.array_typecode is not None:
+                # The current attribute is a base type of size 1, or an array
                 setattr(self, state.name, data[idx])
                 idx += 1
             else:
@@ -260,11 +695,231 @@ class StructDataclass:
         :raises ValueError: If the input data is not the correct length for the struct
         """
         data = self._to_bytes(data)
-        expected_len = struct.calcsize(self._endian(little_endian) + self.struct_fmt)
-        if len(data) != expected_len:
-            raise ValueError(f"Input data length {len(data)} does not match expected struct size {expected_len}")
+        layout = self.__struct_layout__
+        if len(data) != layout.byte_length:
+            raise ValueError(f"Input data length {len(data)} does not match expected struct size {layout.byte_length}")
         # Decode
-        self._decode(list(struct.unpack(self._endian(little_endian) + self.struct_fmt, data)))
+        self._decode(layout.unpack_from(data, 0, little_endian))
+
+    def decode_from(self, buffer: Buffer, offset: int = 0, little_endian: bool = False) -> int:
+        """
+        Decode this subclass of StructDataclass directly from a buffer, starting at the given offset.
+
+        Any object supporting the buffer protocol can be used (bytes, bytearray, memoryview, mmap,
+        array.array, ...), and the data is read in place without copying it first.
+
+        :param buffer: Buffer to decode from
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :return: Number of bytes consumed from the buffer
+        :raises ValueError: If the offset is negative, or the buffer does not hold enough data after it
+        """
+        check_offset(offset)
+        layout = self.__struct_layout__
+        try:
+            values = layout.unpack_from(buffer, offset, little_endian)
+        except struct.error as e:
+            raise ValueError(f"Unable to decode {layout.byte_length} bytes at offset {offset}: {e}") from e
+        self._decode(values)
+        return layout.byte_length
+
+    @classmethod
+    def decode_lazy(cls, buffer: Buffer, offset: int = 0, little_endian: bool = False) -> LazyStruct:
+        """
+        Create a lazily decoded view of this class inside a buffer.
+
+        Attributes are only unpacked, and then cached, when they are first accessed. See `LazyStruct`.
+
+        :param buffer: Buffer holding the data
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :return: LazyStruct view of the data
+        :raises ValueError: If the buffer does not hold enough data after the offset
+        """
+        return LazyStruct(cls, buffer, offset, little_endian)
+
+    @classmethod
+    def record_type(cls) -> type[StructRecord]:
+        """
+        Return the read-only, tuple-backed record type of this class. See `StructRecord`.
+
+        The record type is generated on first use and reused afterwards.
+
+        :return: StructRecord subclass named `<class name>Record`
+        """
+        return class_cached(cls, "__struct_record__", lambda: build_record_type(cls))
+
+    @classmethod
+    def decode_record(cls, buffer: Buffer, offset: int = 0, little_endian: bool = False) -> StructRecord:
+        """
+        Decode a read-only record of this class from a buffer, starting at the given offset.
+
+        The record is built directly from the unpacked values, without creating a StructDataclass instance
+        or any of its default values. If the class was created with a `decode_cache` size, records are
+        cached by their payload bytes, and decoding the same bytes again returns the same shared record.
+
+        :param buffer: Buffer to decode from
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :return: Decoded record
+        :raises ValueError: If the offset is negative, or the buffer does not hold enough data after it
+        """
+        check_offset(offset)
+        layout = cls.__struct_layout__
+        if (cache := class_decode_cache(cls)) is not None:
+            with memoryview(buffer) as view, view.cast("B") as data:
+                payload = bytes(data[offset : offset + layout.byte_length])
+            if len(payload) == layout.byte_length:
+                return cache.get(
+                    payload,
+                    little_endian,
+                    lambda: cls.record_type()._from_values(layout.unpack_from(payload, 0, little_endian)),
+                )
+        try:
+            values = layout.unpack_from(buffer, offset, little_endian)
+        except struct.error as e:
+            raise ValueError(f"Unable to decode {layout.byte_length} bytes at offset {offset}: {e}") from e
+        return cls.record_type()._from_values(values)
+
+    @classmethod
+    def decode_cache_info(cls) -> DecodeCacheInfo:
+        """
+        Return the hit, miss and eviction statistics of the decode cache of this class.
+
+        :return: Snapshot of the cache statistics
+        :raises TypeError: If the class was not created with a decode_cache size
+        """
+        if (cache := class_decode_cache(cls)) is None:
+            raise TypeError(f"{cls.__name__} has no decode cache, create it with decode_cache=<size>")
+        return cache.info()
+
+    @classmethod
+    def decode_cache_clear(cls) -> None:
+        """
+        Drop every record from the decode cache of this class, and reset its statistics.
+        """
+        if (cache := class_decode_cache(cls)) is not None:
+            cache.clear()
+
+    @classmethod
+    def iter_records(
+        cls,
+        buffer: Buffer,
+        little_endian: bool = False,
+        offset: int = 0,
+        count: int | None = None,
+        strict: bool = False,
+    ) -> Iterator[StructRecord]:
+        """
+        Decode back-to-back records of this class from a buffer, yielding a read-only record per record.
+
+        See `iter_decode` for a description of the arguments.
+
+        :return: Iterator of decoded records
+        :raises ValueError: If strict is True and the buffer ends with a partial record
+        """
+        return map(cls.record_type()._from_values, cls._iter_values(buffer, little_endian, offset, count, strict))
+
+    @classmethod
+    def field_offsets(cls) -> MappingProxyType[str, FieldInfo]:
+        """
+        Return the offset table of this class, holding the offset, size and format of every field by path.
+
+        Paths name attributes (`seq`), fields of nested StructDataclasses (`header.msg_type`), items of lists
+        of nested StructDataclasses (`step_color[2].r`) and BitsType attributes (`flags.autolights`). Items
+        of primitive lists (`samples[3]`) are not listed, but can be used with `field_info` and `read_fields`.
+
+        :return: Read-only mapping of path to FieldInfo
+        """
+        return field_table(cls)
+
+    @classmethod
+    def field_info(cls, path: str) -> FieldInfo:
+        """
+        Return the offset, size and format of a single field of this class
+
+        :param path: Path of the field, see `field_offsets`
+        :return: FieldInfo of the field
+        :raises KeyError: If the path does not name a field of this class
+        """
+        return resolve_field(cls, path)
+
+    @classmethod
+    def field_reader(cls, paths: Sequence[str], little_endian: bool = False) -> FieldReader:
+        """
+        Return a callable reading only the given fields from a buffer holding a struct of this class.
+
+        Readers are cached per list of paths and byte order.
+
+        :param paths: Paths of the fields to read, see `field_offsets`
+        :param little_endian: True if the data is little endian, else False
+        :return: FieldReader, called with (buffer, offset=0) and returning a tuple of the field values
+        :raises KeyError: If a path does not name a field of this class
+        """
+        cache: dict[tuple[tuple[str, ...], bool], FieldReader] = class_cached(cls, "__struct_field_readers__", dict)
+        key = (tuple(paths), little_endian)
+        if (reader := cache.get(key)) is None:
+            reader = FieldReader(cls, key[0], little_endian)
+            cache[key] = reader
+        return reader
+
+    @classmethod
+    def read_fields(
+        cls, buffer: Buffer, paths: Sequence[str], offset: int = 0, little_endian: bool = False
+    ) -> tuple[Any, ...]:
+        """
+        Read only the given fields from a buffer holding a struct of this class, without decoding the rest.
+
+        :param buffer: Buffer holding the struct
+        :param paths: Paths of the fields to read, see `field_offsets`
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if the data is little endian, else False
+        :return: Tuple of the values of the fields, in the order of the paths
+        :raises KeyError: If a path does not name a field of this class
+        :raises ValueError: If the buffer does not hold the fields
+        """
+        return cls.field_reader(paths, little_endian)(buffer, offset)
+
+    @classmethod
+    def get_field(cls, buffer: Buffer, path: str, offset: int = 0, little_endian: bool = False) -> Any:
+        """
+        Read a single field from a buffer holding a struct of this class, without decoding the rest.
+
+        :param buffer: Buffer holding the struct
+        :param path: Path of the field, see `field_offsets`
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if the data is little endian, else False
+        :return: Value of the field
+        :raises KeyError: If the path does not name a field of this class
+        :raises ValueError: If the buffer does not hold the field
+        """
+        return resolve_field(cls, path).read(buffer, offset, little_endian)
+
+    @classmethod
+    def set_field(cls, buffer: Buffer, path: str, value: Any, offset: int = 0, little_endian: bool = False) -> None:
+        """
+        Write a single field in place into a writable buffer holding a struct of this class.
+
+        Only the bytes of the field are written, which allows patching records in mmaps and shared memory.
+        BitsType attributes update only their own bits of the containing integer.
+
+        :param buffer: Writable buffer holding the struct
+        :param path: Path of the field, see `field_offsets`
+        :param value: New value of the field
+        :param offset: Byte offset in the buffer where the struct starts
+        :param little_endian: True if the data is little endian, else False
+        :raises KeyError: If the path does not name a field of this class
+        :raises ValueError: If the buffer does not hold the field, or the value does not fit the field
+        """
+        resolve_field(cls, path).write(buffer, value, offset, little_endian)
+
+    def to_record(self) -> StructRecord:
+        """
+        Convert this instance into a read-only record
+
+        :return: Record holding the current values of this instance
+        """
+        return self.record_type()._from_values(self._encode())
 
     def _encode(self) -> list[int]:
         """
@@ -272,6 +927,17 @@ class StructDataclass:
 
         Extend this function if you wish to add extra processing to your StructDataclass encoding processing
 
+        :return: list of encoded int data
+        """
+        result: list[int] = self.__struct_encoder__()
+        return result
+
+    def _generic_encode(self) -> list[int]:
+        """
+        Generic encoding implementation that walks the compiled layout of the class.
+
+        This is used when code generation is disabled for the class.
+
         :return: list of encoded int data
         """
         result: list[int] = []
@@ -289,8 +955,8 @@ class StructDataclass:
                 # Attribute is a StructDataclass subclass
                 # Call _encode on it
                 result.extend(attr._encode())
-            elif state.size == 1:
-                # Attribute is a single base type
+            elif state.size == 1 or state.array_typecode is not None:
+                # Attribute is a single base type, or an array
                 # Append it to the result
                 result.append(getattr(self, state.name))
             else:
@@ -306,5 +972,367 @@ class StructDataclass:
         :param little_endian: True if encoding little_endian formatted data, else False
         :return: encoded bytes
         """
-        result = self._encode()
-        return struct.pack(self._endian(little_endian) + self.struct_fmt, *result)
+        if self._encodes_incrementally():
+            return bytes(encode_changes(self, little_endian))
+        return self.__struct_layout__.pack(self._encode(), little_endian)
+
+    def _encodes_incrementally(self) -> bool:
+        """
+        :return: True if this instance tracks its changes and only packs those when encoding. Classes with a
+            custom `_encode` always encode everything, as their values can depend on more than their attributes.
+        """
+        return self.__struct_track_changes__ and type(self)._encode is StructDataclass._encode
+
+    def changed_fields(self) -> set[str]:
+        """
+        Names of the attributes changed since the last encode, for classes created with `track_changes=True`.
+
+        Attributes are changed by assigning them, by modifying a list attribute in place, or by changing
+        a nested StructDataclass.
+
+        :return: Set of attribute names, all attributes if this instance was not encoded on its own yet. Encoding
+            a StructDataclass this instance is nested in doesn't count, and doesn't change the result.
+        :raises TypeError: If the class does not track changes
+        """
+        if not self.__struct_track_changes__:
+            raise TypeError(f"{type(self).__name__} does not track changes, create it with track_changes=True")
+        return find_changes(self)
+
+    def encode_into(self, buffer: Buffer, offset: int = 0, little_endian: bool = False) -> int:
+        """
+        Encode the data from this subclass of StructDataclass directly into a writable buffer.
+
+        Any writable object supporting the buffer protocol can be used (bytearray, memoryview, mmap,
+        shared memory, ...), which avoids allocating a new bytes object per encode.
+
+        :param buffer: Writable buffer to encode into
+        :param offset: Byte offset in the buffer where the struct should be written
+        :param little_endian: True if encoding little_endian formatted data, else False
+        :return: Offset in the buffer directly after the encoded struct
+        :raises ValueError: If the offset is negative, or the buffer does not have enough room after it
+        """
+        check_offset(offset)
+        layout = self.__struct_layout__
+        try:
+            if self._encodes_incrementally():
+                encoded = encode_changes(self, little_endian)
+                with memoryview(buffer) as view, view.cast("B") as target:
+                    if offset > target.nbytes - layout.byte_length:
+                        raise struct.error(f"buffer of {target.nbytes} bytes is too small")
+                    target[offset : offset + layout.byte_length] = encoded
+            else:
+                layout.pack_into(buffer, offset, self._encode(), little_endian)
+        except struct.error as e:
+            raise ValueError(f"Unable to encode {layout.byte_length} bytes at offset {offset}: {e}") from e
+        return offset + layout.byte_length
+
+    @classmethod
+    def record_count(cls, buffer: Buffer, offset: int = 0) -> tuple[int, int]:
+        """
+        Count the number of complete back-to-back records of this class in a buffer
+
+        :param buffer: Buffer holding the records
+        :param offset: Byte offset in the buffer where the first record starts
+        :return: Tuple of (number of complete records, number of trailing partial bytes)
+        :raises ValueError: If the offset is negative
+        """
+        check_offset(offset)
+        with memoryview(buffer) as view:
+            available = max(view.nbytes - offset, 0)
+        if not (byte_length := cls.__struct_layout__.byte_length):
+            return 0, available
+        return divmod(available, byte_length)
+
+    @classmethod
+    def _iter_values(
+        cls,
+        buffer: Buffer,
+        little_endian: bool = False,
+        offset: int = 0,
+        count: int | None = None,
+        strict: bool = False,
+    ) -> Iterator[Sequence[Any]]:
+        """
+        Unpack back-to-back records of this class from a buffer, yielding the unpacked values per record.
+
+        See `iter_decode` for a description of the arguments.
+
+        :return: Iterator of the unpacked values of each record
+        :raises ValueError: If strict is True and the buffer ends with a partial record
+        """
+        layout = cls.__struct_layout__
+        records, trailing = cls.record_count(buffer, offset)
+        if strict and trailing and (count is None or count > records):
+            raise ValueError(f"Buffer has {trailing} trailing bytes that do not form a complete record")
+        if count is not None:
+            records = min(records, count)
+        if not records:
+            return iter(())
+        view = memoryview(buffer).cast("B")[offset : offset + records * layout.byte_length]
+        return layout.iter_unpack(view, little_endian)
+
+    @classmethod
+    def iter_decode(
+        cls,
+        buffer: Buffer,
+        little_endian: bool = False,
+        offset: int = 0,
+        count: int | None = None,
+        strict: bool = False,
+    ) -> Iterator[Self]:
+        """
+        Decode back-to-back records of this class from a buffer, yielding a new instance per record.
+
+        The records are unpacked in a single pass with `Struct.iter_unpack` without copying the buffer.
+
+        :param buffer: Buffer holding the records
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :param offset: Byte offset in the buffer where the first record starts
+        :param count: Maximum number of records to decode, or None to decode all complete records
+        :param strict: If True, raise instead of ignoring trailing bytes that do not form a complete record
+        :return: Iterator of decoded instances
+        :raises ValueError: If strict is True and the buffer ends with a partial record
+        """
+        values = cls._iter_values(buffer, little_endian, offset, count, strict)
+        if cls.__struct_from_values__:
+            # Calling the class with the values directly saves a call of the factory per record
+            return starmap(cls, values)
+        return map(cls.__struct_factory__, values)
+
+    @classmethod
+    def decode_many(
+        cls,
+        buffer: Buffer,
+        little_endian: bool = False,
+        offset: int = 0,
+        count: int | None = None,
+        strict: bool = False,
+    ) -> list[Self]:
+        """
+        Decode back-to-back records of this class from a buffer into a list of new instances.
+
+        See `iter_decode` for a description of the arguments.
+
+        :return: List of decoded instances
+        """
+        return list(cls.iter_decode(buffer, little_endian, offset, count, strict))
+
+    @classmethod
+    async def aiter_decode(
+        cls,
+        stream: asyncio.StreamReader,
+        little_endian: bool = False,
+        chunk_size: int = DEFAULT_BUFFER_SIZE,
+        strict: bool = False,
+    ) -> AsyncIterator[Self]:
+        """
+        Decode back-to-back records of this class from an asyncio stream.
+
+        The stream is read in large chunks, and every complete record is decoded before awaiting
+        the stream again.
+
+        :param stream: asyncio StreamReader to read from
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :param chunk_size: Maximum number of bytes to read at once
+        :param strict: If True, raise if the stream ends with a partial record instead of ignoring it
+        :return: Async iterator of decoded instances
+        """
+        async for batch in aiter_records(stream, cls, little_endian, chunk_size, strict):
+            for record in batch:
+                yield record
+
+    @classmethod
+    async def adecode_batches(
+        cls,
+        stream: asyncio.StreamReader,
+        callback: Callable[[list[Self]], Awaitable[None] | None],
+        little_endian: bool = False,
+        chunk_size: int = DEFAULT_BUFFER_SIZE,
+        strict: bool = False,
+    ) -> int:
+        """
+        Decode back-to-back records of this class from an asyncio stream, passing each batch to a callback.
+
+        A batch holds every record that was completed by a single read of the stream. The callback can
+        be a regular function or a coroutine function.
+
+        :param stream: asyncio StreamReader to read from
+        :param callback: Function called with each list of decoded instances
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :param chunk_size: Maximum number of bytes to read at once
+        :param strict: If True, raise if the stream ends with a partial record instead of ignoring it
+        :return: Total number of decoded records
+        """
+        total = 0
+        async for batch in aiter_records(stream, cls, little_endian, chunk_size, strict):
+            total += len(batch)
+            if inspect.isawaitable(result := callback(batch)):
+                await result
+        return total
+
+    @classmethod
+    def decode_parallel(
+        cls,
+        source: Buffer | str | os.PathLike[str],
+        little_endian: bool = False,
+        offset: int = 0,
+        count: int | None = None,
+        workers: int | None = None,
+        reducer: Callable[[Iterator[Self]], Any] | None = None,
+        executor: Executor | None = None,
+    ) -> list[Any]:
+        """
+        Decode back-to-back records of this class with a pool of worker processes.
+
+        The record range is split into one contiguous chunk per worker. A buffer is copied once into
+        `multiprocessing.shared_memory`, and a file path is mapped into memory by every worker, so the
+        data itself is never pickled. The class, and the reducer, must be importable by the workers,
+        which means defined at the top level of a module.
+
+        Without a reducer every decoded instance is pickled back to this process, which can cost more than
+        decoding them. Pass a reducer to summarize every chunk inside the workers instead.
+
+        :param source: Buffer holding the records, or the path of a file holding the records
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :param offset: Byte offset in the buffer or file where the first record starts
+        :param count: Maximum number of records to decode, or None to decode all complete records
+        :param workers: Number of chunks and worker processes, defaults to the number of usable CPUs
+        :param reducer: Function called in the workers with an iterator of the decoded instances of a chunk
+        :param executor: Executor to submit the chunks to instead of creating a new process pool
+        :return: List of all decoded instances in order, or the list of reducer results per chunk
+        :raises ValueError: If workers is less than 1
+        """
+        from pystructtype import parallel
+
+        return parallel.decode_parallel(cls, source, little_endian, offset, count, workers, reducer, executor)
+
+    @classmethod
+    def decode_threaded(
+        cls,
+        buffer: Buffer,
+        little_endian: bool = False,
+        offset: int = 0,
+        count: int | None = None,
+        workers: int | None = None,
+        reducer: Callable[[Iterator[Self]], Any] | None = None,
+        executor: Executor | None = None,
+    ) -> list[Any]:
+        """
+        Decode back-to-back records of this class with a pool of threads.
+
+        The record range is split into one contiguous chunk per thread, and every thread reads its chunk
+        straight from the buffer. This only runs faster than `decode_many` on a free-threaded build of
+        Python, where the threads decode on multiple cores at the same time.
+
+        :param buffer: Buffer holding the records
+        :param little_endian: True if decoding little_endian formatted data, else False
+        :param offset: Byte offset in the buffer where the first record starts
+        :param count: Maximum number of records to decode, or None to decode all complete records
+        :param workers: Number of chunks and threads, defaults to the number of usable CPUs
+        :param reducer: Function called in the threads with an iterator of the decoded instances of a chunk
+        :param executor: Executor to submit the chunks to instead of creating a new thread pool
+        :return: List of all decoded instances in order, or the list of reducer results per chunk
+        :raises ValueError: If workers is less than 1
+        """
+        from pystructtype import parallel
+
+        return parallel.decode_threaded(cls, buffer, little_endian, offset, count, workers, reducer, executor)
+
+    @classmethod
+    def encode_threaded(
+        cls,
+        items: Sequence[Self],
+        little_endian: bool = False,
+        workers: int | None = None,
+        executor: Executor | None = None,
+    ) -> bytes:
+        """
+        Encode instances of this class back-to-back with a pool of threads.
+
+        The instances are split into one contiguous chunk per thread. The instances must not be modified
+        while they are being encoded.
+
+        :param items: Instances of this class to encode
+        :param little_endian: True if encoding little_endian formatted data, else False
+        :param workers: Number of chunks and threads, defaults to the number of usable CPUs
+        :param executor: Executor to submit the chunks to instead of creating a new thread pool
+        :return: encoded bytes of all instances
+        :raises ValueError: If workers is less than 1
+        :raises TypeError: If an item is not an instance of exactly this class, as subclasses can have another
+            layout
+        """
+        from pystructtype import parallel
+
+        return parallel.encode_threaded(cls, items, little_endian, workers, executor)
+
+    @classmethod
+    def numpy_dtype(cls, little_endian: bool = False) -> Any:
+        """
+        Build a NumPy structured dtype matching the layout of this class.
+
+        Requires the optional numpy package.
+
+        :param little_endian: True for a little endian dtype, else big endian
+        :return: numpy.dtype of a single record
+        """
+        from pystructtype import numpy_support
+
+        return numpy_support.to_dtype(cls, little_endian)
+
+    @classmethod
+    def to_numpy(cls, buffer: Buffer, little_endian: bool = False, offset: int = 0, count: int | None = None) -> Any:
+        """
+        View back-to-back records of this class in a buffer as a NumPy structured array, without copying.
+
+        Requires the optional numpy package.
+
+        :param buffer: Buffer holding the records
+        :param little_endian: True if the records are little endian, else False
+        :param offset: Byte offset in the buffer where the first record starts
+        :param count: Maximum number of records to view, or None for all complete records
+        :return: numpy.ndarray sharing memory with the buffer
+        """
+        from pystructtype import numpy_support
+
+        return numpy_support.to_numpy(cls, buffer, little_endian, offset, count)
+
+    @classmethod
+    def ctypes_type(cls, little_endian: bool = False) -> Any:
+        """
+        Return a ctypes.Structure class with the same memory layout as this class.
+
+        Use `from_buffer` of the structure for in-place access to records in writable buffers such as
+        mmaps and shared memory.
+
+        :param little_endian: True for a LittleEndianStructure, else a BigEndianStructure
+        :return: ctypes.Structure subclass
+        """
+        from pystructtype import ctypes_support
+
+        return ctypes_support.ctypes_type(cls, little_endian)
+
+    def to_ctypes(self, little_endian: bool = False) -> Any:
+        """
+        Convert this instance into a new instance of its ctypes.Structure class
+
+        :param little_endian: True for a LittleEndianStructure, else a BigEndianStructure
+        :return: ctypes.Structure instance holding the values of this instance
+        """
+        structure = self.ctypes_type(little_endian)()
+        self.encode_into(structure, 0, little_endian)
+        return structure
+
+    @classmethod
+    def from_ctypes(cls, structure: Any) -> Self:
+        """
+        Create a new instance from an instance of the ctypes.Structure class of this class
+
+        :param structure: Instance of the structure returned by `ctypes_type`
+        :return: New decoded instance
+        :raises TypeError: If the structure was not created for this class
+        """
+        if getattr(structure, "__struct_class__", None) is not cls:
+            raise TypeError(f"{type(structure).__name__} is not a ctypes structure of {cls.__name__}")
+        layout = cls.__struct_layout__
+        instance: Self = cls.__struct_factory__(layout.unpack_from(structure, 0, structure.__struct_little_endian__))
+        return instance
@@ -3,6 +3,8 @@ structtypes: Type system and helpers for pystructtype.
 """
 
 import inspect
+import struct
+from array import array
 from collections.abc import Generator
 from dataclasses import dataclass
 from typing import Annotated, Any, ClassVar, TypeVar, get_args, get_origin, get_type_hints
@@ -43,20 +45,29 @@ class TypeMeta[T]:
     """
     Class used to define Annotated Type Metadata for
     size and default values
+
+    Setting `array` to True stores a list of int or float types in an `array.array` instead of a list,
+    which is decoded and encoded with a single bulk copy of its bytes.
     """
 
-    def __init__(self, size: int = 1, chunk_size: int = 1, default: T | None = None):
+    def __init__(self, size: int = 1, chunk_size: int = 1, default: T | None = None, array: bool = False):
         self.size = size
         self.chunk_size = chunk_size
         self.default = default
+        self.array = array
 
     def __hash__(self) -> int:
-        return hash((self.size, self.chunk_size, self.default))
+        return hash((self.size, self.chunk_size, self.default, self.array))
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, TypeMeta):
             raise TypeError("TypeMeta can not determine equality with non TypeMeta object")
-        return self.size == other.size and self.chunk_size == other.chunk_size and self.default == other.default
+        return (
+            self.size == other.size
+            and self.chunk_size == other.chunk_size
+            and self.default == other.default
+            and self.array == other.array
+        )
 
 
 @dataclass(frozen=True)
@@ -100,6 +111,23 @@ char_t = Annotated[bytes, TypeInfo("c", 1)]
 string_t = Annotated[bytes, TypeInfo("s", 1)]
 """1 Byte char[] Type"""
 
+ARRAY_TYPECODES = {
+    fmt: next(code for code in codes if array(code).itemsize == struct.calcsize("=" + fmt))
+    for fmt, codes in {
+        "b": "b",
+        "B": "B",
+        "h": "h",
+        "H": "H",
+        "i": "il",
+        "I": "IL",
+        "q": "q",
+        "Q": "Q",
+        "f": "f",
+        "d": "d",
+    }.items()
+}
+"""Mapping of struct format characters to `array.array` typecodes with the same item size"""
+
 
 @dataclass
 class TypeIterator:
@@ -142,6 +170,22 @@ class TypeIterator:
         """
         return getattr(self.type_meta, "chunk_size", 1)
 
+    @property
+    def array_typecode(self) -> str | None:
+        """
+        Return the `array.array` typecode of the type, if it is a list that is stored in an array.
+
+        :return: array typecode, or None if the type is not stored in an array
+        :raises TypeError: If the type is set to be stored in an array, but can't be
+        """
+        if not getattr(self.type_meta, "array", False):
+            return None
+        if not self.is_list or self.type_info is None or self.type_info.format not in ARRAY_TYPECODES:
+            raise TypeError(
+                f"Attribute {self.key} can not be stored in an array, only lists of int and float types can"
+            )
+        return ARRAY_TYPECODES[self.type_info.format]
+
 
 def iterate_types(cls: type) -> Generator[TypeIterator]:
     """
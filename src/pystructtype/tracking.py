@@ -0,0 +1,419 @@
+"""
+tracking: Change tracking and incremental encoding of StructDataclass instances.
+
+Classes created with `track_changes=True` keep the bytes of their last encode. Assigned attributes are
+recorded by `__setattr__`, which also marks the instance as changed in every tracked StructDataclass it is
+nested in. Lists, arrays and nested StructDataclasses that don't track their own changes are compared with
+a copy of their values taken when the instance was last checked for changes. The next encode only packs the
+byte ranges of the attributes that changed since the previous one.
+"""
+
+import weakref
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from itertools import count
+from typing import Any
+
+from pystructtype import structdataclass
+from pystructtype.codegen import build_states_encoder
+from pystructtype.utils import class_cached
+
+_versions = count(1)
+"""Source of the version numbers of changes, shared by every instance so that they never repeat"""
+
+
+class ChangeTracker:
+    """
+    Per-instance change tracking state.
+    """
+
+    __slots__ = (
+        "changed",
+        "encoded",
+        "listeners",
+        "little_endian",
+        "owner",
+        "snapshots",
+        "unencoded",
+        "values",
+        "version",
+    )
+
+    def __init__(self) -> None:
+        self.changed: set[str] = set()
+        """Names of the attributes assigned since the instance was last checked for changes"""
+        self.unencoded: set[str] = set()
+        """Names of the attributes that changed since the last encode"""
+        self.version = 0
+        """Version of the latest change of the instance, 0 if it was never checked for changes"""
+        self.snapshots: dict[str, Any] = {}
+        """Copies of the compared lists and arrays, and ItemsSnapshots of the tracked nested StructDataclasses"""
+        self.values: list[Any] = []
+        """Values of the nested StructDataclasses that don't track their changes, as of the last check"""
+        self.listeners: dict[int, tuple[weakref.ref[ItemsSnapshot], set[int]]] = {}
+        """
+        ItemsSnapshots of the instances this one is nested in and the indexes of this instance in them, by id of
+        the ItemsSnapshot. They are held weakly, and removed once the ItemsSnapshot is gone.
+        """
+        self.encoded: bytearray | None = None
+        """Bytes of the last encode, or None if the next encode has to encode everything"""
+        self.little_endian = False
+        """Byte order of the last encode"""
+        self.owner = 0
+        """id() of the instance the state belongs to, shallow copies of an instance share the tracker at first"""
+
+    def __repr__(self) -> str:
+        return f"ChangeTracker(version={self.version}, unencoded={self.unencoded})"
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> ChangeTracker:
+        # Copies of an instance start over, instead of copying the state of the original
+        return ChangeTracker()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickled instances start over as well, the state refers to other live instances
+        return ChangeTracker, ()
+
+
+class ItemsSnapshot:
+    """
+    Items of a tracked nested StructDataclass attribute, as of the last check for changes.
+    """
+
+    __slots__ = ("__weakref__", "dirty", "items", "pending", "versions")
+
+    def __init__(self, items: list[Any]) -> None:
+        self.items = items
+        """The items"""
+        self.versions = [_item_version(item) for item in items]
+        """Version of every item"""
+        self.dirty: set[int] = set()
+        """Indexes of the items with attributes assigned since the last check, added to by `tracked_setattr`"""
+        self.pending: set[int] = set()
+        """Indexes of the items that changed since the last encode"""
+        for idx, item in enumerate(items):
+            self._listen(item, idx)
+
+    def _listen(self, item: Any, idx: int) -> None:
+        """
+        Register this snapshot with an item, so that assigning attributes of the item marks its index as dirty
+
+        :param item: The item
+        :param idx: Index of the item
+        """
+        listeners = get_tracker(item).listeners
+        key = id(self)
+        if (listener := listeners.get(key)) is None:
+            # The entry goes away with the snapshot, before its id can be reused
+            listener = listeners[key] = (weakref.ref(self, lambda _: listeners.pop(key, None)), set())
+        listener[1].add(idx)
+
+    def _unlisten(self, item: Any, idx: int) -> None:
+        """
+        Unregister this snapshot from an item that is no longer at the given index
+
+        :param item: The item
+        :param idx: Index of the item
+        """
+        listeners = get_tracker(item).listeners
+        if (listener := listeners.get(id(self))) is not None:
+            listener[1].discard(idx)
+            if not listener[1]:
+                del listeners[id(self)]
+
+    def replace(self, idx: int, item: Any) -> None:
+        """
+        Replace an item that was swapped out, moving the registration over to the new item
+
+        :param idx: Index of the item
+        :param item: New item
+        """
+        self._unlisten(self.items[idx], idx)
+        self._listen(item, idx)
+        self.items[idx] = item
+
+
+@dataclass(frozen=True)
+class TrackedStates:
+    """
+    StructStates of a class created with `track_changes=True`, grouped by how their changes are found.
+    """
+
+    by_name: dict[str, structdataclass.StructState]
+    """Every StructState by attribute name"""
+    compared: tuple[structdataclass.StructState, ...]
+    """Lists and arrays of primitive values, compared with a copy as they can change in place"""
+    nested: tuple[tuple[structdataclass.StructState, bool], ...]
+    """Nested StructDataclasses of classes that track their own changes, and the `assigned_only` of their class"""
+    untracked: dict[str, slice]
+    """Nested StructDataclasses that don't track their changes, and the slice of their values in `encode_untracked`"""
+    encode_untracked: Callable[[Any], list[Any]]
+    """Function returning the values of all `untracked` attributes of an instance"""
+    repacked: frozenset[str]
+    """Nested StructDataclasses that don't track their changes and hold arrays, which count as changed every time"""
+    assigned_only: bool
+    """True if instances can only change by assigning their attributes, so nothing has to be compared"""
+
+
+def get_tracker(instance: structdataclass.StructDataclass) -> ChangeTracker:
+    """
+    Get the ChangeTracker of an instance, replacing it if it was taken over from another instance by a copy
+
+    :param instance: StructDataclass instance of a class created with `track_changes=True`
+    :return: ChangeTracker of the instance
+    """
+    tracker: ChangeTracker = instance._struct_tracker  # type: ignore[attr-defined]
+    if tracker.owner != id(instance):
+        if tracker.owner:
+            tracker = ChangeTracker()
+            object.__setattr__(instance, "_struct_tracker", tracker)
+        tracker.owner = id(instance)
+    return tracker
+
+
+def tracked_setattr(self: structdataclass.StructDataclass, name: str, value: Any) -> None:
+    """
+    `__setattr__` of classes created with `track_changes=True`, recording the name of every assigned attribute
+
+    :param name: Name of the attribute
+    :param value: New value of the attribute
+    """
+    object.__setattr__(self, name, value)
+    tracker: ChangeTracker | None = getattr(self, "_struct_tracker", None)
+    if tracker is not None:
+        tracker.changed.add(name)
+        # Let the instances this one is nested in know, so they don't have to check all of their items
+        for ref, indexes in tuple(tracker.listeners.values()):
+            if (snapshot := ref()) is not None:
+                snapshot.dirty.update(indexes)
+
+
+def _is_tracked(cls: type[structdataclass.StructDataclass]) -> bool:
+    """
+    :param cls: StructDataclass class
+    :return: True if changes of instances of the class can be found without encoding them
+    """
+    return cls.__struct_track_changes__ and cls._encode is structdataclass.StructDataclass._encode
+
+
+def _items(state: structdataclass.StructState, value: Any) -> list[Any]:
+    """
+    :param state: StructState of a nested StructDataclass attribute
+    :param value: Value of the attribute
+    :return: List of the nested StructDataclass instances of the attribute
+    """
+    return value if state.size > 1 else [value]
+
+
+def _encode_states(
+    instance: structdataclass.StructDataclass, states: Iterable[structdataclass.StructState]
+) -> list[Any]:
+    """
+    Encode some of the nested StructDataclass attributes of an instance, for classes without code generation
+
+    :param instance: StructDataclass instance
+    :param states: StructStates of the nested StructDataclass attributes to encode
+    :return: List of the values of the attributes
+    """
+    return [
+        value for state in states for item in _items(state, getattr(instance, state.name)) for value in item._encode()
+    ]
+
+
+def _tracked_states(cls: type[structdataclass.StructDataclass]) -> TrackedStates:
+    """
+    :param cls: StructDataclass class
+    :return: TrackedStates of the class
+    """
+
+    def build() -> TrackedStates:
+        states = cls.__struct_layout__.states
+        structs = [state for state in states if state.struct_class is not None]
+        compared = tuple(state for state in states if state.struct_class is None and state.size > 1)
+        untracked = [state for state in structs if not _is_tracked(state.struct_class)]  # type: ignore[arg-type]
+        by_values = [state for state in untracked if state.layout and not state.layout.array_fields]
+        slices, start = {}, 0
+        for state in by_values:
+            slices[state.name] = slice(start, start + state.value_count * state.size)
+            start += state.value_count * state.size
+        return TrackedStates(
+            by_name={state.name: state for state in states},
+            compared=compared,
+            nested=tuple(
+                (state, _tracked_states(state.struct_class).assigned_only)  # type: ignore[arg-type]
+                for state in structs
+                if _is_tracked(state.struct_class)  # type: ignore[arg-type]
+            ),
+            untracked=slices,
+            encode_untracked=(
+                build_states_encoder(cls, by_values)
+                if cls.__struct_codegen__
+                else lambda instance: _encode_states(instance, by_values)
+            ),
+            repacked=frozenset(state.name for state in untracked if state.name not in slices),
+            assigned_only=not compared and not structs,
+        )
+
+    return class_cached(cls, "__struct_tracked_states__", build)
+
+
+def _item_version(item: structdataclass.StructDataclass) -> int:
+    """
+    :param item: Nested StructDataclass instance of a class created with `track_changes=True`
+    :return: Version of the latest change of the item
+    """
+    tracker = get_tracker(item)
+    if tracker.changed or not tracker.version or not _tracked_states(type(item)).assigned_only:
+        return refresh(item)
+    # Only assignments can change the item, and there were none since it was last checked
+    return tracker.version
+
+
+def refresh(instance: structdataclass.StructDataclass) -> int:
+    """
+    Check an instance for changes since it was last checked
+
+    Nested instances are checked as well, without marking their changes as encoded, so that every
+    StructDataclass that holds them finds their changes, and so does an encode of the nested instance itself.
+
+    :param instance: StructDataclass instance of a class created with `track_changes=True`
+    :return: Version of the latest change of the instance
+    """
+    tracker = get_tracker(instance)
+    states = _tracked_states(type(instance))
+    snapshots = tracker.snapshots
+
+    if not tracker.version:
+        # Everything is new on the first check
+        for state in states.compared:
+            snapshots[state.name] = getattr(instance, state.name)[:]
+        for state, _ in states.nested:
+            snapshots[state.name] = ItemsSnapshot(list(_items(state, getattr(instance, state.name))))
+        if states.untracked:
+            tracker.values = states.encode_untracked(instance)
+        tracker.changed.clear()
+        tracker.unencoded.update(states.by_name)
+        tracker.version = next(_versions)
+        return tracker.version
+
+    changed = tracker.changed & states.by_name.keys()
+    tracker.changed.clear()
+    for state in states.compared:
+        value = getattr(instance, state.name)
+        if state.name in changed or value != snapshots[state.name]:
+            changed.add(state.name)
+            snapshots[state.name] = value[:]
+    for state, assigned_only in states.nested:
+        items = _items(state, getattr(instance, state.name))
+        snapshot: ItemsSnapshot = snapshots[state.name]
+        candidates: Iterable[int] = range(state.size)
+        if assigned_only and state.name not in changed:
+            # Only the replaced items, and the items with assigned attributes, can have changed
+            snapshot_items = snapshot.items
+            replaced = [idx for idx, item in enumerate(items) if item is not snapshot_items[idx]]
+            replaced.extend(snapshot.dirty)
+            candidates = replaced
+        for idx in candidates:
+            item = items[idx]
+            item_version = _item_version(item)
+            if item is not snapshot.items[idx]:
+                snapshot.replace(idx, item)
+            elif item_version == snapshot.versions[idx]:
+                continue
+            snapshot.versions[idx] = item_version
+            snapshot.pending.add(idx)
+            changed.add(state.name)
+        snapshot.dirty.clear()
+    if states.untracked:
+        values = states.encode_untracked(instance)
+        if values != tracker.values:
+            previous = tracker.values
+            changed.update(name for name, part in states.untracked.items() if values[part] != previous[part])
+            tracker.values = values
+    changed |= states.repacked
+
+    if changed:
+        tracker.unencoded |= changed
+        tracker.version = next(_versions)
+    return tracker.version
+
+
+def find_changes(instance: structdataclass.StructDataclass) -> set[str]:
+    """
+    Find the attributes of an instance that changed since its last encode
+
+    :param instance: StructDataclass instance of a class created with `track_changes=True`
+    :return: Names of the changed attributes, all attributes if the instance was not encoded on its own yet
+    """
+    tracker = get_tracker(instance)
+    refresh(instance)
+    if tracker.encoded is None:
+        return set(_tracked_states(type(instance)).by_name)
+    return set(tracker.unencoded)
+
+
+def _pack_items(
+    buffer: bytearray,
+    state: structdataclass.StructState,
+    value: Any,
+    little_endian: bool,
+    indexes: Iterable[int] | None = None,
+) -> None:
+    """
+    Pack the nested StructDataclass items of an attribute into the buffer
+
+    :param buffer: Buffer holding the encoded struct
+    :param state: StructState of the attribute
+    :param value: Value of the attribute
+    :param little_endian: Byte order of the buffer
+    :param indexes: Indexes of the items to pack, or None to pack every item
+    """
+    assert state.layout is not None
+    items = _items(state, value)
+    for idx in range(state.size) if indexes is None else indexes:
+        state.layout.pack_into(buffer, state.offset + idx * state.byte_size, items[idx]._encode(), little_endian)
+
+
+def encode_changes(instance: structdataclass.StructDataclass, little_endian: bool) -> bytearray:
+    """
+    Encode an instance of a class created with `track_changes=True`, only packing the attributes that changed
+
+    The first encode, and any encode with a different byte order than the previous one, encodes everything.
+
+    :param instance: StructDataclass instance
+    :param little_endian: True if encoding little_endian formatted data, else False
+    :return: Buffer holding the encoded bytes. This is the internal cache of the instance and must not be modified.
+    """
+    tracker = get_tracker(instance)
+    refresh(instance)
+    states = _tracked_states(type(instance))
+    buffer = tracker.encoded
+    if buffer is None or tracker.little_endian != little_endian:
+        buffer = bytearray(instance.__struct_layout__.pack(instance._encode(), little_endian))
+        tracker.encoded = buffer
+        tracker.little_endian = little_endian
+        for state, _ in states.nested:
+            tracker.snapshots[state.name].pending.clear()
+    else:
+        for name in tracker.unencoded:
+            state = states.by_name[name]
+            if state.struct_class is None:
+                value = getattr(instance, name)
+                if state.array_typecode is not None:
+                    data = state.dump_array(value, little_endian)
+                    buffer[state.offset : state.offset + len(data)] = data
+                elif state.size > 1:
+                    state.get_struct(little_endian).pack_into(buffer, state.offset, *value)
+                else:
+                    state.get_struct(little_endian).pack_into(buffer, state.offset, value)
+            elif name in states.untracked:
+                # Packed from the values they were compared with
+                values = tracker.values[states.untracked[name]]
+                state.get_struct(little_endian).pack_into(buffer, state.offset, *values)
+            elif name in states.repacked:
+                _pack_items(buffer, state, getattr(instance, name), little_endian)
+            else:
+                snapshot: ItemsSnapshot = tracker.snapshots[name]
+                _pack_items(buffer, state, getattr(instance, name), little_endian, snapshot.pending)
+                snapshot.pending.clear()
+    tracker.unencoded.clear()
+    return buffer
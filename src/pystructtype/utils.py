@@ -2,11 +2,15 @@
 utils: Utility functions for pystructtype.
 """
 
-from collections.abc import Generator
-from typing import TypeVar
+import threading
+from collections.abc import Callable, Generator
+from typing import Any, TypeVar
 
 C = TypeVar("C")  # Generic type variable for list_chunks and other generic utilities.
 
+CLASS_CACHE_LOCK = threading.RLock()
+"""Lock serializing the creation of values cached on classes, reentrant as builders recurse into nested classes"""
+
 
 def list_chunks[C](_list: list[C], n: int) -> Generator[list[C]]:
     """
@@ -52,3 +56,25 @@ def int_to_bool_list(data: int | list[int], byte_length: int) -> list[bool]:
     bit_list = map(int, "".join(bit_strs[::-1]))
     # Convert the bit list to bools and return
     return list(map(bool, bit_list))
+
+
+def class_cached[C](cls: type[Any], name: str, build: Callable[[], C]) -> C:
+    """
+    Get a value cached on a class, building it on first use.
+
+    The value is looked up in the class `__dict__`, so subclasses don't reuse the value of their parent class.
+    Concurrent first uses from multiple threads build the value once, and every thread gets the same value.
+
+    :param cls: Class holding the cached value
+    :param name: Name of the class attribute holding the value
+    :param build: Function building the value
+    :return: The cached value
+    """
+    value: C | None = cls.__dict__.get(name)
+    if value is None:
+        with CLASS_CACHE_LOCK:
+            value = cls.__dict__.get(name)
+            if value is None:
+                value = build()
+                setattr(cls, name, value)
+    return value
@@ -0,0 +1,30 @@
+"""
+Tests for the benchmark runner.
+"""
+
+from pathlib import Path
+
+from benchmarks import runner
+from benchmarks.cases import CASES, Case
+
+
+def test_measure_and_compare(tmp_path: Path) -> None:
+    """
+    Test measuring cases, saving and loading results, and finding regressions against a baseline.
+    """
+    cases = {case.name: case for case in CASES}
+    results = runner.run([cases["flat.decode"], cases["memory.flat"]], repeat=1, min_time=0.01, verbose=False)
+    assert [r.name for r in results] == ["flat.decode", "memory.flat"]
+    assert results[0].ns_per_op > 0 and results[0].bytes_per_instance is None
+    assert results[1].bytes_per_instance is not None and results[1].bytes_per_instance > 0
+
+    path = tmp_path / "results.json"
+    runner.save(path, results)
+    assert runner.load(path) == results
+    assert runner.compare(results, results, 0.1) == []
+
+    slower = runner.measure(Case("flat.decode", lambda: lambda: sum(range(10_000))), repeat=1, min_time=0.01)
+    (regression,) = runner.compare(results, [slower], 0.1)
+    assert (regression.name, regression.metric) == ("flat.decode", "ns_per_op")
+    assert regression.ratio > 1.1
+    assert runner.compare(results, [slower], 1e9) == []
@@ -6,7 +6,9 @@ from typing import ClassVar
 
 import pytest
 
-from pystructtype import BitsType, uint8_t, uint16_t
+from pystructtype import BitsType, StructDataclass, uint8_t, uint16_t, uint64_t
+from pystructtype.bitstype import BitFlag, BitsView
+from pystructtype.utils import int_to_bool_list
 
 
 # Use a list of length > 1 for 'b', and ensure the bits logic works with the current structdataclass logic
@@ -94,3 +96,153 @@ def test_type_error_missing_attributes() -> None:
     with pytest.raises(TypeError):
         # noinspection PyUnusedLocal
         class X(BitsType): ...
+
+
+class MyBits64(BitsType):
+    __bits_type__: ClassVar = uint64_t
+    __bits_definition__: ClassVar = {"low": 0, "high": 63, "mid": [31, 32, 5]}
+    low: bool
+    high: bool
+    mid: list[bool]
+
+
+def test_bits_masks_match_int_to_bool_list() -> None:
+    """
+    Test that the mask based decode/encode gives the same results as int_to_bool_list.
+    """
+    assert MyBits64.__bits_flag_masks__ == (("low", 1), ("high", 1 << 63))
+    assert MyBits64.__bits_list_masks__ == (("mid", (1 << 31, 1 << 32, 1 << 5)),)
+
+    b = MyBits64()
+    for raw in (0, 1, 1 << 63, 0xDEADBEEFCAFEF00D, (1 << 64) - 1, 1 << 32 | 1 << 5):
+        b.decode(raw.to_bytes(8, "big"))
+        bits = int_to_bool_list(raw, 8)
+        assert [b.low, b.high, b.mid] == [bits[0], bits[63], [bits[31], bits[32], bits[5]]]
+        # Only the defined bits are kept when encoding
+        assert int.from_bytes(b.encode(), "big") == raw & (1 | 1 << 63 | 1 << 31 | 1 << 32 | 1 << 5)
+
+
+def test_bits_out_of_range() -> None:
+    """
+    Test that bit positions outside of the __bits_type__ are rejected.
+    """
+    with pytest.raises(ValueError, match="Bit 8 of attribute b is out of range for a 8 bit __bits_type__"):
+        # noinspection PyUnusedLocal
+        class X(BitsType):
+            __bits_type__: ClassVar = uint8_t
+            __bits_definition__: ClassVar = {"a": 0, "b": [1, 8]}
+
+
+class DescriptorBits(BitsType, descriptors=True):
+    __bits_type__: ClassVar = uint16_t
+    __bits_definition__: ClassVar = {"a": 0, "steps": [1, 2, 3, 9], "c": 15}
+    a: bool
+    steps: list[bool]
+    c: bool
+
+
+def test_bits_descriptors_read_write_raw() -> None:
+    """
+    Test that descriptor mode attributes read and write the bits of _raw directly.
+    """
+    b = DescriptorBits()
+    assert isinstance(DescriptorBits.__dict__["a"], BitFlag)
+    assert b._meta is DescriptorBits.__bits_definition__
+
+    b.decode([0b00000010, 0b00000101])
+    assert b._raw == 0b0000001000000101
+    assert vars(b).keys() == {"_raw", "_meta"}
+    assert b.a
+    assert not b.c
+    assert isinstance(b.steps, BitsView)
+    assert b.steps == [False, True, False, True]
+    assert list(b.steps) == [False, True, False, True]
+    assert b.steps[1:3] == [True, False]
+    assert len(b.steps) == 4
+
+    b.a = False
+    b.c = True
+    b.steps[0] = True
+    b.steps[1:3] = [False, True]
+    assert b._raw == 0b1000001000001010
+    assert b.steps == [True, False, True, True]
+    b.steps = [False, False, False, False]
+    assert b.steps == [False] * 4
+    assert list(b.encode()) == [0b10000000, 0b00000000]
+
+    with pytest.raises(ValueError):
+        b.steps[0:2] = [True]
+
+
+def test_bits_descriptors_nested() -> None:
+    """
+    Test that descriptor mode BitsTypes are decoded as a plain _raw store when nested.
+    """
+
+    class Outer(StructDataclass):
+        flags: DescriptorBits
+        other: MyBits
+
+    assert DescriptorBits._decode is StructDataclass._decode
+    o = Outer()
+    o.decode([0x80, 0x01, 0x0D])
+    assert o.flags.a and o.flags.c
+    assert o.other.a and o.other.c
+    o.flags.steps[3] = True
+    assert list(o.encode()) == [0x82, 0x01, 0x0D]
+    assert [r.flags._raw for r in Outer.decode_many(bytes([0, 1, 0, 0, 2, 0]))] == [1, 2]
+
+
+class SlottedBits(BitsType, slots=True):
+    __bits_type__: ClassVar = uint8_t
+    __bits_definition__: ClassVar = {"a": 0, "b": [1, 2], "c": 3}
+    a: bool
+    b: list[bool]
+    c: bool
+
+
+class SlottedDescriptorBits(BitsType, slots=True, descriptors=True):
+    __bits_type__: ClassVar = uint16_t
+    __bits_definition__: ClassVar = {"a": 0, "steps": [1, 2, 3, 9], "c": 15}
+    a: bool
+    steps: list[bool]
+    c: bool
+
+
+def test_bits_slots() -> None:
+    """
+    Test that slotted BitsTypes have no per-instance __dict__ and decode/encode like the regular ones.
+    """
+    s = SlottedBits(a=True)
+    assert not hasattr(s, "__dict__")
+    assert SlottedBits.__slots__ == ("_raw", "_meta", "a", "b", "c")
+    assert s.a and s._meta == dict(SlottedBits.__bits_definition__)
+    assert repr(s) == "SlottedBits(a=True, b=[False, False], c=False)"
+
+    s.decode([13])
+    assert (s.a, s.b, s.c, s._raw) == (True, [False, True], True, 13)
+    s.b = [True, False]
+    assert s.encode() == b"\x0b"
+    with pytest.raises(AttributeError):
+        s.d = True  # type: ignore[attr-defined]
+
+    d = SlottedDescriptorBits()
+    assert not hasattr(d, "__dict__")
+    assert SlottedDescriptorBits.__slots__ == ("_raw", "_meta")
+    assert isinstance(SlottedDescriptorBits.__dict__["a"], BitFlag)
+    d.decode([0b00000010, 0b00000101])
+    assert d.a and not d.c and d.steps == [False, True, False, True]
+    d.c = True
+    assert d.encode() == b"\x82\x05"
+    assert repr(d) == "SlottedDescriptorBits(_raw=33285)"
+    assert d != SlottedDescriptorBits()
+
+    class Outer(StructDataclass, slots=True):
+        flags: SlottedDescriptorBits
+        other: SlottedBits
+
+    o = Outer()
+    o.decode([0x80, 0x01, 0x0D])
+    assert o.flags.a and o.flags.c and o.other.b == [False, True]
+    assert Outer.decode_many(bytes([0x80, 0x01, 0x0D]) * 2) == [o, o]
+    assert o.encode() == bytes([0x80, 0x01, 0x0D])
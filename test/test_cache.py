@@ -0,0 +1,115 @@
+"""
+Tests for the decode cache of records.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated
+
+import pytest
+
+from pystructtype import DecodeCacheInfo, StructDataclass, StructRecord, TypeMeta, uint8_t, uint16_t
+from pystructtype.cache import DecodeCache
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class Status(StructDataclass, decode_cache=2):
+    code: uint8_t
+    values: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+
+class CachedConfig(SMXConfigType, decode_cache=4):
+    pass
+
+
+def test_decode_cache() -> None:
+    """
+    Test hits, misses and evictions of the LRU cache.
+    """
+    Status.decode_cache_clear()
+    first = Status.decode_record(b"\x01\x00\x02\x00\x03")
+    assert Status.decode_record(bytearray(b"\x01\x00\x02\x00\x03")) is first
+    assert Status.decode_record(b"\xff\x01\x00\x02\x00\x03", offset=1) is first
+    assert Status.decode_record(b"\x01\x00\x02\x00\x03", little_endian=True) is not first
+    assert Status.decode_cache_info() == DecodeCacheInfo(hits=2, misses=2, evictions=0, maxsize=2, currsize=2)
+
+    # The least recently used payload is evicted first
+    assert Status.decode_record(b"\x01\x00\x02\x00\x03") is first
+    Status.decode_record(b"\x02\x00\x02\x00\x03")
+    assert Status.decode_record(b"\x01\x00\x02\x00\x03") is first
+    assert Status.decode_cache_info() == DecodeCacheInfo(hits=4, misses=3, evictions=1, maxsize=2, currsize=2)
+    assert first == (1, (2, 3))
+
+    Status.decode_cache_clear()
+    assert Status.decode_cache_info() == DecodeCacheInfo(hits=0, misses=0, evictions=0, maxsize=2, currsize=0)
+
+
+def test_decode_cache_nested_and_errors() -> None:
+    """
+    Test caching records of the SMXConfig example, and payloads that are too short.
+    """
+    data = bytes(TEST_CONFIG_DATA)
+    record = CachedConfig.decode_record(data, little_endian=True)
+    assert record.to_struct().encode(little_endian=True) == data
+    assert CachedConfig.decode_record(data, little_endian=True) is record
+
+    with pytest.raises(ValueError, match="Unable to decode 5 bytes at offset 1"):
+        Status.decode_record(b"\x01\x00\x02\x00\x03", offset=1)
+    with pytest.raises(TypeError, match="SMXConfigType has no decode cache"):
+        SMXConfigType.decode_cache_info()
+    with pytest.raises(ValueError, match="decode_cache must be at least 0, got -1"):
+
+        class Broken(StructDataclass, decode_cache=-1):
+            a: uint8_t
+
+
+def test_decode_cache_per_class() -> None:
+    """
+    Test that subclasses have their own cache, and can disable it.
+    """
+
+    class Child(Status):
+        pass
+
+    class Uncached(Status, decode_cache=0):
+        pass
+
+    Status.decode_cache_clear()
+    assert Child.decode_record(b"\x01\x00\x02\x00\x03") is Child.decode_record(b"\x01\x00\x02\x00\x03")
+    assert Child.decode_cache_info().hits == 1
+    assert Status.decode_cache_info().currsize == 0
+    assert Uncached.decode_record(b"\x01\x00\x02\x00\x03") is not Uncached.decode_record(b"\x01\x00\x02\x00\x03")
+
+
+def test_decode_cache_threads() -> None:
+    """
+    Test concurrent lookups from many threads.
+    """
+
+    class Shared(StructDataclass, decode_cache=8):
+        a: uint8_t
+        b: uint16_t
+
+    payloads = [bytes([i % 16, 0, i % 16]) for i in range(2000)]
+    with ThreadPoolExecutor(8) as executor:
+        records = list(executor.map(Shared.decode_record, payloads))
+    assert [(r.a, r.b) for r in records] == [(p[0], p[2]) for p in payloads]
+    info = Shared.decode_cache_info()
+    assert info.hits + info.misses == len(payloads)
+    assert info.currsize == 8
+    assert info.misses - info.evictions == 8
+
+
+def test_decode_cache_concurrent_miss() -> None:
+    """
+    Test that a payload cached by another thread while it was being decoded is returned from the cache.
+    """
+    cache = DecodeCache(2)
+    payload = bytes([1, 0, 2, 0, 3])
+
+    def decode() -> StructRecord:
+        # Another thread misses on, and caches, the same payload while this one decodes it
+        return cache.get(payload, False, lambda: Status.decode_record(payload))
+
+    first = cache.get(payload, False, decode)
+    assert cache.get(payload, False, decode) is first
+    assert cache.info() == DecodeCacheInfo(hits=2, misses=1, evictions=0, maxsize=2, currsize=1)
@@ -0,0 +1,166 @@
+"""
+Tests for the generated StructDataclass decode/encode functions.
+"""
+
+from dataclasses import field
+from typing import Annotated
+
+import pytest
+
+from pystructtype import StructDataclass, TypeMeta, uint8_t
+from pystructtype.codegen import UNROLL_LIMIT
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class GenericSMXConfigType(SMXConfigType, codegen=False):
+    pass
+
+
+def test_codegen_matches_generic_smx_config() -> None:
+    """
+    Test that the generated functions give identical results to the generic implementation.
+    """
+    assert SMXConfigType.__struct_codegen__
+    assert not GenericSMXConfigType.__struct_codegen__
+
+    generated = SMXConfigType()
+    generated.decode(TEST_CONFIG_DATA, little_endian=True)
+    generic = GenericSMXConfigType()
+    generic.decode(TEST_CONFIG_DATA, little_endian=True)
+
+    assert generated._encode() == generic._encode()
+    assert generated.encode(little_endian=True) == generic.encode(little_endian=True)
+    assert list(generated.encode(little_endian=True)) == TEST_CONFIG_DATA
+    assert generated.flags == generic.flags
+    assert generated.enabled_sensors._data == generic.enabled_sensors._data
+    assert generated.step_color == generic.step_color
+    assert generated.packed_panel_settings == generic.packed_panel_settings
+    assert generated.auto_light_panel_mask.steps == generic.auto_light_panel_mask.steps
+
+
+def test_codegen_inlines_nested_structs() -> None:
+    """
+    Test that nested StructDataclasses without a custom _decode are flattened into the parent,
+    and that ones with a custom _decode are still called.
+    """
+
+    class Inner(StructDataclass):
+        x: uint8_t
+        y: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class Custom(StructDataclass):
+        v: uint8_t
+
+        def _decode(self, data: list[int]) -> None:
+            super()._decode(data)
+            self.v *= 2
+
+    class Outer(StructDataclass):
+        inners: Annotated[list[Inner], TypeMeta(size=2)]
+        custom: Custom
+
+    o = Outer()
+    o.decode([1, 2, 3, 4, 5, 6, 7])
+    assert [(i.x, i.y) for i in o.inners] == [(1, [2, 3]), (4, [5, 6])]
+    assert o.custom.v == 14
+    assert list(o.encode()) == [1, 2, 3, 4, 5, 6, 14]
+
+
+def test_codegen_short_data_raises() -> None:
+    """
+    Test that the generated decoder rejects too few values.
+    """
+
+    class S(StructDataclass):
+        a: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    with pytest.raises(IndexError):
+        S()._decode([1])
+
+
+def test_codegen_loops_over_long_nested_lists() -> None:
+    """
+    Test that lists of nested StructDataclasses longer than UNROLL_LIMIT are looped over instead of unrolled,
+    and give identical results to the generic implementation.
+    """
+
+    class Point(StructDataclass):
+        x: uint8_t
+        y: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class Custom(StructDataclass):
+        v: uint8_t
+
+        def _decode(self, data: list[int]) -> None:
+            super()._decode(data)
+            self.v ^= 0xFF
+
+        def _encode(self) -> list[int]:
+            return [self.v ^ 0xFF]
+
+    class Row(StructDataclass):
+        points: Annotated[list[Point], TypeMeta(size=UNROLL_LIMIT + 1)]
+
+    class Grid(StructDataclass):
+        head: uint8_t
+        rows: Annotated[list[Row], TypeMeta(size=20)]
+        customs: Annotated[list[Custom], TypeMeta(size=30)]
+        tail: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class GenericGrid(Grid, codegen=False):
+        pass
+
+    class LongRow(StructDataclass):
+        points: Annotated[list[Point], TypeMeta(size=1000)]
+
+    # The generated functions loop over the items, so they don't grow with the length of the list
+    for fn in ("__struct_decoder__", "__struct_encoder__", "__struct_factory__"):
+        assert len(getattr(Row, fn).__code__.co_code) == len(getattr(LongRow, fn).__code__.co_code)
+    data = bytes(i % 251 for i in range(Grid().byte_size()))
+    generated, generic = Grid(), GenericGrid()
+    generated.decode(data)
+    generic.decode(data)
+    assert generated.rows == generic.rows
+    assert generated.rows[19].points[UNROLL_LIMIT].y == [data[-34], data[-33]]
+    assert [c.v for c in generated.customs] == [b ^ 0xFF for b in data[-32:-2]]
+    assert generated._encode() == generic._encode()
+    assert generated.encode() == data
+    assert Grid.decode_many(data * 2) == [generated, generated]
+
+    record = Grid.decode_record(data)
+    assert record.rows[19].points[UNROLL_LIMIT].y == (data[-34], data[-33])
+    assert record.encode() == data
+    assert record.to_struct() == generated
+
+
+def test_codegen_constructs_with_positional_values() -> None:
+    """
+    Test that flat classes are decoded in batches by calling the class with the values, and that classes
+    with other `__init__` arguments still get every attribute.
+    """
+
+    class Flat(StructDataclass):
+        a: uint8_t
+        b: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class Scalars(StructDataclass):
+        a: uint8_t
+        b: uint8_t
+
+    class KeywordOnly(StructDataclass):
+        b: uint8_t = field(kw_only=True)
+        a: uint8_t = 0
+
+    class Nested(StructDataclass):
+        inner: Scalars
+        c: uint8_t
+
+    data = bytes(range(6))
+    assert not Flat.__struct_from_values__
+    assert [(f.a, f.b) for f in Flat.decode_many(data)] == [(0, [1, 2]), (3, [4, 5])]
+    assert Scalars.__struct_from_values__
+    assert [(s.a, s.b) for s in Scalars.decode_many(data)] == [(0, 1), (2, 3), (4, 5)]
+    assert not KeywordOnly.__struct_from_values__
+    assert [(k.a, k.b) for k in KeywordOnly.decode_many(data)] == [(1, 0), (3, 2), (5, 4)]
+    assert not Nested.__struct_from_values__
+    assert [(n.inner.a, n.inner.b, n.c) for n in Nested.decode_many(data)] == [(0, 1, 2), (3, 4, 5)]
@@ -0,0 +1,157 @@
+"""
+Tests for the generated ctypes.Structure classes.
+"""
+
+import ctypes
+from typing import Annotated, ClassVar
+
+import pytest
+
+from pystructtype import (
+    BitsType,
+    StructDataclass,
+    TypeMeta,
+    bool_t,
+    double_t,
+    string_t,
+    uint8_t,
+    uint16_t,
+    uint32_t,
+)
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class Flags(BitsType):
+    __bits_type__: ClassVar = uint16_t
+    __bits_definition__: ClassVar = {"a": 0, "b": [3, 4], "c": 15}
+    a: bool
+    b: list[bool]
+    c: bool
+
+
+class Inner(StructDataclass):
+    x: uint8_t
+    y: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+
+class Record(StructDataclass):
+    a: uint32_t
+    name: Annotated[string_t, TypeMeta[bytes](chunk_size=4)]
+    flags: Flags
+    inners: Annotated[list[Inner], TypeMeta(size=2)]
+    samples: Annotated[list[uint16_t], TypeMeta(size=3, array=True)]
+    z: double_t
+
+
+@pytest.mark.parametrize("little_endian", [False, True])
+def test_ctypes_layout_and_values(little_endian: bool) -> None:
+    """
+    Test that the generated structure matches the layout and values of the StructDataclass.
+    """
+    structure_type = Record.ctypes_type(little_endian)
+    assert issubclass(structure_type, ctypes.LittleEndianStructure if little_endian else ctypes.BigEndianStructure)
+    assert structure_type is Record.ctypes_type(little_endian)
+    assert ctypes.sizeof(structure_type) == Record().byte_size()
+    for state in Record.__struct_layout__.states:
+        assert getattr(structure_type, state.name).offset == state.offset
+
+    r = Record(a=1, name=b"abcd", z=2.5)
+    r.flags.b = [False, True]
+    r.flags.c = True
+    r.inners[1].y = [3, 4]
+    r.samples[2] = 5
+
+    structure = r.to_ctypes(little_endian)
+    assert bytes(structure) == r.encode(little_endian)
+    assert (structure.a, structure.name, structure.z) == (1, b"abcd", 2.5)
+    assert (structure.flags.a, structure.flags.b_0, structure.flags.b_1, structure.flags.c) == (0, 0, 1, 1)
+    assert list(structure.inners[1].y) == [3, 4]
+    assert list(structure.samples) == [0, 0, 5]
+
+    structure.flags.a = 1
+    structure.inners[0].x = 9
+    decoded = Record.from_ctypes(structure)
+    assert decoded.flags.a
+    assert decoded.inners[0].x == 9
+    assert decoded.encode(little_endian) == bytes(structure)
+
+
+@pytest.mark.parametrize("little_endian", [False, True])
+def test_ctypes_bool(little_endian: bool) -> None:
+    """
+    Test bool attributes in both byte orders, which are single bytes holding 0 or 1.
+    """
+
+    class Switches(StructDataclass):
+        on: bool_t
+        values: Annotated[list[bool_t], TypeMeta(size=2)]
+        count: uint16_t
+
+    switches = Switches(on=True, values=[False, True], count=3)
+    structure = switches.to_ctypes(little_endian)
+    assert bytes(structure) == switches.encode(little_endian)
+    assert (structure.on, list(structure.values), structure.count) == (1, [0, 1], 3)
+
+    structure.on = False
+    assert Switches.from_ctypes(structure) == Switches(on=False, values=[False, True], count=3)
+
+
+def test_ctypes_in_place() -> None:
+    """
+    Test in-place access to records in a writable buffer.
+    """
+    buffer = bytearray(TEST_CONFIG_DATA)
+    structure = SMXConfigType.ctypes_type(little_endian=True).from_buffer(buffer)
+
+    s = SMXConfigType()
+    s.decode(buffer, little_endian=True)
+    assert structure.panel_debounce_microseconds == s.panel_debounce_microseconds
+    assert structure.flags.autolights == s.flags.autolights
+    assert structure.step_color[3].g == s.step_color[3].g
+    assert [getattr(structure.auto_light_panel_mask, f"steps_{i}") for i in range(9)] == s.auto_light_panel_mask.steps
+
+    structure.step_color[3].g = 42
+    structure.auto_light_panel_mask.steps_8 = 0
+    s.decode(buffer, little_endian=True)
+    assert s.step_color[3].g == 42
+    assert not s.auto_light_panel_mask.steps[8]
+    assert SMXConfigType.from_ctypes(structure) == s
+
+
+def test_ctypes_aligned() -> None:
+    """
+    Test that aligned and packed StructDataclasses generate structures with the same padding.
+    """
+
+    class Aligned(StructDataclass, align=True):
+        a: uint8_t
+        b: uint32_t
+        inner: Inner
+
+    class Packed(StructDataclass, pack=2):
+        a: uint8_t
+        b: uint32_t
+
+    assert ctypes.sizeof(Aligned.ctypes_type()) == Aligned().byte_size() == 16
+    assert Aligned.ctypes_type().inner.offset == 8
+    assert ctypes.sizeof(Packed.ctypes_type()) == Packed().byte_size() == 6
+    assert Aligned.from_ctypes(Aligned(b=7).to_ctypes()).b == 7
+
+
+def test_ctypes_errors_and_shared_bits() -> None:
+    """
+    Test converting a structure of another class, and BitsTypes with attributes sharing bits.
+    """
+
+    class Shared(BitsType):
+        __bits_type__: ClassVar = uint8_t
+        __bits_definition__: ClassVar = {"a": 0, "b": [0, 1]}
+        a: bool
+        b: list[bool]
+
+    shared = Shared.ctypes_type()
+    assert [name for name, *_ in shared._fields_] == ["_raw"]
+    assert Shared.from_ctypes(shared(_raw=3)).b == [True, True]
+
+    with pytest.raises(TypeError, match="is not a ctypes structure of Record"):
+        Record.from_ctypes(Inner().to_ctypes())
@@ -0,0 +1,206 @@
+"""
+Tests for field paths, the offset table and selective field reads.
+"""
+
+import array
+import mmap
+from typing import Annotated
+
+import pytest
+
+from pystructtype import StructDataclass, TypeMeta, string_t, uint8_t, uint16_t, uint32_t
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class Header(StructDataclass):
+    msg_type: uint8_t
+    length: uint16_t
+
+
+class Message(StructDataclass):
+    header: Header
+    seq: uint32_t
+    name: Annotated[string_t, TypeMeta[bytes](chunk_size=3)]
+    samples: Annotated[list[uint16_t], TypeMeta(size=3)]
+    wide: Annotated[list[uint32_t], TypeMeta(size=2, array=True)]
+    parts: Annotated[list[Header], TypeMeta(size=2)]
+
+
+def _message() -> Message:
+    m = Message(seq=7, name=b"abc", samples=[1, 2, 3])
+    m.header.msg_type = 4
+    m.header.length = 500
+    m.wide[1] = 70000
+    m.parts[1].length = 9
+    return m
+
+
+def test_field_offsets() -> None:
+    """
+    Test the offset table of a class with nested structs, lists and arrays.
+    """
+    table = Message.field_offsets()
+    assert list(table) == [
+        "header",
+        "header.msg_type",
+        "header.length",
+        "seq",
+        "name",
+        "samples",
+        "wide",
+        "parts",
+        "parts[0]",
+        "parts[0].msg_type",
+        "parts[0].length",
+        "parts[1]",
+        "parts[1].msg_type",
+        "parts[1].length",
+    ]
+    assert {path: info.offset for path, info in table.items() if "." in path} == {
+        "header.msg_type": 0,
+        "header.length": 1,
+        "parts[0].msg_type": 24,
+        "parts[0].length": 25,
+        "parts[1].msg_type": 27,
+        "parts[1].length": 28,
+    }
+    assert (table["seq"].offset, table["seq"].byte_size, table["seq"].struct_fmt) == (3, 4, "I")
+    assert (table["samples"].byte_size, table["samples"].struct_fmt, table["samples"].count) == (6, "3H", 3)
+    assert (table["parts"].offset, table["parts"].byte_size) == (24, 6)
+
+    item = Message.field_info("samples[2]")
+    assert (item.offset, item.byte_size, item.struct_fmt) == (14, 2, "H")
+    assert Message.field_info("wide[1]").offset == 20
+
+    for path in ("nope", "header.nope", "seq.x", "samples[3]", "seq[0]", "samples[-1]", "header..msg_type"):
+        with pytest.raises(KeyError):
+            Message.field_info(path)
+
+
+@pytest.mark.parametrize("little_endian", [False, True])
+def test_read_fields(little_endian: bool) -> None:
+    """
+    Test reading single fields from a buffer, at an offset.
+    """
+    m = _message()
+    buffer = b"\xff" * 5 + m.encode(little_endian)
+
+    assert Message.read_fields(buffer, ["header.msg_type", "seq"], 5, little_endian) == (4, 7)
+    assert Message.read_fields(buffer, ["seq", "header.length", "samples", "name", "samples[1]"], 5, little_endian) == (
+        7,
+        500,
+        [1, 2, 3],
+        b"abc",
+        2,
+    )
+    assert Message.read_fields(buffer, ["wide[1]", "parts[1].length"], 5, little_endian) == (70000, 9)
+
+    # Fields that need conversion, or overlap, are read one by one
+    header, wide, parts, seq = Message.read_fields(buffer, ["header", "wide", "parts", "seq"], 5, little_endian)
+    assert header == m.header
+    assert wide == m.wide
+    assert parts == m.parts
+    assert seq == 7
+    assert Message.read_fields(buffer, ["header", "header.length"], 5, little_endian) == (m.header, 500)
+
+    reader = Message.field_reader(["seq"], little_endian)
+    assert reader is Message.field_reader(["seq"], little_endian)
+    assert reader(buffer, 5) == (7,)
+
+    with pytest.raises(ValueError, match="Unable to read fields at offset 32"):
+        Message.read_fields(buffer, ["seq"], 32, little_endian)
+    with pytest.raises(ValueError, match="Unable to read field header at offset 33"):
+        Message.read_fields(buffer, ["header", "header.length"], 33, little_endian)
+
+
+def test_read_bits_fields() -> None:
+    """
+    Test reading BitsType attributes and lists of nested structs from the SMXConfig example.
+    """
+    s = SMXConfigType()
+    s.decode(TEST_CONFIG_DATA, little_endian=True)
+    paths = [
+        "flags.autolights",
+        "flags.fsr",
+        "auto_light_panel_mask.steps",
+        "auto_light_panel_mask.steps[8]",
+        "step_color[4].g",
+        "panel_debounce_microseconds",
+    ]
+    assert SMXConfigType.read_fields(bytes(TEST_CONFIG_DATA), paths, little_endian=True) == (
+        s.flags.autolights,
+        s.flags.fsr,
+        s.auto_light_panel_mask.steps,
+        s.auto_light_panel_mask.steps[8],
+        s.step_color[4].g,
+        s.panel_debounce_microseconds,
+    )
+    table = SMXConfigType.field_offsets()
+    assert table["flags.fsr"].offset == table["flags"].offset
+    assert table["flags.fsr"].masks == (2,)
+
+
+@pytest.mark.parametrize("little_endian", [False, True])
+def test_get_and_set_field(little_endian: bool) -> None:
+    """
+    Test reading and patching single fields in place, only touching the bytes of the field.
+    """
+    m = _message()
+    buffer = bytearray(b"\xff" * 2 + m.encode(little_endian))
+
+    assert Message.get_field(buffer, "header.length", 2, little_endian) == 500
+    assert Message.get_field(buffer, "wide", 2, little_endian) == m.wide
+    assert Message.get_field(buffer, "parts[1]", 2, little_endian) == m.parts[1]
+
+    Message.set_field(buffer, "seq", 8, 2, little_endian)
+    Message.set_field(buffer, "samples[1]", 20, 2, little_endian)
+    Message.set_field(buffer, "name", b"xyz", 2, little_endian)
+    Message.set_field(buffer, "wide", [5, 6], 2, little_endian)
+    Message.set_field(buffer, "wide[0]", 50, 2, little_endian)
+    Message.set_field(buffer, "parts[0]", Header(msg_type=1, length=2), 2, little_endian)
+    Message.set_field(buffer, "parts[1].length", 3, 2, little_endian)
+    assert buffer[:2] == b"\xff\xff"
+
+    m.seq = 8
+    m.samples[1] = 20
+    m.name = b"xyz"
+    m.wide = array.array("I", [50, 6])  # type: ignore[assignment]
+    m.parts[0] = Header(msg_type=1, length=2)
+    m.parts[1].length = 3
+    assert buffer[2:] == m.encode(little_endian)
+
+    Message.set_field(buffer, "parts", [Header(msg_type=7), Header(length=8)], 2, little_endian)
+    assert Message.get_field(buffer, "parts", 2, little_endian) == [Header(msg_type=7), Header(length=8)]
+
+    with pytest.raises(ValueError, match="Unable to write field seq at offset 30"):
+        Message.set_field(buffer, "seq", 1, 27, little_endian)
+    with pytest.raises(ValueError, match="Unable to write field samples"):
+        Message.set_field(buffer, "samples", [1, 2], 2, little_endian)
+    with pytest.raises(ValueError, match="Attribute wide expects 2 items, got 1"):
+        Message.set_field(buffer, "wide", [1], 2, little_endian)
+    with pytest.raises(ValueError, match="Field parts expects 2 items, got 1"):
+        Message.set_field(buffer, "parts", [Header()], 2, little_endian)
+
+
+def test_set_bits_field_in_mmap() -> None:
+    """
+    Test read-modify-write of BitsType attributes inside an mmap.
+    """
+    with mmap.mmap(-1, len(TEST_CONFIG_DATA)) as mapped:
+        mapped[:] = bytes(TEST_CONFIG_DATA)
+        s = SMXConfigType()
+        s.decode(bytes(TEST_CONFIG_DATA), little_endian=True)
+
+        SMXConfigType.set_field(mapped, "flags.fsr", not s.flags.fsr, little_endian=True)
+        SMXConfigType.set_field(mapped, "auto_light_panel_mask.steps[8]", not s.auto_light_panel_mask.steps[8], 0, True)
+        SMXConfigType.set_field(mapped, "auto_light_panel_mask.steps", [True] * 9, little_endian=True)
+        SMXConfigType.set_field(mapped, "step_color[2].b", 77, little_endian=True)
+        assert SMXConfigType.get_field(mapped, "flags.fsr", little_endian=True) is (not s.flags.fsr)
+
+        s.flags.fsr = not s.flags.fsr
+        s.auto_light_panel_mask.steps = [True] * 9
+        s.step_color[2].b = 77
+        assert bytes(mapped) == s.encode(little_endian=True)
+
+        with pytest.raises(ValueError, match="expects 9 bits, got 2"):
+            SMXConfigType.set_field(mapped, "auto_light_panel_mask.steps", [True, False], little_endian=True)
@@ -0,0 +1,177 @@
+"""
+Tests for the opt-in decode and encode counters.
+"""
+
+import asyncio
+import gc
+import io
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar
+
+import pytest
+
+from pystructtype import (
+    BitsType,
+    OperationStats,
+    StructDataclass,
+    StructReader,
+    collect_stats,
+    parallel,
+    reset_stats,
+    stats,
+    stats_enabled,
+    uint8_t,
+    uint16_t,
+)
+from test.test_parallel import Sample, total_seq
+
+
+class Pair(StructDataclass):
+    a: uint8_t
+    b: uint16_t
+
+
+class Status(BitsType):
+    __bits_type__: ClassVar = uint8_t
+    __bits_definition__: ClassVar = {"ready": 0, "error": 1}
+    ready: bool
+    error: bool
+
+
+PAIR = f"{__name__}.Pair"
+
+
+@pytest.fixture(autouse=True)
+def _reset() -> None:
+    reset_stats()
+
+
+def test_counters() -> None:
+    """
+    Test counting single decodes and encodes, errors, and that nothing is counted outside of the context.
+    """
+    pair = Pair(1, 2)
+    pair.encode()
+    assert not stats_enabled()
+    assert stats() == {}
+    original = Pair.decode
+
+    with collect_stats():
+        assert stats_enabled()
+        assert Pair.decode is not original
+        data = pair.encode()
+        pair.encode_into(bytearray(3))
+        pair.decode(data)
+        pair.decode_from(data)
+        Pair.decode_record(data).encode()
+        with pytest.raises(ValueError):
+            pair.decode(b"\x00")
+        Status().decode(b"\x03")
+
+    assert not stats_enabled()
+    assert Pair.decode is original
+    pair.decode(data)
+
+    counters = stats()
+    assert set(counters) == {PAIR, f"{__name__}.Status"}
+    decode, encode = counters[PAIR].decode, counters[PAIR].encode
+    assert (decode.calls, decode.records, decode.bytes, decode.errors) == (4, 3, 9, 1)
+    assert (encode.calls, encode.records, encode.bytes, encode.errors) == (3, 3, 9, 0)
+    assert 0 < decode.max_time <= decode.total_time
+    assert counters[f"{__name__}.Status"].encode == OperationStats()
+    assert counters[f"{__name__}.Status"].decode.records == 1
+
+    reset_stats()
+    assert stats() == {}
+
+
+def test_batches_and_streams() -> None:
+    """
+    Test that batch and streaming decodes count all of their records once.
+    """
+    buffer = b"".join(Pair(i, i).encode() for i in range(10))
+
+    async def read_stream() -> None:
+        stream = asyncio.StreamReader()
+        stream.feed_data(buffer)
+        stream.feed_eof()
+        assert len([item async for item in Pair.aiter_decode(stream, chunk_size=7)]) == 10
+
+    with collect_stats(), collect_stats():
+        Pair.decode_many(buffer)
+        assert len(list(Pair.iter_records(buffer, count=4))) == 4
+        list(StructReader(io.BytesIO(buffer), Pair, buffer_size=6))
+        asyncio.run(read_stream())
+        with pytest.raises(ValueError):
+            Pair.iter_decode(buffer + b"\x00", strict=True)
+
+    decode = stats()[PAIR].decode
+    assert decode.records == 10 + 4 + 10 + 10
+    assert decode.bytes == decode.records * 3
+    assert decode.errors == 1
+    # decode_many, iter_records, the StructReader, one per batch of the stream, and the error
+    assert decode.calls == 1 + 1 + 1 + 5 + 1
+
+
+def test_pools() -> None:
+    """
+    Test counting the records of thread pools, and of decode_parallel in the calling process.
+    """
+    buffer = b"".join(Sample(seq=i).encode() for i in range(20))
+    with collect_stats():
+        Sample.decode_threaded(buffer, workers=4)
+        assert Sample.encode_threaded(Sample.decode_many(buffer), workers=2) == buffer
+        with ThreadPoolExecutor(2) as executor:
+            Sample.decode_parallel(buffer, workers=2, executor=executor, reducer=total_seq)
+
+    counters = stats()[f"{Sample.__module__}.Sample"]
+    assert (counters.decode.calls, counters.decode.records) == (4 + 1 + 1, 60)
+    assert (counters.encode.calls, counters.encode.records, counters.encode.bytes) == (2, 20, len(buffer))
+
+    # The counters of the threads of the pools are kept once the threads are gone
+    gc.collect()
+    assert stats()[f"{Sample.__module__}.Sample"] == counters
+
+
+def test_keyword_arguments() -> None:
+    """
+    Test that calls passing their arguments by keyword are counted the same as positional ones.
+    """
+    buffer = b"".join(Sample(seq=i).encode() for i in range(20))
+    size = Sample().byte_size()
+    items = Sample.decode_many(buffer, count=2)
+    with collect_stats():
+        assert len(Sample.decode_many(buffer=buffer, offset=size, count=4)) == 4
+        parallel._decode_chunk(cls=Sample, buffer=buffer, offset=size, count=3, little_endian=False, reducer=None)
+        with ThreadPoolExecutor(2) as executor:
+            parallel.decode_parallel(
+                cls=Sample,
+                source=buffer,
+                little_endian=False,
+                offset=2 * size,
+                count=5,
+                workers=2,
+                reducer=total_seq,
+                executor=executor,
+            )
+        parallel._encode_chunk(items=items, byte_length=size, little_endian=False)
+        Pair(1, 2).encode(little_endian=True)
+
+    counters = stats()[f"{Sample.__module__}.Sample"]
+    assert (counters.decode.calls, counters.decode.records) == (3, 4 + 3 + 5)
+    assert (counters.encode.calls, counters.encode.records) == (1, 2)
+    assert stats()[PAIR].encode.calls == 1
+
+
+def test_environment_variable() -> None:
+    """
+    Test enabling the counters for the whole process with the environment variable.
+    """
+    code = "import pystructtype; print(pystructtype.stats_enabled())"
+    for value, expected in (("1", "True"), ("0", "False")):
+        env = dict(os.environ, PYSTRUCTTYPE_STATS=value)
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == expected
@@ -0,0 +1,90 @@
+"""
+Tests for LazyStruct.
+"""
+
+from typing import Annotated
+
+import pytest
+
+from pystructtype import LazyStruct, StructDataclass, TypeMeta, uint8_t, uint16_t
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class Inner(StructDataclass):
+    x: uint8_t
+    y: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+
+class Outer(StructDataclass):
+    a: uint16_t
+    inner: Inner
+    inners: Annotated[list[Inner], TypeMeta(size=2)]
+
+
+OUTER_DATA = bytes([0, 1, 2, 0, 3, 0, 4, 5, 0, 6, 0, 7, 8, 0, 9, 0, 10])
+
+
+def test_lazy_decode_on_access() -> None:
+    """
+    Test that attributes are only decoded when accessed, and then cached.
+    """
+    buffer = bytearray(OUTER_DATA)
+    lazy = Outer.decode_lazy(buffer)
+    assert isinstance(lazy, LazyStruct)
+
+    assert lazy.a == 1
+    # Unaccessed attributes read whatever the buffer holds when they are first accessed
+    buffer[3] = 99
+    assert isinstance(lazy.inner, LazyStruct)
+    assert lazy.inner.x == 2
+    assert lazy.inner.y == [99 << 8 | 3, 4]
+    assert [i.x for i in lazy.inners] == [5, 8]
+    assert lazy.inners[1].y == [9, 10]
+
+    # Cached values are not re-read from the buffer
+    buffer[1] = 42
+    assert lazy.a == 1
+
+
+def test_lazy_encode() -> None:
+    """
+    Test that encoding a lazy view returns the raw bytes, or includes any assigned attributes.
+    """
+    lazy = Outer.decode_lazy(b"\xff" + OUTER_DATA, offset=1)
+    assert lazy.encode() == OUTER_DATA
+
+    lazy.a = 7
+    lazy.inners[0].x = 50
+    expected = Outer()
+    expected.decode(OUTER_DATA)
+    expected.a = 7
+    expected.inners[0].x = 50
+    assert lazy.encode() == expected.encode()
+    assert lazy.encode(little_endian=True) == expected.encode(little_endian=True)
+    assert lazy.to_struct() == expected
+
+    with pytest.raises(AttributeError):
+        lazy.not_a_field = 1
+
+    with pytest.raises(ValueError):
+        Outer.decode_lazy(OUTER_DATA, offset=1)
+
+
+def test_lazy_smx_config() -> None:
+    """
+    Test a lazy view of the SMX config, including nested structs with custom _decode functions.
+    """
+    lazy = SMXConfigType.decode_lazy(bytes(TEST_CONFIG_DATA), little_endian=True)
+    s = SMXConfigType()
+    s.decode(TEST_CONFIG_DATA, little_endian=True)
+
+    assert lazy.panel_debounce_microseconds == s.panel_debounce_microseconds
+    assert lazy.step_color[4].g == s.step_color[4].g
+    assert lazy.flags == s.flags
+    assert lazy.enabled_sensors[1] == s.enabled_sensors[1]
+    assert lazy.auto_light_panel_mask.steps == s.auto_light_panel_mask.steps
+    assert lazy.packed_panel_settings[8].combined_high_threshold == s.packed_panel_settings[8].combined_high_threshold
+
+    lazy.auto_light_panel_mask[0] = True
+    s.auto_light_panel_mask[0] = True
+    assert lazy.encode() == s.encode(little_endian=True)
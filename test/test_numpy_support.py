@@ -0,0 +1,75 @@
+"""
+Tests for the optional NumPy integration.
+"""
+
+from typing import Annotated
+
+import pytest
+
+from pystructtype import StructDataclass, TypeMeta, string_t, uint8_t, uint16_t
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+np = pytest.importorskip("numpy")
+
+
+class Inner(StructDataclass):
+    x: uint8_t
+    y: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+
+class Record(StructDataclass):
+    a: uint16_t
+    name: Annotated[string_t, TypeMeta[bytes](chunk_size=3)]
+    inner: Inner
+    inners: Annotated[list[Inner], TypeMeta(size=2)]
+
+
+def test_numpy_dtype() -> None:
+    """
+    Test that the dtype mirrors the layout, including arrays, nested structs and endianness.
+    """
+    dt = Record.numpy_dtype()
+    assert dt.itemsize == Record().byte_size()
+    assert dt["a"] == np.dtype(">u2")
+    assert dt["name"] == np.dtype("S3")
+    assert dt["inner"]["y"].subdtype == (np.dtype(">u2"), (2,))
+    assert dt["inners"].shape == (2,)
+    assert dt.fields["inners"][1] == Record.__struct_layout__.offsets["inners"]
+    assert Record.numpy_dtype(little_endian=True)["a"] == np.dtype("<u2")
+
+
+def test_to_numpy_matches_decode() -> None:
+    """
+    Test that the structured array view holds the same values as decoding each record.
+    """
+    records = [Record(a=i, name=b"ab" + bytes([65 + i])) for i in range(4)]
+    for i, r in enumerate(records):
+        r.inner.y = [i, i * 2]
+        r.inners[1].x = i + 10
+    buffer = bytearray(b"".join(r.encode(little_endian=True) for r in records) + b"\x00")
+
+    arr = Record.to_numpy(buffer, little_endian=True)
+    assert len(arr) == 4
+    assert arr["a"].tolist() == [0, 1, 2, 3]
+    assert arr["name"].tolist() == [b"abA", b"abB", b"abC", b"abD"]
+    assert arr["inner"]["y"].tolist() == [[0, 0], [1, 2], [2, 4], [3, 6]]
+    assert arr["inners"]["x"][:, 1].tolist() == [10, 11, 12, 13]
+
+    # The array is a view onto the buffer
+    buffer[0] = 9
+    assert arr["a"][0] == 9
+
+    assert Record.to_numpy(buffer, little_endian=True, offset=Record().byte_size(), count=2)["a"].tolist() == [1, 2]
+
+
+def test_to_numpy_smx_config() -> None:
+    """
+    Test the NumPy view of the SMX config example.
+    """
+    arr = SMXConfigType.to_numpy(bytes(TEST_CONFIG_DATA) * 2, little_endian=True)
+    s = SMXConfigType()
+    s.decode(TEST_CONFIG_DATA, little_endian=True)
+    assert arr.shape == (2,)
+    assert arr["panel_debounce_microseconds"][1] == s.panel_debounce_microseconds
+    assert arr["step_color"]["g"][0].tolist() == [c.g for c in s.step_color]
+    assert arr["flags"]["_raw"][0] == s.flags._raw
@@ -0,0 +1,115 @@
+"""
+Tests for decoding records with a pool of worker processes.
+"""
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Annotated
+
+import pytest
+
+from pystructtype import StructDataclass, TypeMeta, uint8_t, uint16_t, uint32_t
+
+
+class Sample(StructDataclass):
+    seq: uint32_t
+    channel: uint8_t
+    values: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+
+def total_seq(items: Iterator[Sample]) -> int:
+    """
+    Reducer summing the sequence numbers of a chunk.
+    """
+    return sum(item.seq for item in items)
+
+
+def _buffer(count: int, little_endian: bool = False) -> bytes:
+    return b"".join(Sample(seq=i, channel=i % 4, values=[i, 2 * i]).encode(little_endian) for i in range(count))
+
+
+@pytest.mark.parametrize("little_endian", [False, True])
+def test_decode_parallel(little_endian: bool) -> None:
+    """
+    Test that the results of all workers are concatenated in order.
+    """
+    buffer = b"\xff" * 3 + _buffer(101, little_endian) + b"\x01\x02"
+    decoded = Sample.decode_parallel(buffer, little_endian, offset=3, workers=3)
+    assert decoded == Sample.decode_many(buffer, little_endian, offset=3)
+    assert [s.seq for s in decoded] == list(range(101))
+
+    assert Sample.decode_parallel(buffer, little_endian, offset=3, count=10, workers=4) == decoded[:10]
+    assert Sample.decode_parallel(b"", workers=2) == []
+
+
+def test_decode_parallel_reducer_and_file(tmp_path: Path) -> None:
+    """
+    Test per-worker reductions, and decoding from a file mapped by every worker.
+    """
+    path = tmp_path / "samples.bin"
+    path.write_bytes(b"\x00" * 5 + _buffer(50))
+
+    totals = Sample.decode_parallel(path, offset=5, workers=4, reducer=total_seq)
+    assert len(totals) == 4
+    assert sum(totals) == sum(range(50))
+
+    assert Sample.decode_parallel(str(path), offset=5, count=7, workers=2) == Sample.decode_many(_buffer(7))
+    assert Sample.decode_parallel(path, offset=1000) == []
+
+
+def test_decode_parallel_executor() -> None:
+    """
+    Test submitting the chunks to an existing executor, and invalid worker counts.
+    """
+    with ThreadPoolExecutor(2) as executor:
+        totals = Sample.decode_parallel(_buffer(20), workers=5, executor=executor, reducer=total_seq)
+    assert totals == [sum(range(start, start + 4)) for start in range(0, 20, 4)]
+
+    with pytest.raises(ValueError, match="workers must be at least 1, got 0"):
+        Sample.decode_parallel(_buffer(2), workers=0)
+
+
+@pytest.mark.parametrize("little_endian", [False, True])
+def test_decode_and_encode_threaded(little_endian: bool) -> None:
+    """
+    Test decoding and encoding with a pool of threads.
+    """
+    buffer = b"\xff" + _buffer(101, little_endian)
+    decoded = Sample.decode_threaded(buffer, little_endian, offset=1, workers=4)
+    assert decoded == Sample.decode_many(buffer, little_endian, offset=1)
+    assert Sample.decode_threaded(buffer, little_endian, offset=1, workers=3, reducer=total_seq)[0] == sum(range(34))
+    assert Sample.decode_threaded(buffer, little_endian, offset=1, count=0) == []
+
+    assert Sample.encode_threaded(decoded, little_endian, workers=4) == buffer[1:]
+    with ThreadPoolExecutor(3) as executor:
+        assert Sample.encode_threaded(decoded[:5], little_endian, workers=8, executor=executor) == buffer[1:46]
+    assert Sample.encode_threaded([], workers=2) == b""
+
+    with pytest.raises(TypeError, match="Can not encode int as Sample"):
+        Sample.encode_threaded([Sample(), 5])  # type: ignore[list-item]
+
+    class Extended(Sample):
+        extra: uint32_t
+
+    # A subclass with more attributes doesn't fit the records of the class
+    with pytest.raises(TypeError, match="Can not encode Extended as Sample"):
+        Sample.encode_threaded([Sample(), Extended()], workers=2)
+    with pytest.raises(ValueError, match="workers must be at least 1, got -1"):
+        Sample.decode_threaded(buffer, workers=-1)
+
+
+def test_concurrent_class_caches() -> None:
+    """
+    Test that concurrent first uses of the per-class caches all get the same generated types.
+    """
+
+    class Fresh(StructDataclass):
+        a: uint8_t
+        inner: Sample
+
+    with ThreadPoolExecutor(8) as executor:
+        records = set(executor.map(lambda _: Fresh.record_type(), range(64)))
+        structures = set(executor.map(lambda _: Fresh.ctypes_type(), range(64)))
+    assert len(records) == len(structures) == 1
+    assert Fresh.decode_record(bytes(Fresh().byte_size())).inner == Sample().to_record()
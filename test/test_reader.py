@@ -0,0 +1,208 @@
+"""
+Tests for StructReader.
+"""
+
+import asyncio
+import gzip
+import io
+import lzma
+import os
+import socket
+import threading
+
+import pytest
+
+from pystructtype import StructDataclass, StructReader, uint8_t, uint16_t
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class Record(StructDataclass):
+    a: uint16_t
+    b: uint8_t
+
+
+RECORDS = b"".join(Record(a=i, b=i % 256).encode() for i in range(1000))
+
+
+def check_records(records: list[Record]) -> None:
+    """
+    Check that the records match the ones encoded in RECORDS.
+    """
+    assert [(r.a, r.b) for r in records] == [(i, i % 256) for i in range(1000)]
+
+
+@pytest.mark.parametrize("buffer_size", [1, 7, 64, 1 << 16])
+def test_reader_file_chunks(buffer_size: int) -> None:
+    """
+    Test reading records that cross read boundaries with various buffer sizes.
+    """
+    reader = StructReader(io.BytesIO(RECORDS), Record, buffer_size=buffer_size)
+    assert reader.buffer_size % 3 == 0
+    check_records(list(reader))
+    assert reader.records_read == 1000
+    assert reader.trailing == b""
+
+
+def test_reader_compressed_streams() -> None:
+    """
+    Test reading records from gzip and lzma streams.
+    """
+    with gzip.GzipFile(fileobj=io.BytesIO(gzip.compress(RECORDS)), mode="rb") as f:
+        check_records(list(StructReader(f, Record, buffer_size=100)))
+    with lzma.LZMAFile(io.BytesIO(lzma.compress(RECORDS)), mode="rb") as f:
+        check_records(list(StructReader(f, Record, buffer_size=100)))
+
+
+def test_reader_pipe_and_socket() -> None:
+    """
+    Test reading records from a pipe and a socket, which return short reads.
+    """
+    read_fd, write_fd = os.pipe()
+
+    def write_pipe() -> None:
+        with os.fdopen(write_fd, "wb") as w:
+            for i in range(0, len(RECORDS), 500):
+                w.write(RECORDS[i : i + 500])
+                w.flush()
+
+    thread = threading.Thread(target=write_pipe)
+    thread.start()
+    with os.fdopen(read_fd, "rb") as r:
+        check_records(list(StructReader(r, Record)))
+    thread.join()
+
+    left, right = socket.socketpair()
+
+    def write_socket() -> None:
+        with right:
+            right.sendall(RECORDS)
+
+    thread = threading.Thread(target=write_socket)
+    thread.start()
+    with left, left.makefile("rb") as f:
+        check_records(list(StructReader(f, Record, buffer_size=1000)))
+    thread.join()
+
+
+def test_reader_without_readinto() -> None:
+    """
+    Test reading from an object that only implements read.
+    """
+
+    class ReadOnly:
+        def __init__(self, data: bytes) -> None:
+            self.stream = io.BytesIO(data)
+
+        def read(self, n: int) -> bytes:
+            return self.stream.read(min(n, 5))
+
+    check_records(list(StructReader(ReadOnly(RECORDS), Record)))  # type: ignore[arg-type]
+
+
+def test_reader_trailing_partial_record() -> None:
+    """
+    Test that a trailing partial record is kept aside, or raises in strict mode.
+    """
+    reader = StructReader(io.BytesIO(RECORDS + b"\x01\x02"), Record, buffer_size=30)
+    check_records(list(reader))
+    assert reader.trailing == b"\x01\x02"
+
+    with pytest.raises(ValueError, match="2 bytes of an incomplete Record record"):
+        list(StructReader(io.BytesIO(RECORDS + b"\x01\x02"), Record, strict=True))
+
+
+def test_reader_smx_config() -> None:
+    """
+    Test streaming records of the SMX config example.
+    """
+    records = list(StructReader(io.BytesIO(bytes(TEST_CONFIG_DATA) * 3), SMXConfigType, little_endian=True))
+    assert len(records) == 3
+    assert all(list(r.encode(little_endian=True)) == TEST_CONFIG_DATA for r in records)
+
+
+def test_reader_empty_struct() -> None:
+    """
+    Test that a StructDataclass without data can not be read.
+    """
+
+    class Empty(StructDataclass):
+        pass
+
+    with pytest.raises(ValueError):
+        StructReader(io.BytesIO(b""), Empty)
+
+
+async def serve_records(data: bytes, chunk: int) -> tuple[asyncio.Server, int]:
+    """
+    Start a loopback server that sends the data in chunks to every client and closes the connection.
+    """
+
+    async def handle(_reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        for i in range(0, len(data), chunk):
+            writer.write(data[i : i + chunk])
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_aiter_decode_loopback() -> None:
+    """
+    Test decoding records from an asyncio loopback connection, with records split across writes.
+    """
+
+    async def run() -> list[Record]:
+        server, port = await serve_records(RECORDS + b"\x01", 100)
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            records = [r async for r in Record.aiter_decode(reader, chunk_size=256)]
+            writer.close()
+            await writer.wait_closed()
+        return records
+
+    check_records(asyncio.run(run()))
+
+
+def test_adecode_batches_loopback() -> None:
+    """
+    Test batch callbacks, both plain functions and coroutine functions.
+    """
+    batches: list[list[Record]] = []
+
+    async def async_callback(batch: list[Record]) -> None:
+        batches.append(batch)
+
+    async def run() -> tuple[int, int]:
+        server, port = await serve_records(RECORDS, 3000)
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            total = await Record.adecode_batches(reader, async_callback)
+            writer.close()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            total_sync = await Record.adecode_batches(reader, batches.append)
+            writer.close()
+        return total, total_sync
+
+    assert asyncio.run(run()) == (1000, 1000)
+    assert all(batches)
+    records = [r for batch in batches for r in batch]
+    check_records(records[:1000])
+    check_records(records[1000:])
+
+
+def test_aiter_decode_strict() -> None:
+    """
+    Test that a partial record at the end of an asyncio stream raises in strict mode.
+    """
+
+    async def run() -> None:
+        stream = asyncio.StreamReader()
+        stream.feed_data(RECORDS[:5])
+        stream.feed_eof()
+        async for _ in Record.aiter_decode(stream, strict=True):
+            pass
+
+    with pytest.raises(ValueError, match="2 bytes of an incomplete Record record"):
+        asyncio.run(run())
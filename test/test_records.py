@@ -0,0 +1,157 @@
+"""
+Tests for read-only StructRecord decoding.
+"""
+
+import pickle
+from typing import Annotated
+
+import pytest
+
+from pystructtype import StructDataclass, StructRecord, TypeMeta, string_t, uint8_t, uint16_t
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class Inner(StructDataclass):
+    x: uint8_t
+    y: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+
+class Outer(StructDataclass):
+    a: uint16_t
+    name: Annotated[string_t, TypeMeta[str](chunk_size=3)]
+    inner: Inner
+    inners: Annotated[list[Inner], TypeMeta(size=2)]
+
+
+OUTER_DATA = bytes([0, 1, 65, 66, 67, 2, 0, 3, 0, 4, 5, 0, 6, 0, 7, 8, 0, 9, 0, 10])
+
+
+def test_decode_record() -> None:
+    """
+    Test decoding a record, with nested records and tuple list attributes.
+    """
+    record = Outer.decode_record(OUTER_DATA)
+    assert isinstance(record, StructRecord)
+    assert isinstance(record, tuple)
+    assert type(record) is Outer.record_type()
+    assert type(record).__name__ == "OuterRecord"
+
+    assert record.a == 1
+    assert record.name == b"ABC"
+    assert record.inner.x == 2
+    assert record.inner.y == (3, 4)
+    assert [item.x for item in record.inners] == [5, 8]
+    assert record.inners[1].y == (9, 10)
+    assert record[0] == 1
+    assert record._fields == ("a", "name", "inner", "inners")
+    assert record._asdict()["a"] == 1
+    assert repr(record.inner) == "InnerRecord(x=2, y=(3, 4))"
+
+    # The record is built from the same values as a full decode
+    s = Outer()
+    s.decode(OUTER_DATA)
+    assert record.to_struct() == s
+    assert s.to_record() == record
+    assert record.encode() == OUTER_DATA
+    assert record.encode(little_endian=True) == s.encode(little_endian=True)
+
+
+def test_record_is_read_only() -> None:
+    """
+    Test that records can not be modified.
+    """
+    record = Outer.decode_record(OUTER_DATA)
+    with pytest.raises(AttributeError):
+        record.a = 5  # type: ignore[attr-defined]
+    with pytest.raises(TypeError):
+        record.inner.y[0] = 5  # type: ignore[index]
+    with pytest.raises(AttributeError):
+        record.new_attribute = 5  # type: ignore[attr-defined]
+
+
+def test_decode_record_offset_and_errors() -> None:
+    """
+    Test decoding a record at an offset, and from a buffer that is too short.
+    """
+    buffer = bytearray(b"\xff" * 3 + OUTER_DATA)
+    assert Outer.decode_record(memoryview(buffer), offset=3) == Outer.decode_record(OUTER_DATA)
+
+    little = Outer.decode_record(OUTER_DATA, little_endian=True)
+    assert little.a == 256
+    assert little.encode(little_endian=True) == OUTER_DATA
+
+    with pytest.raises(ValueError, match="Unable to decode 20 bytes at offset 1"):
+        Outer.decode_record(OUTER_DATA, offset=1)
+    with pytest.raises(ValueError, match="Offset -20 must not be negative"):
+        Outer.decode_record(OUTER_DATA, offset=-20)
+
+
+def test_iter_records() -> None:
+    """
+    Test batch decoding of back-to-back records.
+    """
+    records = list(Inner.iter_records(bytes(range(1, 17)), count=3))
+    assert [record.x for record in records] == [1, 6, 11]
+    assert records[2].y == (12 << 8 | 13, 14 << 8 | 15)
+    assert [r.to_struct() for r in records] == Inner.decode_many(bytes(range(1, 17)), count=3)
+
+    with pytest.raises(ValueError, match="1 trailing bytes"):
+        list(Inner.iter_records(bytes(range(1, 17)), strict=True))
+
+
+def test_record_custom_decode() -> None:
+    """
+    Test that records of classes with a custom _decode hold the raw values, and that the custom
+    processing runs when converting back.
+    """
+    s = SMXConfigType()
+    s.decode(TEST_CONFIG_DATA, little_endian=True)
+    record = SMXConfigType.decode_record(bytes(TEST_CONFIG_DATA), little_endian=True)
+
+    assert record.flags._raw == s.flags._raw
+    assert record.enabled_sensors._raw == tuple(s.enabled_sensors._raw)
+    assert not hasattr(record.enabled_sensors, "_data")
+    assert record.to_struct() == s
+    assert s.to_record() == record
+    assert record.encode(little_endian=True) == bytes(TEST_CONFIG_DATA)
+
+
+def test_record_type_is_per_class() -> None:
+    """
+    Test that subclasses get their own record type, and that records can be pickled.
+    """
+
+    class Child(Inner):
+        z: uint8_t
+
+    assert Inner.record_type() is Inner.record_type()
+    assert Child.record_type() is not Inner.record_type()
+    assert Child.record_type()._fields == ("x", "y", "z")
+
+    record = Outer.decode_record(OUTER_DATA)
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert type(pickle.loads(pickle.dumps(record))) is Outer.record_type()
+
+
+def test_record_reserved_names() -> None:
+    """
+    Test that classes with attributes named like tuple or StructRecord methods have no record type.
+    """
+
+    class Counter(StructDataclass):
+        count: uint8_t
+        index: uint16_t
+        value: uint8_t
+
+    counter = Counter(count=1, index=2, value=3)
+    assert Counter.decode_many(counter.encode()) == [counter]
+    with pytest.raises(ValueError, match="Counter has no record type, its attributes count, index clash"):
+        Counter.record_type()
+    with pytest.raises(ValueError, match="clash with StructRecord"):
+        Counter.decode_record(counter.encode())
+
+    class Wrapper(StructDataclass):
+        to_struct: uint8_t
+
+    with pytest.raises(ValueError, match="attributes to_struct clash"):
+        Wrapper().to_record()
@@ -2,15 +2,31 @@
 Additional tests for StructDataclass.
 """
 
+import array
+import ctypes
+import mmap
 from dataclasses import is_dataclass
-from typing import Annotated
+from typing import Annotated, ClassVar
 
 import pytest
 
-from pystructtype import StructDataclass, TypeMeta, int8_t, uint8_t
+from pystructtype import (
+    BitsType,
+    StructDataclass,
+    TypeMeta,
+    bool_t,
+    double_t,
+    int8_t,
+    int16_t,
+    string_t,
+    uint8_t,
+    uint16_t,
+    uint32_t,
+)
+from pystructtype.structdataclass import simplify_format
 
 
-# Test _simplify_format for various struct formats
+# Test simplify_format for various struct formats
 def test_simplify_format_merges_repeats() -> None:
     class S(StructDataclass):
         a: uint8_t
@@ -20,10 +36,10 @@ def test_simplify_format_merges_repeats() -> None:
     s = S()
 
     # Should merge 5 uint8_t into 5B and end with 'b'
-    assert s.struct_fmt == "5Bb"
+    assert s.struct_fmt == S.__struct_layout__.struct_fmt == "5Bb"
 
 
-# Test _simplify_format: char[]/string grouping and number prefix
+# Test simplify_format: char[]/string grouping and number prefix
 @pytest.mark.parametrize(
     "fmt,expected",
     [
@@ -34,13 +50,7 @@ def test_simplify_format_merges_repeats() -> None:
     ],
 )
 def test_simplify_format_edge_cases(fmt: str, expected: str) -> None:
-    class Dummy(StructDataclass):
-        pass
-
-    s = Dummy()
-    s.struct_fmt = fmt
-    s._simplify_format()
-    assert s.struct_fmt == expected
+    assert simplify_format(fmt) == expected
 
 
 # Test _to_bytes and _to_list static methods
@@ -465,3 +475,422 @@ def test_decode_value_error_on_wrong_length() -> None:
     # struct expects 2 bytes, provide 3
     with pytest.raises(ValueError, match="Input data length 3 does not match expected struct size 2"):
         s.decode([1, 2, 3])
+
+
+def test_layout_compiled_once_per_class(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the struct layout is computed at class creation and shared by every instance.
+    """
+
+    class Inner(StructDataclass):
+        x: uint8_t
+        y: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class Outer(StructDataclass):
+        a: int8_t
+        inner: Inner
+        inners: Annotated[list[Inner], TypeMeta(size=2)]
+
+    layout = Outer.__struct_layout__
+    assert layout.struct_fmt == "b9B"
+    assert layout.byte_length == 10
+    assert layout.value_count == 10
+    assert dict(layout.offsets) == {"a": 0, "inner": 1, "inners": 4}
+    assert layout.states[1].layout is Inner.__struct_layout__
+
+    # Creating instances must not walk the type hints again
+    def fail(*_args: object) -> None:
+        raise AssertionError("iterate_types called per instance")
+
+    monkeypatch.setattr("pystructtype.structdataclass.iterate_types", fail)
+    o1 = Outer()
+    o2 = Outer()
+    assert o1._state is o2._state is layout.states
+    assert o1.struct_fmt == "b9B"
+
+    with pytest.raises(AttributeError):
+        layout.states[0].offset = 5  # type: ignore[misc]
+
+
+def test_deeply_nested_structdataclass() -> None:
+    """
+    Test that nested StructDataclasses consume the correct number of values when they contain lists
+    and other nested StructDataclasses.
+    """
+
+    class Leaf(StructDataclass):
+        v: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class Middle(StructDataclass):
+        leaf: Leaf
+        w: uint8_t
+
+    class Top(StructDataclass):
+        middles: Annotated[list[Middle], TypeMeta(size=2)]
+        z: uint8_t
+
+    t = Top()
+    t.decode([1, 2, 3, 4, 5, 6, 7])
+    assert [t.middles[0].leaf.v, t.middles[0].w] == [[1, 2], 3]
+    assert [t.middles[1].leaf.v, t.middles[1].w] == [[4, 5], 6]
+    assert t.z == 7
+    assert list(t.encode()) == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_precompiled_structs() -> None:
+    """
+    Test that each class keeps precompiled struct.Struct objects for every byte order
+    and that byte_size() reports the byte size of the struct, while size() sums the sizes of the attributes.
+    """
+
+    class S(StructDataclass):
+        a: uint8_t
+        b: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+    layout = S.__struct_layout__
+    assert layout.big_endian_struct.format == ">B2H"
+    assert layout.little_endian_struct.format == "<B2H"
+    assert layout.native_struct.format == "=B2H"
+    assert layout.get_struct(True) is layout.little_endian_struct
+    assert layout.get_struct(False) is layout.big_endian_struct
+
+    s = S()
+    assert s.byte_size() == 5
+    assert s.size() == 3
+    s.decode([1, 0, 2, 3, 0], little_endian=True)
+    assert s.a == 1 and s.b == [512, 3]
+    assert s.encode(little_endian=True) == bytes([1, 0, 2, 3, 0])
+    assert s.encode() == bytes([1, 2, 0, 0, 3])
+
+
+def test_decode_from_buffers() -> None:
+    """
+    Test that decode_from reads records in place from any buffer and reports the bytes consumed.
+    """
+
+    class S(StructDataclass):
+        a: uint8_t
+        b: uint16_t
+
+    records = bytes([1, 0, 2, 3, 0, 4, 5, 0, 6])
+
+    s = S()
+    for buffer in (records, bytearray(records), memoryview(records), array.array("B", records)):
+        offset = 0
+        decoded = []
+        while offset < len(records):
+            offset += s.decode_from(buffer, offset)
+            decoded.append((s.a, s.b))
+        assert decoded == [(1, 2), (3, 4), (5, 6)]
+
+    with mmap.mmap(-1, len(records)) as mm:
+        mm.write(records)
+        assert s.decode_from(mm, 6, little_endian=True) == 3
+        assert (s.a, s.b) == (5, 6 << 8)
+
+    with pytest.raises(ValueError, match="Unable to decode 3 bytes at offset 7"):
+        s.decode_from(records, 7)
+    # Negative offsets would count from the end of the buffer
+    with pytest.raises(ValueError, match="Offset -3 must not be negative"):
+        s.decode_from(records, -3)
+    with pytest.raises(ValueError, match="Offset -1 must not be negative"):
+        S.record_count(records, -1)
+
+
+def test_encode_into_buffer() -> None:
+    """
+    Test that encode_into writes records in place, including nested structs and BitsTypes.
+    """
+
+    class Flags(BitsType):
+        __bits_type__: ClassVar = uint8_t
+        __bits_definition__: ClassVar = {"a": 0, "b": 1}
+        a: bool
+        b: bool
+
+    class Inner(StructDataclass):
+        x: uint16_t
+
+    class S(StructDataclass):
+        flags: Flags
+        inner: Inner
+
+    s = S()
+    s.flags.b = True
+    s.inner.x = 0x0102
+
+    buffer = bytearray(8)
+    offset = s.encode_into(buffer, 1)
+    assert offset == 4
+    offset = s.encode_into(memoryview(buffer), offset, little_endian=True)
+    assert offset == 7
+    assert buffer == bytearray([0, 2, 1, 2, 2, 2, 1, 0])
+    assert bytes(buffer[1:4]) == s.encode()
+
+    # BitsType subclasses can be encoded on their own as well
+    assert s.flags.encode_into(buffer, 7) == 8
+    assert buffer[7] == 2
+
+    with pytest.raises(ValueError, match="Unable to encode 3 bytes at offset 6"):
+        s.encode_into(buffer, 6)
+    with pytest.raises(ValueError, match="Offset -3 must not be negative"):
+        s.encode_into(buffer, -3)
+    assert buffer == bytearray([0, 2, 1, 2, 2, 2, 1, 2])
+
+
+def test_iter_decode_and_decode_many() -> None:
+    """
+    Test batch decoding of back-to-back records, with offsets, counts and trailing partial records.
+    """
+
+    class Inner(StructDataclass):
+        x: uint8_t
+        y: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class S(StructDataclass):
+        a: uint16_t
+        inner: Inner
+
+    records = bytes([0, 1, 2, 3, 4, 0, 2, 5, 6, 7, 0, 3, 8, 9, 10, 99])
+
+    assert S.record_count(records) == (3, 1)
+    assert S.record_count(records, 5) == (2, 1)
+    assert S.record_count(records, 20) == (0, 0)
+
+    decoded = S.decode_many(records)
+    assert [(s.a, s.inner.x, s.inner.y) for s in decoded] == [(1, 2, [3, 4]), (2, 5, [6, 7]), (3, 8, [9, 10])]
+    assert decoded[0].inner is not decoded[1].inner
+    assert decoded[0].inner.y is not decoded[1].inner.y
+
+    little = S.decode_many(bytearray(records), little_endian=True, offset=5, count=1)
+    assert len(little) == 1 and little[0].a == 512
+
+    assert [s.a for s in S.iter_decode(memoryview(records), count=2)] == [1, 2]
+    assert list(S.iter_decode(records, offset=20)) == []
+
+    with pytest.raises(ValueError, match="1 trailing bytes"):
+        S.decode_many(records, strict=True)
+    assert len(S.decode_many(records, strict=True, count=3)) == 3
+
+
+def test_decode_many_custom_decode() -> None:
+    """
+    Test that batch decoding still runs custom _decode extensions.
+    """
+
+    class Doubled(StructDataclass):
+        v: uint8_t
+
+        def _decode(self, data: list[int]) -> None:
+            super()._decode(data)
+            self.v *= 2
+
+    class S(StructDataclass):
+        d: Doubled
+
+    assert [s.d.v for s in S.decode_many(bytes([1, 2, 3]))] == [2, 4, 6]
+    assert [d.v for d in Doubled.decode_many(bytes([1, 2, 3]))] == [2, 4, 6]
+
+
+def test_slots() -> None:
+    """
+    Test that slotted StructDataclasses have no per-instance __dict__ and decode/encode as usual.
+    """
+
+    class Inner(StructDataclass, slots=True):
+        x: uint8_t
+        y: Annotated[list[uint8_t], TypeMeta(size=2)]
+
+    class Outer(StructDataclass, slots=True):
+        a: uint16_t = 5
+        inner: Inner
+        inners: Annotated[list[Inner], TypeMeta(size=2)]
+
+    o = Outer()
+    assert not hasattr(o, "__dict__")
+    assert not hasattr(o.inner, "__dict__")
+    assert Outer.__slots__ == ("a", "inner", "inners")
+    assert o.a == 5
+    assert o.struct_fmt == Outer.__struct_layout__.struct_fmt
+
+    data = bytes(range(11))
+    o.decode(data)
+    assert (o.a, o.inner.x, o.inner.y, o.inners[1].y) == (1, 2, [3, 4], [9, 10])
+    assert o.encode() == data
+    assert Outer.decode_many(data * 2) == [o, o]
+    assert Outer.decode_lazy(data).to_struct() == o
+
+    with pytest.raises(AttributeError):
+        o.not_a_field = 1  # type: ignore[attr-defined]
+
+
+def test_slots_requires_slotted_parents() -> None:
+    """
+    Test that slots can't be used when a parent class has a per-instance __dict__.
+    """
+
+    class Parent(StructDataclass):
+        a: uint8_t
+
+    with pytest.raises(TypeError, match=r"parent classes \['Parent'\] do not use slots"):
+        # noinspection PyUnusedLocal
+        class Child(Parent, slots=True):
+            b: uint8_t
+
+
+def test_array_backed_lists() -> None:
+    """
+    Test that lists with TypeMeta(array=True) are stored in array.array and decode/encode in both byte orders.
+    """
+
+    class Inner(StructDataclass):
+        x: uint8_t
+        samples: Annotated[list[uint16_t], TypeMeta(size=3, array=True)]
+
+    class S(StructDataclass):
+        a: uint8_t
+        values: Annotated[list[int16_t], TypeMeta(size=2, array=True, default=-1)]
+        inners: Annotated[list[Inner], TypeMeta(size=2)]
+        floats: Annotated[list[double_t], TypeMeta(size=2, array=True)]
+
+    s = S()
+    assert s.values == array.array("h", [-1, -1])
+    assert s.inners[0].samples == array.array("H", [0, 0, 0])
+    assert s.inners[0].samples is not s.inners[1].samples
+    assert s.floats == array.array("d", [0.0, 0.0])
+    assert S.struct_fmt == "B4sB6sB6s16s"
+
+    data = bytes([1, 0xFF, 0xFE, 0, 2, 2, 0, 3, 0, 4, 0, 5, 6, 0, 7, 0, 8, 0, 9]) + bytes(16)
+    s.decode(data)
+    assert s.values == array.array("h", [-2, 2])
+    assert s.inners[0].samples == array.array("H", [3, 4, 5])
+    assert (s.inners[1].x, s.inners[1].samples) == (6, array.array("H", [7, 8, 9]))
+    assert s.encode() == data
+
+    little = S()
+    little.decode(data, little_endian=True)
+    assert little.values == array.array("h", [-257, 512])
+    assert little.inners[0].samples == array.array("H", [768, 1024, 1280])
+    assert little.encode(little_endian=True) == data
+
+    # Every decode path returns the same arrays
+    assert S.decode_many(data * 2) == [s, s]
+    assert S.decode_record(data).inners[0].samples == (3, 4, 5)
+    assert S.decode_record(data).to_struct() == s
+    assert S.decode_record(data).encode() == data
+    assert S.decode_lazy(data).inners[0].samples == s.inners[0].samples
+    assert S.decode_lazy(data).to_struct() == s
+
+    # Encode accepts arrays, or any other sequence of numbers with the right number of items
+    s.values = [1, 2]  # type: ignore[assignment]
+    s.floats = array.array("d", [1.5, -2.5])  # type: ignore[assignment]
+    buffer = bytearray(len(data))
+    s.encode_into(buffer, little_endian=True)
+    little.decode(buffer, little_endian=True)
+    assert little.values == array.array("h", [1, 2])
+    assert little.floats == array.array("d", [1.5, -2.5])
+
+    s.values = [1, 2, 3]  # type: ignore[assignment]
+    with pytest.raises(ValueError, match="Attribute values expects 2 items, got 3"):
+        s.encode()
+
+
+def test_array_backed_lists_generic() -> None:
+    """
+    Test array backed lists with code generation disabled, and invalid array attributes.
+    """
+
+    class S(StructDataclass, codegen=False):
+        a: uint8_t
+        values: Annotated[list[uint16_t], TypeMeta(size=2, array=True, default=[1, 2])]
+
+    s = S()
+    assert s.values == array.array("H", [1, 2])
+    s.decode(bytes([1, 0, 3, 0, 4]))
+    assert s.values == array.array("H", [3, 4])
+    assert s.encode() == bytes([1, 0, 3, 0, 4])
+
+    with pytest.raises(TypeError, match="Attribute b can not be stored in an array"):
+        # noinspection PyUnusedLocal
+        class NotANumber(StructDataclass):
+            b: Annotated[list[bool_t], TypeMeta(size=2, array=True)]
+
+    with pytest.raises(TypeError, match="Attribute c can not be stored in an array"):
+        # noinspection PyUnusedLocal
+        class NotAList(StructDataclass):
+            c: Annotated[uint8_t, TypeMeta(array=True)]
+
+
+def test_aligned_layout_matches_c() -> None:
+    """
+    Test that align=True and pack=N lay out attributes like a C compiler, using ctypes as the reference.
+    """
+
+    class Inner(StructDataclass, align=True):
+        a: uint8_t
+        b: uint32_t
+        c: uint8_t
+
+    class Outer(StructDataclass, align=True):
+        x: uint8_t
+        inner: Inner
+        y: uint16_t
+        inners: Annotated[list[Inner], TypeMeta(size=2)]
+        z: double_t
+        s: Annotated[string_t, TypeMeta[bytes](chunk_size=3)]
+
+    class CInner(ctypes.Structure):
+        _fields_ = [("a", ctypes.c_uint8), ("b", ctypes.c_uint32), ("c", ctypes.c_uint8)]
+
+    class COuter(ctypes.Structure):
+        _fields_ = [
+            ("x", ctypes.c_uint8),
+            ("inner", CInner),
+            ("y", ctypes.c_uint16),
+            ("inners", CInner * 2),
+            ("z", ctypes.c_double),
+            ("s", ctypes.c_char * 3),
+        ]
+
+    assert Inner.__struct_layout__.offsets == {"a": 0, "b": 4, "c": 8}
+    assert Inner().byte_size() == ctypes.sizeof(CInner) == 12
+    assert Outer.__struct_layout__.offsets == {field[0]: getattr(COuter, field[0]).offset for field in COuter._fields_}
+    assert Outer().byte_size() == ctypes.sizeof(COuter)
+
+    c_outer = COuter(1, CInner(2, 3, 4), 5, (CInner * 2)(CInner(6, 7, 8), CInner(9, 10, 11)), 1.5, b"abc")
+    o = Outer()
+    o.decode(bytes(c_outer), little_endian=True)
+    assert (o.x, o.inner.b, o.y, o.inners[1].c, o.z, o.s) == (1, 3, 5, 11, 1.5, b"abc")
+
+    buffer = bytearray(ctypes.sizeof(COuter))
+    o.encode_into(buffer, little_endian=True)
+    assert COuter.from_buffer(buffer).inners[1].b == 10
+    assert bytes(buffer) == bytes(c_outer)
+
+    class Packed(StructDataclass, pack=2):
+        a: uint8_t
+        b: uint32_t
+        c: uint8_t
+
+    class CPacked(ctypes.Structure):
+        _pack_ = 2
+        _fields_ = [("a", ctypes.c_uint8), ("b", ctypes.c_uint32), ("c", ctypes.c_uint8)]
+
+    assert Packed.struct_fmt == "BxIBx"
+    assert Packed.__struct_layout__.offsets == {"a": 0, "b": 2, "c": 6}
+    assert Packed().byte_size() == ctypes.sizeof(CPacked) == 8
+
+    # Alignment is inherited, and align=False goes back to a packed struct
+    class Child(Inner):
+        d: uint16_t
+
+    class PackedChild(Inner, align=False):
+        d: uint16_t
+
+    assert Child().byte_size() == 12
+    assert PackedChild().byte_size() == 8
+
+    with pytest.raises(ValueError, match="pack must be a power of 2, got 3"):
+        # noinspection PyUnusedLocal
+        class BadPack(StructDataclass, pack=3):
+            a: uint8_t
@@ -0,0 +1,246 @@
+"""
+Tests for change tracking and incremental encoding.
+"""
+
+import copy
+import gc
+import pickle
+from typing import Annotated
+
+import pytest
+
+from pystructtype import StructDataclass, TypeMeta, string_t, uint8_t, uint16_t, uint32_t
+from test.examples import TEST_CONFIG_DATA, SMXConfigType
+
+
+class Point(StructDataclass, track_changes=True):
+    x: uint8_t
+    y: Annotated[list[uint16_t], TypeMeta(size=2)]
+
+
+class Plain(StructDataclass):
+    a: uint8_t
+    b: uint16_t
+
+
+class Frame(StructDataclass, track_changes=True):
+    seq: uint32_t
+    name: Annotated[string_t, TypeMeta[bytes](chunk_size=3)]
+    samples: Annotated[list[uint16_t], TypeMeta(size=3)]
+    wide: Annotated[list[uint32_t], TypeMeta(size=2, array=True)]
+    point: Point
+    points: Annotated[list[Point], TypeMeta(size=3)]
+    plain: Plain
+
+
+class SlottedFrame(StructDataclass, track_changes=True, slots=True):
+    seq: uint32_t
+    name: Annotated[string_t, TypeMeta[bytes](chunk_size=3)]
+    samples: Annotated[list[uint16_t], TypeMeta(size=3)]
+    wide: Annotated[list[uint32_t], TypeMeta(size=2, array=True)]
+    point: Point
+    points: Annotated[list[Point], TypeMeta(size=3)]
+    plain: Plain
+
+
+class TrackedConfig(SMXConfigType, track_changes=True):
+    pass
+
+
+def _expected(frame: Frame | SlottedFrame, little_endian: bool) -> bytes:
+    """
+    Encode a copy of the frame without using the bytes of a previous encode.
+    """
+    fresh = copy.deepcopy(frame)
+    assert fresh._struct_tracker.encoded is None  # type: ignore[union-attr]
+    return fresh.encode(little_endian)
+
+
+@pytest.mark.parametrize("cls", [Frame, SlottedFrame])
+@pytest.mark.parametrize("little_endian", [False, True])
+def test_incremental_encode(cls: type[Frame | SlottedFrame], little_endian: bool) -> None:
+    """
+    Test that every kind of change is picked up by the next encode.
+    """
+    f = cls()
+    assert f.changed_fields() == {"seq", "name", "samples", "wide", "point", "points", "plain"}
+    assert f.encode(little_endian) == bytes(f.byte_size())
+    assert f.changed_fields() == set()
+
+    f.seq = 70000
+    f.name = b"abc"
+    assert f.changed_fields() == {"seq", "name"}
+    assert f.encode(little_endian) == _expected(f, little_endian)
+
+    f.samples[1] = 5
+    f.wide[0] = 6
+    f.point.y[1] = 7
+    f.points[2].x = 8
+    f.plain.b = 9
+    assert f.changed_fields() == {"samples", "wide", "point", "points", "plain"}
+    assert f.encode(little_endian) == _expected(f, little_endian)
+    assert f.changed_fields() == set()
+    # Encoding the frame doesn't count as an encode of the nested instances
+    assert f.point.changed_fields() == {"x", "y"}
+
+    f.points[0] = Point(x=1)
+    f.plain = Plain(a=2)
+    f.point.x = 3
+    assert f.encode(little_endian) == _expected(f, little_endian)
+
+    # Swapping in tracked instances that were encoded before
+    f.points[1], f.points[2] = f.points[2], f.points[1]
+    f.points[0].y = [4, 5]
+    assert f.changed_fields() == {"points"}
+    assert f.encode(little_endian) == _expected(f, little_endian)
+
+    # Changing the byte order encodes everything again
+    f.seq = 1
+    assert f.encode(not little_endian) == _expected(f, not little_endian)
+    buffer = bytearray(f.byte_size() + 2)
+    assert f.encode_into(buffer, 2, little_endian) == f.byte_size() + 2
+    assert buffer[2:] == _expected(f, little_endian)
+
+    decoded = cls()
+    decoded.encode(little_endian)
+    decoded.decode(_expected(f, little_endian), little_endian)
+    assert decoded.encode(little_endian) == _expected(f, little_endian)
+
+
+def test_incremental_encode_custom_nested() -> None:
+    """
+    Test classes with BitsType and custom nested StructDataclasses, which are compared by their encoded values.
+    """
+    s = TrackedConfig()
+    s.decode(TEST_CONFIG_DATA, little_endian=True)
+    assert s.encode(little_endian=True) == bytes(TEST_CONFIG_DATA)
+
+    s.flags.fsr = not s.flags.fsr
+    s.enabled_sensors[2][1] = not s.enabled_sensors[2][1]
+    s.step_color[4].g = 1
+    assert s.changed_fields() == {"flags", "enabled_sensors", "step_color"}
+
+    expected = SMXConfigType()
+    expected.decode(TEST_CONFIG_DATA, little_endian=True)
+    expected.flags.fsr = s.flags.fsr
+    expected.enabled_sensors[2][1] = s.enabled_sensors[2][1]
+    expected.step_color[4].g = 1
+    assert s.encode(little_endian=True) == expected.encode(little_endian=True)
+
+
+def test_nested_encoded_on_its_own() -> None:
+    """
+    Test that encoding a nested instance on its own doesn't hide its changes from the instances it is nested in.
+    """
+    f = Frame()
+    f.encode()
+    f.point.x = 5
+    f.points[1].y[0] = 6
+    assert f.point.encode() == Point(x=5).encode()
+    assert f.points[1].encode() == Point(y=[6, 0]).encode()
+    assert f.point.changed_fields() == set()
+    assert f.changed_fields() == {"point", "points"}
+    assert f.encode() == _expected(f, False)
+    assert f.encode() == Frame(point=Point(x=5), points=[Point(), Point(y=[6, 0]), Point()]).encode()
+
+
+def test_shared_nested() -> None:
+    """
+    Test an instance nested in two others, which each pick up its changes on their next encode.
+    """
+    point = Point()
+    first, second = Frame(point=point), Frame(points=[Point(), point, Point()])
+    first.encode()
+    second.encode()
+
+    point.x = 1
+    assert first.encode() == _expected(first, False)
+    point.y[1] = 2
+    assert second.encode() == _expected(second, False)
+    assert first.changed_fields() == {"point"}
+    assert first.encode() == _expected(first, False)
+    assert second.changed_fields() == set()
+    assert first.encode() == Frame(point=Point(x=1, y=[0, 2])).encode()
+
+
+def test_swapped_out_nested() -> None:
+    """
+    Test that nested instances stop notifying the instances they were swapped out of, or that are gone.
+    """
+    point = Point()
+    first, second = Frame(point=point), Frame(points=[Point(), point, Point()])
+    first.encode()
+    second.encode()
+    listeners = point._struct_tracker.listeners  # type: ignore[attr-defined]
+    assert len(listeners) == 2
+
+    second.points[1] = Point(x=1)
+    assert second.encode() == _expected(second, False)
+    assert len(listeners) == 1
+    point.x = 2
+    assert not second._struct_tracker.snapshots["points"].dirty  # type: ignore[attr-defined]
+    assert second.changed_fields() == set()
+    assert first.changed_fields() == {"point"}
+
+    del first
+    gc.collect()
+    assert listeners == {}
+
+
+def test_incremental_encode_large() -> None:
+    """
+    Test repeated small changes of a large instance, which only pack the changed items.
+    """
+
+    class Color(StructDataclass, track_changes=True):
+        r: uint8_t
+        g: uint8_t
+        b: uint8_t
+
+    class Telemetry(StructDataclass, track_changes=True):
+        seq: uint32_t
+        leds: Annotated[list[Color], TypeMeta(size=256)]
+        samples: Annotated[list[uint32_t], TypeMeta(size=256, array=True)]
+
+    class PlainTelemetry(Telemetry, track_changes=False):
+        pass
+
+    def encode_change(telemetry: Telemetry) -> bytes:
+        telemetry.seq += 1
+        telemetry.leds[telemetry.seq % 256].g = telemetry.seq & 0xFF
+        telemetry.samples[telemetry.seq % 7] = telemetry.seq
+        return telemetry.encode()
+
+    tracked, plain = Telemetry(), PlainTelemetry()
+    for _ in range(300):
+        assert encode_change(tracked) == encode_change(plain)
+
+
+def test_track_changes_errors() -> None:
+    """
+    Test that changed_fields is only available on classes that track changes, and copies don't share state.
+    """
+    with pytest.raises(TypeError, match="Plain does not track changes"):
+        Plain().changed_fields()
+
+    class Untracked(Frame, track_changes=False):
+        pass
+
+    assert Untracked().encode() == bytes(Untracked().byte_size())
+    assert Untracked()._struct_tracker.encoded is None  # type: ignore[attr-defined]
+
+    f = Frame()
+    f.encode()
+    f.seq = 1
+    other = copy.copy(f)
+    other.samples = [1, 2, 3]
+    assert other.encode() == _expected(other, False)
+    assert other._struct_tracker is not f._struct_tracker  # type: ignore[attr-defined]
+    assert f.encode() == _expected(f, False)
+    assert f == Frame(seq=1)
+
+    # Pickled instances start over as well
+    restored = pickle.loads(pickle.dumps(f))
+    assert restored == f
+    assert restored._struct_tracker.encoded is None  # type: ignore[attr-defined]
+    assert restored.encode() == f.encode()